@@ -1,7 +1,8 @@
 # analysis.py
+from itertools import chain
 from typing import Dict, Any
-from ml_nlp import analyze_text_nlp
-from pipelines.engagement import compute_engagement_metrics
+from .ml_nlp import analyze_texts_nlp
+from .pipelines.engagement import compute_engagement_metrics
 
 def aggregate_signals(source_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -18,23 +19,23 @@ def aggregate_signals(source_data: Dict[str, Any]) -> Dict[str, Any]:
         "summary": {}
     }
 
-    # combine comments text for NLP
-    combined_texts = []
+    # comment texts for NLP, analyzed in chunks instead of one joined string
+    text_sources = []
     total_comments = 0
     total_likes = 0
     if "youtube" in source_data and source_data["youtube"]:
         y = source_data["youtube"]
         total_comments += y.get("comments_count", 0)
         total_likes += sum([safe_like_count(c.get("likes", 0)) for c in y.get("comments", [])])
-        combined_texts.extend([c.get("text", "") for c in y.get("comments", [])])
+        text_sources.append(c.get("text", "") for c in y.get("comments", []))
 
     if "reddit" in source_data and source_data["reddit"]:
         r = source_data["reddit"]
         total_comments += r.get("comments_count", 0)
-        combined_texts.extend([c.get("text", "") for c in r.get("comments", [])])
+        text_sources.append(c.get("text", "") for c in r.get("comments", []))
 
     # NLP
-    nlp = analyze_text_nlp("\n".join(combined_texts))
+    nlp = analyze_texts_nlp(chain.from_iterable(text_sources))
     results["nlp"] = nlp
 
     # engagement (simple)
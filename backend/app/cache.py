@@ -0,0 +1,367 @@
+# cache.py
+"""
+Response cache for the analyze pipeline.
+
+Three interchangeable backends share the same get/set/stats interface:
+- MemoryCache: in-process OrderedDict with TTL + LRU eviction
+- SqliteCache: on-disk table, survives restarts, TTL + LRU eviction
+- RedisCache: any server speaking the Redis protocol (RESP), shared across workers
+
+Values must be JSON serialisable. Use get_cache() to obtain the configured instance.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from .config import CONFIG
+from .utils.text_utils import extract_video_id
+
+
+class BaseCache:
+    backend = "base"
+
+    def __init__(self, ttl: int = 600, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Like get() but does not count towards hit/miss stats (for bookkeeping reads)."""
+        return self._get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._set(key, value, self.ttl if ttl is None else ttl)
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+
+    def _get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    backend = "memory"
+
+    def __init__(self, ttl: int = 600, max_entries: int = 1000):
+        super().__init__(ttl, max_entries)
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SqliteCache(BaseCache):
+    backend = "sqlite"
+
+    def __init__(self, path: str, ttl: int = 600, max_entries: int = 1000):
+        super().__init__(ttl, max_entries)
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache(last_access)")
+        self._conn.commit()
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def _set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            # Drop expired rows first, then the least recently used ones over the limit
+            self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class RespClient:
+    """
+    Minimal thread-safe Redis (RESP) client over one socket, so no redis package is
+    required. command(*args) sends one command and returns the decoded reply.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", str(self.db))
+
+    def _close(self):
+        try:
+            if self._sock:
+                self._sock.close()
+        finally:
+            self._sock = None
+            self._reader = None
+
+    def _send(self, *args):
+        out = [b"*%d\r\n" % len(args)]
+        for a in args:
+            data = a if isinstance(a, bytes) else str(a).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(out))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {rest.decode()}")
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size == -1:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            if size == -1:
+                return None
+            return [self._read_reply() for _ in range(size)]
+        raise RuntimeError(f"Unexpected Redis reply: {line!r}")
+
+    def command(self, *args):
+        with self._lock:
+            # One reconnect attempt: the server may have dropped an idle connection
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+class RedisCache(BaseCache):
+    """
+    Redis-backed cache (GET / SET EX / DEL) over RespClient.
+    Expiry is handled by the server; LRU eviction is left to the server's
+    maxmemory-policy (e.g. allkeys-lru). Keys are namespaced with `prefix`.
+    len() is the server's DBSIZE: O(1), but it counts every key in the database,
+    not only this prefix (KEYS would block a shared server on every /metrics scrape).
+    """
+    backend = "redis"
+
+    def __init__(self, url: str, ttl: int = 600, max_entries: int = 1000,
+                 prefix: str = "agenticeye:", timeout: float = 2.0):
+        super().__init__(ttl, max_entries)
+        self.prefix = prefix
+        self.client = RespClient(url, timeout)
+
+    def _command(self, *args):
+        return self.client.command(*args)
+
+    def _get(self, key):
+        try:
+            raw = self._command("GET", self.prefix + key)
+        except (OSError, ConnectionError, RuntimeError) as e:
+            print(f"Redis cache unavailable: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def _set(self, key, value, ttl):
+        # A non-positive ttl expires the entry at once, as in the other backends
+        # (Redis rejects EX <= 0), so it only drops any older value
+        try:
+            if int(ttl) <= 0:
+                self._command("DEL", self.prefix + key)
+            else:
+                self._command("SET", self.prefix + key, json.dumps(value), "EX", str(int(ttl)))
+        except (OSError, ConnectionError, RuntimeError) as e:
+            print(f"Redis cache unavailable: {e}")
+
+    def delete(self, key):
+        self._command("DEL", self.prefix + key)
+
+    def clear(self):
+        # SCAN walks the keyspace in small steps instead of blocking the server like KEYS
+        cursor = b"0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", "500")
+            if keys:
+                self._command("DEL", *keys)
+            if cursor in (b"0", "0"):
+                break
+
+    def __len__(self):
+        try:
+            return self._command("DBSIZE") or 0
+        except (OSError, ConnectionError, RuntimeError):
+            return 0
+
+
+def make_cache(backend: str = "memory", ttl: int = 600, max_entries: int = 1000,
+               sqlite_path: str = "", redis_url: str = "", namespace: str = "m3") -> BaseCache:
+    backend = (backend or "memory").lower()
+    if backend == "sqlite":
+        return SqliteCache(sqlite_path or os.path.join(".cache", f"{namespace}.sqlite3"), ttl, max_entries)
+    if backend == "redis":
+        return RedisCache(redis_url or "redis://localhost:6379/0", ttl, max_entries,
+                          prefix=f"agenticeye:{namespace}:")
+    if backend == "memory":
+        return MemoryCache(ttl, max_entries)
+    if backend == "off":
+        # Zero-capacity memory cache: every lookup misses, nothing is stored
+        return MemoryCache(ttl, 0)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+_cache = None
+
+def get_cache() -> BaseCache:
+    """Returns the process-wide analyze response cache configured from CONFIG."""
+    global _cache
+    if _cache is None:
+        _cache = make_cache(
+            CONFIG.CACHE_BACKEND,
+            ttl=CONFIG.CACHE_TTL,
+            max_entries=CONFIG.CACHE_MAX_ENTRIES,
+            sqlite_path=CONFIG.CACHE_SQLITE_PATH,
+            redis_url=CONFIG.CACHE_REDIS_URL,
+        )
+    return _cache
+
+
+def analyze_cache_key(url: str, limit: int, platform: str, tier: str, sample: int = 0) -> str:
+    # Different URL spellings of the same video (youtu.be, watch?v=, &t=...) share a key
+    video_id = ""
+    if platform.lower() == "youtube":
+        video_id = extract_video_id(url)
+    video_id = video_id or url.split("?")[0].rstrip("/")
+    key = f"analyze:{platform.lower()}:{video_id}:{limit}:{tier.lower()}"
+    return f"{key}:sample{sample}" if sample else key
@@ -0,0 +1,220 @@
+# comment_store.py
+"""
+Persistent on-disk comment store keyed by (platform, video_id).
+
+Holds the comment records produced by the youtube, reddit_post and tiktok
+pipelines so re-analysing a video only has to fetch what is new since the
+stored high-water mark (newest comment timestamp) instead of everything.
+Comments seen again refresh their stored record (likes/votes change over time).
+At most max_videos videos are kept; the least recently refreshed ones are evicted.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .config import CONFIG
+
+
+def comment_key(comment: Dict[str, Any]) -> str:
+    """Stable id for a comment record; falls back to a content hash when the platform gave none."""
+    if comment.get("id"):
+        return str(comment["id"])
+    raw = f"{comment.get('author')}|{comment.get('text')}|{comment.get('time')}"
+    return hashlib.sha1(raw.encode("utf-8", "ignore")).hexdigest()
+
+
+def _timestamp(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CommentStore:
+
+    def __init__(self, path: str, max_videos: int = 1000):
+        self.path = path
+        self.max_videos = max_videos
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS comments (
+                platform TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                comment_id TEXT NOT NULL,
+                ts REAL NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (platform, video_id, comment_id)
+            );
+            CREATE INDEX IF NOT EXISTS comments_by_time ON comments(platform, video_id, ts);
+            CREATE TABLE IF NOT EXISTS videos (
+                platform TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                high_water REAL NOT NULL DEFAULT 0,
+                refreshed_at REAL NOT NULL DEFAULT 0,
+                meta TEXT,
+                PRIMARY KEY (platform, video_id)
+            );
+            CREATE INDEX IF NOT EXISTS videos_by_refresh ON videos(refreshed_at);
+            """
+        )
+        self._conn.commit()
+
+    def has_video(self, platform: str, video_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM videos WHERE platform = ? AND video_id = ?", (platform, video_id)
+            ).fetchone()
+        return row is not None
+
+    def high_water_mark(self, platform: str, video_id: str) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water FROM videos WHERE platform = ? AND video_id = ?", (platform, video_id)
+            ).fetchone()
+        return row[0] if row else 0.0
+
+    def known_ids(self, platform: str, video_id: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT comment_id FROM comments WHERE platform = ? AND video_id = ?", (platform, video_id)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def add_comments(self, platform: str, video_id: str, comments: Iterable[Dict[str, Any]],
+                     meta: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Merges comments in (a known id gets its record refreshed, its timestamp kept) and
+        advances the high-water mark. Returns the number of new comments.
+        """
+        rows = [
+            (platform, video_id, comment_key(c), _timestamp(c.get("time")), json.dumps(c))
+            for c in comments
+        ]
+        newest = max((r[3] for r in rows), default=0.0)
+        with self._lock:
+            before = self._count(platform, video_id)
+            self._conn.executemany(
+                "INSERT INTO comments (platform, video_id, comment_id, ts, record) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(platform, video_id, comment_id) DO UPDATE SET record = excluded.record"
+                " WHERE record != excluded.record",
+                rows,
+            )
+            inserted = self._count(platform, video_id) - before
+            self._conn.execute(
+                "INSERT INTO videos (platform, video_id, high_water, refreshed_at, meta) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(platform, video_id) DO UPDATE SET"
+                " high_water = MAX(high_water, excluded.high_water),"
+                " refreshed_at = excluded.refreshed_at,"
+                " meta = COALESCE(excluded.meta, meta)",
+                (platform, video_id, newest, time.time(), json.dumps(meta) if meta else None),
+            )
+            self._evict()
+            self._conn.commit()
+        return inserted
+
+    def _evict(self) -> None:
+        # Least recently refreshed videos past max_videos go, with their comments
+        stale = self._conn.execute(
+            "SELECT platform, video_id FROM videos ORDER BY refreshed_at DESC LIMIT -1 OFFSET ?",
+            (self.max_videos,),
+        ).fetchall()
+        if stale:
+            self._conn.executemany("DELETE FROM comments WHERE platform = ? AND video_id = ?", stale)
+            self._conn.executemany("DELETE FROM videos WHERE platform = ? AND video_id = ?", stale)
+
+    def get_comments(self, platform: str, video_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stored comments, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM comments WHERE platform = ? AND video_id = ?"
+                " ORDER BY ts DESC, rowid ASC LIMIT ?",
+                (platform, video_id, -1 if limit is None else limit),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def get_meta(self, platform: str, video_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT meta FROM videos WHERE platform = ? AND video_id = ?", (platform, video_id)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
+
+    def _count(self, platform: str, video_id: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM comments WHERE platform = ? AND video_id = ?", (platform, video_id)
+        ).fetchone()[0]
+
+    def count(self, platform: str, video_id: str) -> int:
+        with self._lock:
+            return self._count(platform, video_id)
+
+
+def refresh_youtube(store: CommentStore, video_url: str, max_comments: int = 100) -> Dict[str, Any]:
+    from .pipelines.youtube import get_video_id, iter_youtube_comments, iter_new_youtube_comments
+
+    video_id = get_video_id(video_url)
+    if not video_id:
+        return {"error": "Invalid YouTube URL"}
+    try:
+        # A delta fetch only adds comments newer than the stored ones, so when the limit
+        # has grown past what is stored, page through the listing again; known ids are ignored
+        if store.has_video("youtube", video_id) and store.count("youtube", video_id) >= max_comments:
+            fresh = list(iter_new_youtube_comments(
+                video_id,
+                store.known_ids("youtube", video_id),
+                store.high_water_mark("youtube", video_id),
+                max_comments,
+            ))
+        else:
+            fresh = list(iter_youtube_comments(video_id, max_comments))
+    except Exception as e:
+        print(f"Error fetching comments: {e}")
+        return {"error": str(e)}
+    added = store.add_comments("youtube", video_id, fresh)
+    return {"comments": store.get_comments("youtube", video_id, max_comments), "new_comments": added}
+
+
+def refresh_reddit(store: Optional[CommentStore], url: str) -> Dict[str, Any]:
+    """get_reddit_post, merged into the store (store=None: plain fetch)."""
+    from .pipelines.reddit_post import get_reddit_post
+
+    # Reddit serves the whole thread in one request; the store dedupes by comment id
+    post = get_reddit_post(url)
+    if "error" in post or store is None:
+        return post
+    video_id = post["url"]
+    meta = {k: post.get(k) for k in ("title", "author", "content")}
+    added = store.add_comments("reddit", video_id, post["comments"], meta)
+    comments = store.get_comments("reddit", video_id)
+    return {**post, "comments_count": len(comments), "comments": comments, "new_comments": added}
+
+
+def refresh_tiktok(store: Optional[CommentStore], video_url: str) -> Dict[str, Any]:
+    """get_tiktok_comments, merged into the store (store=None: plain fetch)."""
+    from .pipelines.tiktok import get_tiktok_comments
+
+    result = get_tiktok_comments(video_url)
+    if "error" in result or store is None:
+        return result
+    video_id = video_url.split("video/")[1].split("?")[0]
+    added = store.add_comments("tiktok", video_id, result["comments"])
+    comments = store.get_comments("tiktok", video_id)
+    return {**result, "comments": comments, "total": len(comments), "new_comments": added}
+
+
+_store = None
+
+def get_comment_store() -> CommentStore:
+    global _store
+    if _store is None:
+        _store = CommentStore(CONFIG.COMMENT_STORE_PATH, CONFIG.COMMENT_STORE_MAX_VIDEOS)
+    return _store
@@ -7,6 +7,97 @@ load_dotenv()
 class Config:
     AIMLAPI_API_KEY = os.getenv("AIMLAPI_API_KEY", "")
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
+    # Overridable so tests / load tests can point the client at a local stand-in
+    OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+    OPENROUTER_RPM = int(os.getenv("OPENROUTER_RPM", "50"))
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "10"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_MODEL = os.getenv("LLM_MODEL", "deepseek/deepseek-chat")
+    # Stream DeepSeek output and parse ideas as they complete
+    LLM_STREAM = os.getenv("LLM_STREAM", "1") == "1"
+    # Optional file used to share the LLM rate limit between worker processes
+    LLM_RATE_LIMIT_FILE = os.getenv("LLM_RATE_LIMIT_FILE", "")
+    # Retries for 429 / 5xx LLM responses (Retry-After is honoured)
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
     PYTRENDS_TIMEFRAME = os.getenv("PYTRENDS_TIMEFRAME", "now 7-d")
+    # Per-call timeouts (seconds) for the cross-platform signals in trending.analyze_all
+    REDDIT_TIMEOUT = float(os.getenv("REDDIT_TIMEOUT", "10"))
+    TRENDS_TIMEOUT = float(os.getenv("TRENDS_TIMEOUT", "20"))
+    # Shared scraper HTTP pool (http_pool.py); HTTP2=1 needs the optional h2 package
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "20"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP2 = os.getenv("HTTP2", "0") == "1"
+    # Google Trends (pipelines/google_trends.py): optional fixed anchor keyword shared by every
+    # 5-term group, parallel groups, and how long per-term interest is cached
+    TRENDS_ANCHOR = os.getenv("TRENDS_ANCHOR", "")
+    TRENDS_CONCURRENCY = int(os.getenv("TRENDS_CONCURRENCY", "3"))
+    TRENDS_CACHE_TTL = int(os.getenv("TRENDS_CACHE_TTL", str(6 * 3600)))
+    TRENDS_CACHE_MAX_ENTRIES = int(os.getenv("TRENDS_CACHE_MAX_ENTRIES", "5000"))
+    # Reddit search cache (search_cache.py): fresh for TTL, then served stale for STALE more
+    # seconds while it refreshes in the background; empty / failed searches for NEGATIVE_TTL
+    REDDIT_CACHE_BACKEND = os.getenv("REDDIT_CACHE_BACKEND", "memory")
+    REDDIT_CACHE_TTL = int(os.getenv("REDDIT_CACHE_TTL", "900"))
+    REDDIT_CACHE_STALE = int(os.getenv("REDDIT_CACHE_STALE", str(24 * 3600)))
+    REDDIT_CACHE_NEGATIVE_TTL = int(os.getenv("REDDIT_CACHE_NEGATIVE_TTL", "120"))
+    REDDIT_CACHE_MAX_ENTRIES = int(os.getenv("REDDIT_CACHE_MAX_ENTRIES", "2000"))
+    # Follow-up requests that expand "more" nodes in Reddit comment trees, per post
+    REDDIT_MORE_CONCURRENCY = int(os.getenv("REDDIT_MORE_CONCURRENCY", "4"))
+    REDDIT_MORE_MAX_REQUESTS = int(os.getenv("REDDIT_MORE_MAX_REQUESTS", "32"))
+    # /m3/analyze response cache: memory | sqlite | redis | off
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", "900"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "500"))
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", ".cache/analyze.sqlite3")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # Parsed LLM results keyed by prompt fingerprint (same backends as the response cache)
+    LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sqlite")
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+    LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", ".cache/llm.sqlite3")
+    # Minimum topic-set overlap (Jaccard) to reuse a cached result; 0 disables similarity matching
+    LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0"))
+    # Persistent comment store used for delta re-fetches
+    COMMENT_STORE_ENABLED = os.getenv("COMMENT_STORE_ENABLED", "1") == "1"
+    COMMENT_STORE_PATH = os.getenv("COMMENT_STORE_PATH", ".cache/comments.sqlite3")
+    COMMENT_STORE_MAX_VIDEOS = int(os.getenv("COMMENT_STORE_MAX_VIDEOS", "1000"))  # least recently refreshed evicted
+    # Drop spam and collapse near-duplicate comments before NLP (utils/dedupe.py)
+    DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "1") == "1"
+    DEDUPE_MAX_DISTANCE = int(os.getenv("DEDUPE_MAX_DISTANCE", "4"))
+    DEDUPE_DROP_SPAM = os.getenv("DEDUPE_DROP_SPAM", "1") == "1"
+    # Stratified sampling for /m3/analyze?sample=N (sampling.py); SAMPLE_BUDGET is the default N, 0 = off
+    SAMPLE_BUDGET = int(os.getenv("SAMPLE_BUDGET", "0"))
+    SAMPLE_RECENCY_BUCKETS = int(os.getenv("SAMPLE_RECENCY_BUCKETS", "3"))
+    SAMPLE_MIN_PER_STRATUM = int(os.getenv("SAMPLE_MIN_PER_STRATUM", "2"))
+    SAMPLE_CONFIDENCE = float(os.getenv("SAMPLE_CONFIDENCE", "0.95"))
+    # RoBERTa sentiment (pipelines/nlp.py): pytorch | int8 | onnx
+    SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "pytorch")
+    SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+    # Models preloaded by the FastAPI lifespan warmup (comma separated registry names)
+    WARMUP_MODELS = [m.strip() for m in os.getenv("WARMUP_MODELS", "textblob_pool").split(",") if m.strip()]
+    SENTIMENT_MAX_COMMENTS = int(os.getenv("SENTIMENT_MAX_COMMENTS", "300"))  # 0 = no cap
+    # TextBlob process pool (utils/sentiment_engine.py) per API process; 0 = min(4, CPU count)
+    SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+    # Chunked lexicon NLP (ml_nlp.analyze_texts_nlp): comments per chunk, questions kept (0 = all)
+    NLP_CHUNK_SIZE = int(os.getenv("NLP_CHUNK_SIZE", "2000"))
+    NLP_MAX_QUESTIONS = int(os.getenv("NLP_MAX_QUESTIONS", "1000"))
+    # Cascade: score with a cheap backend (vader | lexicon) first and only send comments
+    # whose confidence is below the threshold to RoBERTa. Empty disables the cascade.
+    SENTIMENT_CASCADE = os.getenv("SENTIMENT_CASCADE", "")
+    SENTIMENT_CASCADE_THRESHOLD = float(os.getenv("SENTIMENT_CASCADE_THRESHOLD", "0.3"))
+    # Batch analysis (/m3/analyze/batch)
+    BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "50"))
+    BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "4"))
+    # Background jobs (/m3/jobs): local | redis queue, bounded, with retries
+    JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "local")
+    JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # workers inside the API process; 0 = enqueue only
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "2"))
+    JOB_TTL = int(os.getenv("JOB_TTL", "3600"))
+    JOB_LEASE_TTL = int(os.getenv("JOB_LEASE_TTL", "300"))  # redis queue: a job whose worker is silent this long is re-queued
+    JOB_REDIS_URL = os.getenv("JOB_REDIS_URL", CACHE_REDIS_URL)
 
 CONFIG = Config()
\ No newline at end of file
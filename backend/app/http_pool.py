@@ -0,0 +1,134 @@
+# http_pool.py
+"""
+Shared outbound HTTP clients for the scrapers (Reddit, TikTok, the trends signals).
+
+One pooled keep-alive httpx.Client for code running in worker threads and one
+httpx.AsyncClient per event loop (PerLoopClient), both with the same limits, so repeated calls to
+the same host reuse open TCP/TLS connections instead of handshaking every time.
+Created lazily, closed by the FastAPI lifespan. Every response is counted in
+outbound_requests_total.
+
+HTTP/2 (HTTP2=1) needs the optional `h2` package; without it the pool stays on HTTP/1.1.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from .config import CONFIG
+from .metrics import httpx_hooks
+from .utils.headers import get_headers
+
+# Connection-level headers are set by the transport (and are invalid over HTTP/2)
+_HOP_BY_HOP = {"connection", "keep-alive", "upgrade-insecure-requests"}
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class PerLoopClient:
+    """
+    One httpx.AsyncClient per event loop: pooled connections belong to the loop that
+    opened them, so a client is never shared across loops. A loop's client is dropped
+    with the loop (e.g. after asyncio.run()); aclose() closes every client whose loop
+    is still alive.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        self.factory = factory
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._clients[loop] = self.factory()
+        return client
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def aclose(self) -> None:
+        current = asyncio.get_running_loop()
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+        for loop, client in clients:
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+
+
+class HttpPool:
+
+    def __init__(self, max_connections: int = 50, max_keepalive: int = 20, keepalive_expiry: float = 30.0,
+                 timeout: float = 20.0, connect_timeout: float = 5.0, http2: bool = False):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and _h2_available()
+        if http2 and not self.http2:
+            print("HTTP2=1 but the h2 package is not installed; using HTTP/1.1")
+        self._sync: Optional[httpx.Client] = None
+        self._async = PerLoopClient(lambda: httpx.AsyncClient(
+            limits=self.limits, timeout=self.timeout, http2=self.http2,
+            event_hooks=httpx_hooks(is_async=True)))
+        self._lock = threading.Lock()
+
+    @property
+    def sync(self) -> httpx.Client:
+        """Thread-safe client for blocking scrapers (run via asyncio.to_thread)."""
+        with self._lock:
+            if self._sync is None or self._sync.is_closed:
+                self._sync = httpx.Client(limits=self.limits, timeout=self.timeout, http2=self.http2,
+                                          event_hooks=httpx_hooks())
+            return self._sync
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        return self._async.get()
+
+    def headers(self, overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Browser-like headers with a rotated User-Agent / Accept-Language, per request."""
+        headers = {k: v for k, v in get_headers().items() if k.lower() not in _HOP_BY_HOP}
+        headers.update(overrides or {})
+        return headers
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sync is not None:
+                self._sync.close()
+                self._sync = None
+
+    async def aclose(self) -> None:
+        self.close()
+        await self._async.aclose()
+
+
+_http_pool = None
+
+def get_http_pool() -> HttpPool:
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = HttpPool(
+            max_connections=CONFIG.HTTP_MAX_CONNECTIONS,
+            max_keepalive=CONFIG.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=CONFIG.HTTP_KEEPALIVE_EXPIRY,
+            timeout=CONFIG.HTTP_TIMEOUT,
+            connect_timeout=CONFIG.HTTP_CONNECT_TIMEOUT,
+            http2=CONFIG.HTTP2
+        )
+    return _http_pool
@@ -0,0 +1,48 @@
+# job_worker.py
+"""
+Standalone worker for background analysis jobs (see jobs.py).
+
+Runs the job workers without the HTTP API, so NLP / LLM capacity can be scaled
+separately from request handling. Only useful with a shared queue
+(JOB_QUEUE_BACKEND=redis); the API can then run with JOB_WORKERS=0.
+
+Run from backend/:
+    JOB_QUEUE_BACKEND=redis python -m app.job_worker --workers 4
+"""
+import argparse
+import asyncio
+
+from .config import CONFIG
+from .http_pool import get_http_pool
+from .jobs import get_job_runner
+from .llm_client import get_llm_client
+from .utils.model_registry import registry
+from .utils.sentiment_engine import get_engine
+
+
+async def serve(workers: int) -> None:
+    await asyncio.to_thread(registry.warmup, CONFIG.WARMUP_MODELS)
+    runner = get_job_runner()
+    runner.start(workers)
+    print(f"Job worker: {workers} workers on the {runner.queue.backend} queue")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.stop()
+        get_engine().shutdown()
+        await get_llm_client().aclose()
+        await get_http_pool().aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(1, CONFIG.JOB_WORKERS))
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
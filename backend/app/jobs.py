@@ -0,0 +1,333 @@
+# jobs.py
+"""
+Background analysis jobs.
+
+POST /m3/jobs enqueues an analysis and returns a job id right away; workers drain
+the queue and run the same run_m3_analysis pipeline as /m3/analyze, saving every
+stage as it finishes, so GET /m3/jobs/{id} shows partial results while the job runs
+and the full response once it is done.
+
+Queue backends (JOB_QUEUE_BACKEND):
+    local  bounded in-process queue and job table; the API process runs the workers
+    redis  Redis list (LPUSH / BLMOVE, Redis >= 6.2) plus one JSON record per job with a
+           TTL, shared by every API process and by `python -m app.job_worker` processes on
+           other nodes. A dequeued id moves to a processing list and its worker holds a
+           lease (renewed on every save); ids whose lease expired because the worker died
+           are pushed back onto the queue.
+
+Jobs that fail with a server-side error (5xx, exceptions) are retried with
+exponential backoff up to JOB_MAX_ATTEMPTS; client errors (bad URL, no comments)
+fail straight away. Enqueueing fails once JOB_QUEUE_MAX jobs are waiting.
+"""
+import asyncio
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .cache import RespClient
+from .config import CONFIG
+from .m3_pipeline import run_m3_analysis
+from .metrics import JOBS
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def new_job(params: Dict[str, Any], max_attempts: int) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4().hex,
+        "status": "queued",
+        "params": params,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "stages": {},
+        "ideas": [],
+        "result": None,
+        "error": None,
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+class JobQueue:
+    """Queue of job ids plus the job records themselves."""
+    backend = ""
+
+    def enqueue(self, job: Dict[str, Any], force: bool = False) -> bool:
+        """Saves and queues the job; False when the queue is full (force skips the bound)."""
+        raise NotImplementedError
+
+    def dequeue(self, timeout: float = 1.0) -> Optional[str]:
+        """Blocks up to timeout seconds for the next job id."""
+        raise NotImplementedError
+
+    def ack(self, job_id: str) -> None:
+        """The dequeued job is finished with (done, failed, or queued again)."""
+
+    def save(self, job: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def depth(self) -> int:
+        raise NotImplementedError
+
+
+class LocalJobQueue(JobQueue):
+    """In-process stand-in for a shared queue. Finished jobs are kept for `ttl` seconds."""
+    backend = "local"
+
+    def __init__(self, max_size: int = 100, ttl: int = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        now = time.monotonic()
+        for job_id in [j for j, exp in self._expires.items() if exp < now]:
+            self._jobs.pop(job_id, None)
+            self._expires.pop(job_id, None)
+
+    def enqueue(self, job, force=False):
+        with self._lock:
+            if not force and self._queue.qsize() >= self.max_size:
+                return False
+            self._prune()
+            self._jobs[job["id"]] = json.loads(json.dumps(job, default=str))
+            self._queue.put(job["id"])
+        return True
+
+    def dequeue(self, timeout=1.0):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def save(self, job):
+        with self._lock:
+            self._jobs[job["id"]] = json.loads(json.dumps(job, default=str))
+            if job["status"] in ("done", "failed"):
+                self._expires[job["id"]] = time.monotonic() + self.ttl
+
+    def load(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job is not None else None
+
+    def depth(self):
+        return self._queue.qsize()
+
+
+class RedisJobQueue(JobQueue):
+    backend = "redis"
+
+    def __init__(self, url: str, max_size: int = 100, ttl: int = 3600, prefix: str = "agenticeye:jobs:",
+                 lease_ttl: int = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.prefix = prefix
+        self.lease_ttl = lease_ttl
+        self.client = RespClient(url)
+        # BLMOVE holds its connection until a job arrives, so it gets its own socket
+        self.blocking = RespClient(url, timeout=5.0)
+        self._next_reclaim = 0.0
+
+    def _lease(self, job_id):
+        self.client.command("SET", self.prefix + "lease:" + job_id, "1", "EX", str(self.lease_ttl))
+
+    def enqueue(self, job, force=False):
+        if not force and self.depth() >= self.max_size:
+            return False
+        self.save(job)
+        self.client.command("LPUSH", self.prefix + "queue", job["id"])
+        return True
+
+    def dequeue(self, timeout=1.0):
+        if time.monotonic() >= self._next_reclaim:
+            self.reclaim()
+            self._next_reclaim = time.monotonic() + self.lease_ttl / 2
+        reply = self.blocking.command("BLMOVE", self.prefix + "queue", self.prefix + "processing",
+                                      "RIGHT", "LEFT", str(max(1, int(timeout))))
+        if reply is None:
+            return None
+        job_id = reply.decode()
+        self._lease(job_id)
+        return job_id
+
+    def ack(self, job_id):
+        self.client.command("LREM", self.prefix + "processing", "1", job_id)
+        self.client.command("DEL", self.prefix + "lease:" + job_id)
+
+    def reclaim(self) -> int:
+        """Puts jobs whose worker stopped renewing its lease back on the queue."""
+        reclaimed = 0
+        for raw in self.client.command("LRANGE", self.prefix + "processing", "0", "-1") or []:
+            job_id = raw.decode()
+            if self.client.command("EXISTS", self.prefix + "lease:" + job_id):
+                continue
+            # LREM is atomic, so only one process re-queues a given job
+            if self.client.command("LREM", self.prefix + "processing", "1", job_id):
+                self.client.command("RPUSH", self.prefix + "queue", job_id)
+                reclaimed += 1
+        return reclaimed
+
+    def save(self, job):
+        self.client.command("SET", self.prefix + job["id"], json.dumps(job, default=str), "EX", str(self.ttl))
+        if job["status"] in ("running", "retrying"):
+            self._lease(job["id"])
+
+    def load(self, job_id):
+        raw = self.client.command("GET", self.prefix + job_id)
+        return json.loads(raw) if raw is not None else None
+
+    def depth(self):
+        return self.client.command("LLEN", self.prefix + "queue") or 0
+
+
+def make_job_queue(backend: str = "local", max_size: int = 100, ttl: int = 3600, redis_url: str = "",
+                   lease_ttl: int = 300) -> JobQueue:
+    backend = (backend or "local").lower()
+    if backend == "local":
+        return LocalJobQueue(max_size, ttl)
+    if backend == "redis":
+        return RedisJobQueue(redis_url or "redis://localhost:6379/0", max_size, ttl, lease_ttl=lease_ttl)
+    raise ValueError(f"Unknown job queue backend: {backend}")
+
+
+class JobFailed(Exception):
+
+    def __init__(self, error: Dict[str, Any], retryable: bool):
+        super().__init__(error.get("error", "Job failed"))
+        self.error = error
+        self.retryable = retryable
+
+
+class JobRunner:
+    """Submits jobs to a JobQueue and runs a pool of asyncio workers that drain it."""
+
+    def __init__(self, job_queue: JobQueue, max_attempts: int = 3, retry_backoff: float = 2.0):
+        self.queue = job_queue
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._workers = []
+        self._retries = set()
+
+    def submit(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queues a job; returns None when the queue is full."""
+        job = new_job(params, self.max_attempts)
+        if not self.queue.enqueue(job):
+            JOBS.inc(status="rejected")
+            return None
+        JOBS.inc(status="queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.queue.load(job_id)
+
+    def start(self, workers: int) -> None:
+        for _ in range(workers):
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def stop(self) -> None:
+        for task in self._workers + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._retries = set()
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job_id = await asyncio.to_thread(self.queue.dequeue, 1.0)
+            except (OSError, ConnectionError, RuntimeError) as e:
+                print(f"Job queue unavailable: {e}")
+                await asyncio.sleep(self.retry_backoff)
+                continue
+            if job_id:
+                await self.run(job_id)
+
+    async def run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.queue.load, job_id)
+        if job is None or job["status"] in ("done", "failed"):
+            await asyncio.to_thread(self.queue.ack, job_id)
+            return
+        # A retry starts over: stages and ideas from the failed attempt are dropped
+        job.update(status="running", attempts=job["attempts"] + 1, error=None, stages={}, ideas=[],
+                   result=None, updated_at=_now())
+        await asyncio.to_thread(self.queue.save, job)
+
+        try:
+            async for event, data in run_m3_analysis(**job["params"]):
+                if event == "error":
+                    status = data.get("status", 500)
+                    raise JobFailed(data, retryable=status >= 500)
+                if event == "result":
+                    job["result"] = data
+                elif event == "idea":
+                    job["ideas"].append(data)
+                else:
+                    job["stages"][event] = data
+                job["updated_at"] = _now()
+                # Saved after every stage so pollers see partial results
+                await asyncio.to_thread(self.queue.save, job)
+            job.update(status="done", updated_at=_now())
+            JOBS.inc(status="done")
+        except asyncio.CancelledError:
+            # Shutting down mid-job: put it back for another worker
+            job.update(status="queued", updated_at=_now())
+            await asyncio.to_thread(self.queue.enqueue, job, True)
+            await asyncio.to_thread(self.queue.ack, job_id)
+            raise
+        except Exception as e:
+            error = e.error if isinstance(e, JobFailed) else {"error": str(e), "status": 500}
+            retryable = e.retryable if isinstance(e, JobFailed) else True
+            job.update(error=error, updated_at=_now())
+            if retryable and job["attempts"] < job["max_attempts"]:
+                job["status"] = "retrying"
+                delay = self.retry_backoff * 2 ** (job["attempts"] - 1)
+                task = asyncio.create_task(self._requeue_later(job, delay))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+                JOBS.inc(status="retried")
+            else:
+                job["status"] = "failed"
+                JOBS.inc(status="failed")
+        await asyncio.to_thread(self.queue.save, job)
+        if job["status"] != "retrying":
+            await asyncio.to_thread(self.queue.ack, job_id)
+
+    async def _requeue_later(self, job: Dict[str, Any], delay: float) -> None:
+        await asyncio.sleep(delay)
+        job.update(status="queued", updated_at=_now())
+        # Retries bypass the bound: the job was already admitted once
+        await asyncio.to_thread(self.queue.enqueue, job, True)
+        # Held until now so a crash during the backoff still leaves the job reclaimable
+        await asyncio.to_thread(self.queue.ack, job["id"])
+
+
+_runner = None
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(
+            make_job_queue(
+                CONFIG.JOB_QUEUE_BACKEND,
+                max_size=CONFIG.JOB_QUEUE_MAX,
+                ttl=CONFIG.JOB_TTL,
+                redis_url=CONFIG.JOB_REDIS_URL,
+                lease_ttl=CONFIG.JOB_LEASE_TTL,
+            ),
+            max_attempts=CONFIG.JOB_MAX_ATTEMPTS,
+            retry_backoff=CONFIG.JOB_RETRY_BACKOFF,
+        )
+    return _runner
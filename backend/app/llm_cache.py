@@ -0,0 +1,111 @@
+# llm_cache.py
+"""
+Persistent cache of parsed DeepSeek results for generate_m3.
+
+Keys are a fingerprint of the prompt inputs (normalized + sorted topics and
+questions, tier, model), so the same context is only sent to the LLM once per TTL.
+With LLM_CACHE_SIMILARITY > 0, a miss falls back to the cached result whose topic
+set overlaps the requested one by at least that Jaccard ratio (same tier and model).
+Storage uses the cache.py backends, so TTL / size eviction come from there.
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from .cache import BaseCache, make_cache
+from .config import CONFIG
+
+
+def normalize(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", str(text).lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def fingerprint(topics: List[str], questions: List[str], tier: str, model: str) -> str:
+    canonical = json.dumps({
+        "topics": sorted({normalize(t) for t in topics if normalize(t)}),
+        "questions": sorted({normalize(q) for q in questions if normalize(q)}),
+        "tier": tier.lower(),
+        "model": model,
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def jaccard(a, b) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class LLMResultCache:
+
+    def __init__(self, cache: BaseCache, similarity: float = 0.0, index_size: int = 500):
+        self.cache = cache
+        self.similarity = similarity
+        self.index_size = index_size
+        self.similar_hits = 0
+        self._lock = threading.Lock()
+
+    def _index_key(self, tier: str, model: str) -> str:
+        return f"index:{tier.lower()}:{model}"
+
+    def get(self, topics: List[str], questions: List[str], tier: str, model: str) -> Optional[Dict[str, Any]]:
+        key = fingerprint(topics, questions, tier, model)
+        result = self.cache.get(f"result:{key}")
+        if result is None and self.similarity > 0:
+            result = self._get_similar(topics, tier, model)
+        return copy.deepcopy(result) if result is not None else None
+
+    def _get_similar(self, topics, tier, model):
+        wanted = {normalize(t) for t in topics if normalize(t)}
+        best, best_score = None, self.similarity
+        for entry_topics, key in self.cache.peek(self._index_key(tier, model)) or []:
+            score = jaccard(wanted, set(entry_topics))
+            if score >= best_score:
+                best, best_score = key, score
+        if best is None:
+            return None
+        result = self.cache.peek(f"result:{best}")
+        if result is not None:
+            with self._lock:
+                self.similar_hits += 1
+        return result
+
+    def set(self, topics: List[str], questions: List[str], tier: str, model: str, result: Dict[str, Any]) -> None:
+        key = fingerprint(topics, questions, tier, model)
+        self.cache.set(f"result:{key}", result)
+        if self.similarity > 0:
+            # Small per-tier/model index of topic sets, newest last, for similarity lookups
+            with self._lock:
+                index_key = self._index_key(tier, model)
+                index = [e for e in (self.cache.peek(index_key) or []) if e[1] != key]
+                index.append([sorted({normalize(t) for t in topics if normalize(t)}), key])
+                self.cache.set(index_key, index[-self.index_size:])
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["similar_hits"] = self.similar_hits
+        stats["similarity_threshold"] = self.similarity
+        return stats
+
+
+_llm_cache = None
+
+def get_llm_cache() -> LLMResultCache:
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResultCache(
+            make_cache(
+                CONFIG.LLM_CACHE_BACKEND,
+                ttl=CONFIG.LLM_CACHE_TTL,
+                max_entries=CONFIG.LLM_CACHE_MAX_ENTRIES,
+                sqlite_path=CONFIG.LLM_CACHE_SQLITE_PATH,
+                redis_url=CONFIG.CACHE_REDIS_URL,
+                namespace="llm",
+            ),
+            similarity=CONFIG.LLM_CACHE_SIMILARITY,
+        )
+    return _llm_cache
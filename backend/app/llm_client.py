@@ -0,0 +1,253 @@
+# llm_client.py
+"""
+Async OpenRouter client: one pooled keep-alive httpx.AsyncClient per process and
+a token-bucket rate limiter sized to the provider's requests-per-minute.
+
+Set LLM_RATE_LIMIT_FILE to share the bucket between worker processes on the same
+host (state is kept in that file under an exclusive flock).
+
+429 and 5xx responses are retried up to LLM_MAX_RETRIES times, after the server's
+Retry-After (capped at RETRY_MAX_WAIT seconds) or an exponential backoff; every
+retry takes a new token from the bucket.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+
+from .config import CONFIG
+from .http_pool import PerLoopClient
+from .metrics import OUTBOUND_INFLIGHT, httpx_hooks, record_outbound
+
+OPENROUTER_URL = CONFIG.OPENROUTER_URL
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_MAX_WAIT = 30.0
+
+
+class TokenBucket:
+    """
+    In-process async token bucket: `rate` tokens per second, bursts up to `capacity`.
+    `clock` and `sleep` are injectable so tests can drive time.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = None
+        self._loop = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # asyncio.Lock is bound to one event loop; callers using asyncio.run() get a fresh one
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _take(self) -> float:
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            wait = self._take()
+            while wait > 0:
+                await self.sleep(wait)
+                wait = self._take()
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket whose state lives in a file so several processes share one budget."""
+
+    def __init__(self, path: str, rate: float, capacity: float = 1, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        # Wall-clock time by default: the timestamp is shared with other processes
+        super().__init__(rate, capacity, clock, sleep)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _take(self) -> float:
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                now = self.clock()
+                tokens = state.get("tokens", self.capacity)
+                tokens = min(self.capacity, tokens + (now - state.get("updated", now)) * self.rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"tokens": tokens, "updated": now}))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            wait = await asyncio.to_thread(self._take)
+            while wait > 0:
+                await self.sleep(wait)
+                wait = await asyncio.to_thread(self._take)
+
+
+class LLMClient:
+
+    def __init__(self, api_key: str, rpm: int = 50, max_connections: int = 10,
+                 timeout: float = 60.0, rate_limit_file: str = "", url: str = OPENROUTER_URL,
+                 max_retries: int = 2, limiter: Optional[TokenBucket] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.api_key = api_key
+        self.url = url
+        self.host = httpx.URL(url).host
+        rate = rpm / 60.0
+        self.limiter = limiter or (FileTokenBucket(rate_limit_file, rate) if rate_limit_file else TokenBucket(rate))
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.transport = transport
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0
+        )
+        self._clients = PerLoopClient(lambda: httpx.AsyncClient(
+            limits=self.limits, timeout=self.timeout, transport=self.transport,
+            event_hooks=httpx_hooks(is_async=True)))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._clients.get()
+
+    def headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://viraledge.ai", # Optional
+            "X-Title": "ViralEdge" # Optional
+        }
+
+    def payload(self, prompt, model, temperature, max_tokens):
+        if not self.api_key:
+            raise ValueError("OpenRouter API key missing in .env")
+        return {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+    async def chat(self, prompt: str, model: str = "deepseek/deepseek-chat",
+                   temperature: float = 0.7, max_tokens: int = 4000) -> str:
+        payload = self.payload(prompt, model, temperature, max_tokens)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                with OUTBOUND_INFLIGHT.track_inprogress(host=self.host):
+                    r = await self.client.post(self.url, json=payload, headers=self.headers())
+            except httpx.HTTPError as e:
+                record_outbound(self.url, "error")
+                raise ValueError(f"Network error: {str(e)}")
+            if r.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            await self.sleep(self.retry_delay(r, attempt))
+
+        if r.status_code == 200:
+            return r.json()["choices"][0]["message"]["content"]
+        raise ValueError(f"OpenRouter API error {r.status_code}: {r.text}")
+
+    async def stream_chat(self, prompt: str, model: str = "deepseek/deepseek-chat",
+                          temperature: float = 0.7, max_tokens: int = 4000) -> AsyncIterator[str]:
+        """Yields content deltas as OpenRouter streams them (`stream: true`, SSE)."""
+        payload = self.payload(prompt, model, temperature, max_tokens)
+        payload["stream"] = True
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            try:
+                with OUTBOUND_INFLIGHT.track_inprogress(host=self.host):
+                    async with self.client.stream("POST", self.url, json=payload, headers=self.headers()) as r:
+                        if r.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                            # Nothing has been yielded yet, so the request can simply be repeated
+                            delay = self.retry_delay(r, attempt)
+                        else:
+                            async for delta in self._stream_deltas(r):
+                                yield delta
+                            return
+            except httpx.HTTPError as e:
+                record_outbound(self.url, "error")
+                raise ValueError(f"Network error: {str(e)}")
+            await self.sleep(delay)
+            attempt += 1
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Seconds before the next attempt: the server's Retry-After, else 1, 2, 4, ..."""
+        try:
+            delay = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            delay = 2.0 ** attempt
+        return min(max(delay, 0.0), RETRY_MAX_WAIT)
+
+    async def _stream_deltas(self, r: httpx.Response) -> AsyncIterator[str]:
+        if r.status_code != 200:
+            body = (await r.aread()).decode(errors="replace")
+            raise ValueError(f"OpenRouter API error {r.status_code}: {body}")
+        async for line in r.aiter_lines():
+            # SSE: "data: {...}" lines; ": OPENROUTER PROCESSING" comments keep the connection alive
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            except (ValueError, KeyError, IndexError):
+                continue
+            if delta:
+                yield delta
+
+    async def aclose(self) -> None:
+        await self._clients.aclose()
+
+
+_llm_client = None
+
+def get_llm_client() -> LLMClient:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient(
+            CONFIG.OPENROUTER_API_KEY,
+            rpm=CONFIG.OPENROUTER_RPM,
+            max_connections=CONFIG.LLM_MAX_CONNECTIONS,
+            timeout=CONFIG.LLM_TIMEOUT,
+            rate_limit_file=CONFIG.LLM_RATE_LIMIT_FILE,
+            url=CONFIG.OPENROUTER_URL,
+            max_retries=CONFIG.LLM_MAX_RETRIES
+        )
+    return _llm_client
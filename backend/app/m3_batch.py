@@ -0,0 +1,186 @@
+# m3_batch.py
+"""
+Batch form of /m3/analyze for many YouTube URLs (POST /m3/analyze/batch).
+
+URLs are deduped by video id, and cached responses are returned straight away. The
+remaining videos are downloaded with at most BATCH_FETCH_CONCURRENCY fetches at once.
+Each time downloads finish, everything downloaded so far is analysed together: one
+sentiment pool pass over all of those comment sets, then per-video TF-IDF and questions.
+Each video's DeepSeek call then goes out through the shared, rate-limited LLM client.
+Results are yielded per input URL as soon as that video is done (duplicates get the same
+payload), followed by one "done" summary:
+
+    ("result", {"url", "video_id", "data"})
+    ("error",  {"url", "video_id", "error", "status"})
+    ("done",   {"urls", "unique_videos", "cached", "failed", "seconds"})
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from .cache import get_cache, analyze_cache_key
+from .comment_store import get_comment_store, refresh_youtube
+from .config import CONFIG
+from .m3_ideas import generate_m3, calculate_viral_score
+from .m3_pipeline import Stage, build_ai_context, build_response
+from .metrics import STAGE_SECONDS
+from .pipelines.youtube import stream_youtube_comments
+from .utils.model_registry import registry
+from .utils.nlp_utils import CommentAnalysis
+from .utils.text_utils import extract_video_id
+
+
+def watch_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+async def fetch_comments(url: str, video_id: str, limit: int) -> List[Dict[str, Any]]:
+    """All comments for one video, via the comment store's delta fetch when it has seen it."""
+    store = get_comment_store() if CONFIG.COMMENT_STORE_ENABLED else None
+    if store and store.has_video("youtube", video_id):
+        data = await asyncio.to_thread(refresh_youtube, store, url, limit)
+        if "error" in data:
+            raise ValueError(data["error"])
+        return data["comments"]
+    comments = []
+    async for batch in stream_youtube_comments(url, max_comments=limit):
+        comments.extend(batch)
+    if store and comments:
+        await asyncio.to_thread(store.add_comments, "youtube", video_id, comments)
+    return comments
+
+
+def analyze_many(comment_sets: List[List[Dict[str, Any]]]) -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+    """CommentAnalysis for several videos, with sentiment scored in a single pool pass."""
+    analyses = [CommentAnalysis() for _ in comment_sets]
+    texts = [analysis.add(comments) for analysis, comments in zip(analyses, comment_sets)]
+    start = time.perf_counter()
+    labels = registry.get("textblob_pool").labels_many(texts)
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="sentiment")
+    results = []
+    for analysis, set_labels in zip(analyses, labels):
+        analysis.score(set_labels)
+        results.append((analysis.result(), analysis.timings))
+    return results
+
+
+async def run_m3_batch(urls: List[str], tier: str = "Free", limit: int = 100,
+                       refresh: bool = False, concurrency: int = 0) -> AsyncIterator[Stage]:
+    started = time.perf_counter()
+    concurrency = concurrency or CONFIG.BATCH_FETCH_CONCURRENCY
+    cache = get_cache()
+
+    groups: Dict[str, List[str]] = {}
+    failed = cached_count = 0
+    for url in urls:
+        video_id = extract_video_id(url)
+        if not video_id:
+            failed += 1
+            yield "error", {"url": url, "video_id": None, "error": "Invalid YouTube URL", "status": 400}
+            continue
+        groups.setdefault(video_id, []).append(url)
+
+    def per_url(video_id, event, data):
+        for url in groups[video_id]:
+            if event == "result":
+                yield "result", {"url": url, "video_id": video_id, "data": data}
+            else:
+                yield "error", {"url": url, "video_id": video_id, **data}
+
+    to_fetch = []
+    for video_id in groups:
+        hit = None if refresh else await asyncio.to_thread(
+            cache.get, analyze_cache_key(watch_url(video_id), limit, "youtube", tier))
+        if hit is not None:
+            cached_count += 1
+            for stage in per_url(video_id, "result", hit):
+                yield stage
+        else:
+            to_fetch.append(video_id)
+
+    finished: asyncio.Queue = asyncio.Queue()  # (video_id, event, data) once a video is done
+    downloaded: asyncio.Queue = asyncio.Queue()  # (video_id, comments) or None for a failed fetch
+    fetch_slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    def spawn(coro):
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def fetch(video_id):
+        url = watch_url(video_id)
+        async with fetch_slots:
+            start = time.perf_counter()
+            try:
+                comments = await fetch_comments(url, video_id, limit)
+            except Exception as e:
+                await finished.put((video_id, "error", {"error": f"YouTube Error: {e}", "status": 502}))
+                await downloaded.put(None)
+                return
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="fetch")
+        if not comments:
+            await finished.put((video_id, "error", {"error": "No comments found or video is private.", "status": 400}))
+            await downloaded.put(None)
+            return
+        await downloaded.put((video_id, comments))
+
+    async def generate(video_id, comments, nlp_results):
+        url = watch_url(video_id)
+        try:
+            ai_context = build_ai_context(url, "youtube", tier, nlp_results, comments)
+            viral_score = calculate_viral_score(ai_context)
+            with STAGE_SECONDS.time(stage="llm"):
+                m3_results = await generate_m3(ai_context, tier=tier, viral_score=viral_score)
+            response_data = build_response(nlp_results, m3_results, comments)
+            await asyncio.to_thread(cache.set, analyze_cache_key(url, limit, "youtube", tier), response_data)
+            await finished.put((video_id, "result", response_data))
+        except Exception as e:
+            await finished.put((video_id, "error", {"error": str(e), "status": 500}))
+
+    async def analyze():
+        # Micro-batches: everything that finished downloading since the last pass is
+        # analysed together, so early videos don't wait for the slowest download
+        pending = len(to_fetch)
+        while pending:
+            items = [await downloaded.get()]
+            while not downloaded.empty():
+                items.append(downloaded.get_nowait())
+            pending -= len(items)
+            items = [item for item in items if item is not None]
+            if not items:
+                continue
+            try:
+                results = await asyncio.to_thread(analyze_many, [comments for _, comments in items])
+            except Exception as e:
+                for video_id, _ in items:
+                    await finished.put((video_id, "error", {"error": str(e), "status": 500}))
+                continue
+            for (video_id, comments), (nlp_results, timings) in zip(items, results):
+                for stage in ("clean", "questions", "topics"):
+                    STAGE_SECONDS.observe(timings[stage], stage=stage)
+                spawn(generate(video_id, comments, nlp_results))
+
+    for video_id in to_fetch:
+        spawn(fetch(video_id))
+    spawn(analyze())
+
+    try:
+        for _ in range(len(to_fetch)):
+            video_id, event, data = await finished.get()
+            if event == "error":
+                failed += len(groups[video_id])
+            for stage in per_url(video_id, event, data):
+                yield stage
+    finally:
+        # Client went away (or we're done): stop any fetches / LLM calls still running
+        for task in list(tasks):
+            task.cancel()
+
+    yield "done", {
+        "urls": len(urls),
+        "unique_videos": len(groups),
+        "cached": cached_count,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
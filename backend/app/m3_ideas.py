@@ -1,46 +1,23 @@
+import asyncio
 import json
 import re
-import requests
-import time
 from .config import CONFIG
+from .llm_client import get_llm_client
+from .llm_cache import get_llm_cache
+from .utils.json_stream import IncrementalJSONParser
 from datetime import datetime
 
-# Rate limiting (AI/ML API free tier: 50 RPM)
-last_call = 0
-DELAY = 1.2
+async def call_openrouter_deepseek(prompt: str) -> str:
+    # Pooled keep-alive client; rate limiting (AI/ML API free tier: 50 RPM) is a shared token bucket
+    return await get_llm_client().chat(prompt, model=CONFIG.LLM_MODEL)
 
-def call_openrouter_deepseek(prompt: str) -> str:
-    global last_call
-    while time.time() - last_call < DELAY:
-        time.sleep(0.1)
-    
-    if not CONFIG.OPENROUTER_API_KEY:
-        raise ValueError("OpenRouter API key missing in .env")
-
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {CONFIG.OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://viraledge.ai", # Optional
-        "X-Title": "ViralEdge" # Optional
-    }
-    payload = {
-        "model": "deepseek/deepseek-chat", # OpenRouter model ID
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.7,
-        "max_tokens": 4000
-    }
-    
-    try:
-        r = requests.post(url, json=payload, headers=headers, timeout=60)
-        last_call = time.time()
-        
-        if r.status_code == 200:
-            return r.json()["choices"][0]["message"]["content"]
-        else:
-            raise ValueError(f"OpenRouter API error {r.status_code}: {r.text}")
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Network error: {str(e)}")
+async def stream_openrouter_deepseek(prompt: str):
+    async for chunk in get_llm_client().stream_chat(prompt, model=CONFIG.LLM_MODEL):
+        yield chunk
+
+# Parts of the DeepSeek JSON that are handed out as soon as they are complete
+IDEA_PATH = ("ai_recommendations", "next_best_content", "*")
+SEO_PATH = ("seo_keyword_generator",)
 
 def repair_json(json_str: str) -> str:
     """Attempts to repair truncated JSON by closing open braces/brackets."""
@@ -115,11 +92,33 @@ def calculate_viral_score(m2_data):
     
     return round(min(100, max(0, raw_score)))
 
-def generate_m3(m2_data, tier="Free"):
+async def generate_m3(m2_data, tier="Free", viral_score=None):
     """
     Generates M3 insights (Viral Score, Content Ideas) using DeepSeek or Fallback.
+    Pass viral_score when it was already computed (e.g. streamed to the client) to keep it consistent.
     """
-    viral_score = calculate_viral_score(m2_data)
+    result = None
+    async for event, value in stream_m3(m2_data, tier, viral_score):
+        if event == "m3":
+            result = value
+    return result
+
+def fallback_seo(topics):
+    return {
+        "primary_keywords": topics[:5],
+        "secondary_keywords": ["Viral", "Trending"],
+        "search_volume": {"Key1": "Unknown"}
+    }
+
+async def stream_m3(m2_data, tier="Free", viral_score=None):
+    """
+    Streaming form of generate_m3. Yields ("idea", idea) for each content idea as soon as
+    DeepSeek finishes writing it, ("seo_keyword_generator", block) when that closes, and
+    finally ("m3", result) with the same shape generate_m3 returns. If the response is cut
+    off, the ideas that did finish are kept instead of dropping to the fallback engine.
+    """
+    if viral_score is None:
+        viral_score = calculate_viral_score(m2_data)
     
     # Generate reasons based on the score components
     reasons = []
@@ -180,17 +179,61 @@ def generate_m3(m2_data, tier="Free"):
     """
 
     try:
-        # Call DeepSeek
-        raw_response = call_openrouter_deepseek(prompt)
-        
-        # Parse Response
-        match = re.search(r"\{[\s\S]*\}", raw_response)
-        if match:
-            json_str = match.group(0)
-            result = json.loads(json_str)
+        llm_cache = get_llm_cache()
+        result = await asyncio.to_thread(llm_cache.get, topics, questions, tier, CONFIG.LLM_MODEL)
+        if result is not None:
+            # Same prompt context seen before: reuse the ideas, with this run's score
+            for idea in result.get("ai_recommendations", {}).get("next_best_content", []):
+                idea["score"] = viral_score
+                yield "idea", idea
+            if "seo_keyword_generator" in result:
+                yield "seo_keyword_generator", result["seo_keyword_generator"]
+        elif CONFIG.LLM_STREAM:
+            # Call DeepSeek with stream: true and parse the JSON as it arrives
+            parser = IncrementalJSONParser({IDEA_PATH: "idea", SEO_PATH: "seo_keyword_generator"})
+            ideas, seo = [], None
+            try:
+                async for chunk in stream_openrouter_deepseek(prompt):
+                    for event, value in parser.feed(chunk):
+                        if event == "complete":
+                            result = value
+                            continue
+                        if event == "idea":
+                            ideas.append(value)
+                        else:
+                            seo = value
+                        yield event, value
+            except Exception as e:
+                if not ideas:
+                    raise
+                print(f"DeepSeek stream interrupted: {e}. Keeping {len(ideas)} finished ideas.")
+
+            if result is not None:
+                await asyncio.to_thread(llm_cache.set, topics, questions, tier, CONFIG.LLM_MODEL, result)
+            elif ideas:
+                # Truncated response: keep what finished, don't cache a partial answer
+                result = {
+                    "ai_recommendations": {"next_best_content": ideas},
+                    "seo_keyword_generator": seo or fallback_seo(topics),
+                    "truncated": True
+                }
+            else:
+                raise ValueError("No JSON found")
         else:
-            raise ValueError("No JSON found")
-            
+            # Call DeepSeek
+            raw_response = await call_openrouter_deepseek(prompt)
+
+            # Parse Response
+            match = re.search(r"\{[\s\S]*\}", raw_response)
+            if match:
+                json_str = match.group(0)
+                result = json.loads(json_str)
+            else:
+                raise ValueError("No JSON found")
+            await asyncio.to_thread(llm_cache.set, topics, questions, tier, CONFIG.LLM_MODEL, result)
+            for idea in result.get("ai_recommendations", {}).get("next_best_content", []):
+                yield "idea", idea
+
         # Inject our calculated viral score and reasons
         result["viral_prediction_engine"] = {
             "score": viral_score,
@@ -198,13 +241,13 @@ def generate_m3(m2_data, tier="Free"):
             "reasons": reasons
         }
         result["generated_by"] = "ViralEdge-M3 (DeepSeek Enhanced)"
-        
-        return result
+
+        yield "m3", result
 
     except Exception as e:
         print(f"DeepSeek Failed: {e}. Using Fallback.")
         # Fallback Logic (if AI fails)
-        return {
+        fallback = {
             "viral_prediction_engine": {
                 "score": viral_score,
                 "category": "High" if viral_score > 80 else "Medium",
@@ -224,10 +267,9 @@ def generate_m3(m2_data, tier="Free"):
                     }
                 ]
             },
-            "seo_keyword_generator": {
-                "primary_keywords": topics[:5],
-                "secondary_keywords": ["Viral", "Trending"],
-                "search_volume": {"Key1": "Unknown"}
-            },
+            "seo_keyword_generator": fallback_seo(topics),
             "generated_by": "ViralEdge-M3 (Fallback Engine)"
-        }
\ No newline at end of file
+        }
+        for idea in fallback["ai_recommendations"]["next_best_content"]:
+            yield "idea", idea
+        yield "m3", fallback
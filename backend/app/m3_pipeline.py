@@ -0,0 +1,227 @@
+# m3_pipeline.py
+"""
+The /m3/analyze pipeline as an async generator of (event, data) stages.
+
+/m3/analyze drains it and returns the final "result"; /m3/analyze/stream forwards
+every stage to the client as it happens (SSE or NDJSON). Stage order:
+comments -> sentiment -> topics -> questions -> viral_score -> idea (one per idea, as each
+is generated) -> seo_keyword_generator -> result.
+A failure yields a single "error" stage carrying an HTTP status.
+
+With a sample budget smaller than the comments fetched, only a stratified sample
+is analyzed (sampling.py); m2_analysis["sampling"] then holds the sample sizes and
+the sentiment confidence intervals.
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .cache import get_cache, analyze_cache_key
+from .comment_store import get_comment_store, refresh_youtube
+from .config import CONFIG
+from .m3_ideas import stream_m3, calculate_viral_score
+from .metrics import STAGE_SECONDS
+from .pipelines.youtube import stream_youtube_comments, get_video_id
+from .sampling import StratifiedSample
+from .utils.nlp_utils import CommentAnalysis
+from .utils.sentiment_engine import get_engine
+
+Stage = Tuple[str, Dict[str, Any]]
+
+
+def _ideas(m3_results):
+    return m3_results.get("ai_recommendations", {}).get("next_best_content", [])
+
+
+def _replay(response_data) -> List[Stage]:
+    """Stages for a cached response, so streaming clients see the same events."""
+    nlp_results = response_data.get("m2_analysis", {})
+    stages = [
+        ("comments", {"count": nlp_results.get("engagement", {}).get("comments_count", 0), "cached": True}),
+        ("sentiment", response_data.get("sentiment", {})),
+        ("topics", {"topics": response_data.get("topics", [])}),
+        ("questions", {"questions": nlp_results.get("questions", [])}),
+        ("viral_score", {"score": response_data.get("viral_score")}),
+    ]
+    m3_results = response_data.get("m3_generation", {})
+    stages += [("idea", idea) for idea in _ideas(m3_results)]
+    if "seo_keyword_generator" in m3_results:
+        stages.append(("seo_keyword_generator", m3_results["seo_keyword_generator"]))
+    stages.append(("result", response_data))
+    return stages
+
+
+def build_ai_context(url, platform, tier, nlp_results, comments) -> Dict[str, Any]:
+    # We construct a rich prompt context
+    return {
+        "video_url": url,
+        "platform": platform,
+        "tier": tier,
+        "sentiment_summary": nlp_results.get("sentiment", {}),
+        "top_topics": nlp_results.get("topics", [])[:5],
+        "comments_sample": [c["text"] for c in comments[:20]] # Feed top 20 comments to AI
+    }
+
+
+def build_response(nlp_results, m3_results, comments) -> Dict[str, Any]:
+    return {
+        "viral_score": m3_results.get("viral_prediction_engine", {}).get("score", 85), # Fallback to 85 if AI fails
+        "sentiment": nlp_results.get("sentiment", {"positive": 0, "negative": 0, "neutral": 0}),
+        "topics": nlp_results.get("topics", []),
+        "ideas": m3_results.get("content_ideas_agent", {}).get("ideas", []),
+        "full_script": m3_results.get("script_generation_agent", {}).get("script", "Script generation unavailable."),
+        "engagement_metrics": nlp_results.get("engagement_metrics", {
+            "comments_count": len(comments),
+            "total_likes": sum(c.get('votes', 0) for c in comments),
+            "avg_likes": 0
+        }),
+        "m2_analysis": nlp_results, # Keep legacy structure for backward compatibility if needed
+        "m3_generation": m3_results
+    }
+
+
+async def run_m3_analysis(url: str, tier: str = "Free", platform: str = "youtube",
+                          limit: int = 100, refresh: bool = False,
+                          sample: Optional[int] = None) -> AsyncIterator[Stage]:
+    sample = CONFIG.SAMPLE_BUDGET if sample is None else sample
+    # A budget at or above the limit can never trigger sampling; keep the plain cache key
+    sample = sample if 0 < sample < limit else 0
+    cache = get_cache()
+    cache_key = analyze_cache_key(url, limit, platform, tier, sample)
+    if not refresh:
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            for stage in _replay(cached):
+                yield stage
+            return
+
+    try:
+        if platform == "tiktok":
+            # Mock TikTok Analysis for now as we don't have a TikTok scraper
+            m2 = {
+                "topics": [{"topic": "Trending Challenge"}, {"topic": "Viral Sound"}, {"topic": "Dance"}],
+                "questions": [{"text": "What is this song?"}, {"text": "Tutorial please!"}],
+                "sentiment": {"positive": 85},
+                "engagement": {"comments_count": 1200}
+            }
+        # 1 + 2. Fetch Comments and Analyze Sentiment & Topics (NLP)
+        # Comments are streamed in batches; every min_parallel comments are cleaned and
+        # scored in a worker thread while the downloader keeps paging in the next ones.
+        # Corpus-wide steps (TF-IDF topics, percentages) run once at the end.
+        # When sampling, strata need the whole population, so analysis waits for the fetch.
+        analysis = CommentAnalysis()
+        comments = []
+        store = get_comment_store() if CONFIG.COMMENT_STORE_ENABLED else None
+        video_id = get_video_id(url)
+        if not video_id:
+            yield "error", {"error": "YouTube Error: Invalid YouTube URL", "status": 400}
+            return
+        # Fetch failures are upstream (network, YouTube) errors: 502, so background jobs retry them
+        # fetch = time spent waiting on comments, excluding the overlapped analysis
+        fetch_seconds = 0.0
+        if store and video_id and store.has_video("youtube", video_id):
+            # Seen this video before: only page in comments newer than the stored ones
+            start = time.perf_counter()
+            comments_data = await asyncio.to_thread(refresh_youtube, store, url, limit)
+            fetch_seconds = time.perf_counter() - start
+            if "error" in comments_data:
+                yield "error", {"error": f"YouTube Error: {comments_data['error']}", "status": 502}
+                return
+            comments = comments_data["comments"]
+            if not sample:
+                await asyncio.to_thread(analysis.feed, comments)
+        else:
+            try:
+                # Stream batches are small; scoring waits until there are enough comments
+                # for the sentiment pool to spread them over its workers
+                min_feed = get_engine().min_parallel
+                unfed = []
+                start = time.perf_counter()
+                async for batch in stream_youtube_comments(url, max_comments=limit):
+                    fetch_seconds += time.perf_counter() - start
+                    comments.extend(batch)
+                    if not sample:
+                        unfed.extend(batch)
+                        if len(unfed) >= min_feed:
+                            await asyncio.to_thread(analysis.feed, unfed)
+                            unfed = []
+                    start = time.perf_counter()
+                fetch_seconds += time.perf_counter() - start
+                if unfed:
+                    await asyncio.to_thread(analysis.feed, unfed)
+            except Exception as e:
+                yield "error", {"error": f"YouTube Error: {e}", "status": 502}
+                return
+            if store and comments:
+                await asyncio.to_thread(store.add_comments, "youtube", video_id, comments)
+        STAGE_SECONDS.observe(fetch_seconds, stage="fetch")
+
+        if not comments:
+            yield "error", {"error": "No comments found or video is private.", "status": 400}
+            return
+
+        sampled = None
+        if sample:
+            if len(comments) > sample:
+                sampled = StratifiedSample(comments, sample, CONFIG.SAMPLE_RECENCY_BUCKETS,
+                                           CONFIG.SAMPLE_MIN_PER_STRATUM, CONFIG.SAMPLE_CONFIDENCE)
+                await asyncio.to_thread(sampled.feed, analysis)
+            else:
+                await asyncio.to_thread(analysis.feed, comments)
+        yield "comments", {"count": len(comments), **({"sampled": sampled.size} if sampled else {})}
+
+        nlp_results = await asyncio.to_thread(analysis.result)
+        if sampled:
+            nlp_results["sampling"] = sampled.summary()
+            # Engagement is known exactly for every fetched comment, no need to estimate it
+            total_likes = sum(c.get("likes", 0) for c in comments)
+            nlp_results["engagement"] = {
+                "comments_count": len(comments),
+                "total_likes": total_likes,
+                "avg_likes": round(total_likes / len(comments))
+            }
+        for stage, seconds in analysis.timings.items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+        yield "sentiment", nlp_results.get("sentiment", {})
+        yield "topics", {"topics": nlp_results.get("topics", [])}
+        yield "questions", {"questions": nlp_results.get("questions", [])}
+
+        # 3. Generate Viral Ideas & Script (DeepSeek AI)
+        ai_context = build_ai_context(url, platform, tier, nlp_results, comments)
+        with STAGE_SECONDS.time(stage="viral_score"):
+            viral_score = calculate_viral_score(ai_context)
+        yield "viral_score", {"score": viral_score}
+
+        # Ideas are forwarded one by one while DeepSeek is still writing the rest
+        m3_results = {}
+        llm_seconds = 0.0
+        start = time.perf_counter()
+        async for event, value in stream_m3(ai_context, tier=tier, viral_score=viral_score):
+            # Time spent by the client consuming streamed ideas is not LLM time
+            llm_seconds += time.perf_counter() - start
+            if event == "m3":
+                m3_results = value
+            else:
+                yield event, value
+            start = time.perf_counter()
+        STAGE_SECONDS.observe(llm_seconds, stage="llm")
+
+        # 4. Construct Final JSON Response
+        response_data = build_response(nlp_results, m3_results, comments)
+
+        await asyncio.to_thread(cache.set, cache_key, response_data)
+        yield "result", response_data
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield "error", {"error": str(e), "trace": traceback.format_exc(), "status": 500}
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def format_ndjson(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
@@ -0,0 +1,234 @@
+# metrics.py
+"""
+In-process metrics rendered in the Prometheus text exposition format (GET /metrics).
+
+Counters, gauges and histograms with labels, plus collectors that are read at
+scrape time (cache hit ratios). Kept dependency-free; values are per process, so
+run one scrape target per worker. Metrics defined here:
+
+    http_requests_total / http_request_duration_seconds / http_requests_in_flight
+    pipeline_stage_duration_seconds{stage}   fetch, clean, sentiment, questions, topics, viral_score, llm
+    outbound_requests_total{host,status}     every scraper / LLM HTTP call ("error" when no response)
+    outbound_requests_in_flight{host}
+    jobs_total{status}                       background jobs queued / rejected / retried / done / failed
+    cache_hits_total / cache_misses_total / cache_hit_ratio{cache}
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_labels(zip(self.labelnames, key))} {_number(v)}"
+                    for key, v in sorted(self._values.items())]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"] + self.samples()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["counts"][i] += 1
+                    break
+            entry["sum"] += value
+            entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, entry in sorted(self._values.items()):
+                pairs = list(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, n in zip(self.buckets, entry["counts"]):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(pairs)} {_number(entry['sum'])}")
+                lines.append(f"{self.name}_count{_labels(pairs)} {entry['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric plus collectors: callables returning extra exposition lines at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests served.", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to produce the response (headers, for streams).", ("method", "route")))
+HTTP_INFLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "pipeline_stage_duration_seconds", "Time spent per /m3/analyze pipeline stage, per request.", ("stage",)))
+OUTBOUND_REQUESTS = REGISTRY.register(Counter(
+    "outbound_requests_total", "Outbound HTTP calls by host and status.", ("host", "status")))
+OUTBOUND_INFLIGHT = REGISTRY.register(Gauge(
+    "outbound_requests_in_flight", "Outbound HTTP calls currently waiting on a host.", ("host",)))
+JOBS = REGISTRY.register(Counter(
+    "jobs_total", "Background analysis job transitions.", ("status",)))
+
+
+def record_outbound(url, status) -> None:
+    host = urlparse(str(url)).hostname or "unknown"
+    OUTBOUND_REQUESTS.inc(host=host, status=str(status))
+
+
+def _httpx_response(response) -> None:
+    record_outbound(response.request.url, response.status_code)
+
+
+async def _httpx_response_async(response) -> None:
+    _httpx_response(response)
+
+
+def httpx_hooks(is_async: bool = False) -> Dict[str, list]:
+    """event_hooks for httpx clients so every response is counted."""
+    return {"response": [_httpx_response_async if is_async else _httpx_response]}
+
+
+def requests_hook(response, *args, **kwargs):
+    """requests Session response hook (the YouTube comment downloader)."""
+    record_outbound(response.url, response.status_code)
+    return response
+
+
+def cache_collector(caches: Dict[str, Callable[[], dict]]) -> Callable[[], List[str]]:
+    """Collector exposing hits / misses / hit ratio for named caches (name -> stats callable)."""
+
+    def collect():
+        stats = {name: get_stats() for name, get_stats in caches.items()}
+        lines = []
+        for metric, key, kind, help in (
+            ("cache_hits_total", "hits", "counter", "Cache lookups answered from the cache."),
+            ("cache_misses_total", "misses", "counter", "Cache lookups that missed."),
+            ("cache_hit_ratio", "hit_ratio", "gauge", "hits / (hits + misses) since start."),
+        ):
+            lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+            lines += [f"{metric}{_labels([('cache', name)])} {_number(s.get(key, 0))}" for name, s in stats.items()]
+        return lines
+
+    return collect
+
+
+def gauge_collector(name: str, help: str, read: Callable[[], float]) -> Callable[[], List[str]]:
+    """Collector for a single unlabelled gauge whose value is read at scrape time."""
+
+    def collect():
+        return [f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {_number(read())}"]
+
+    return collect
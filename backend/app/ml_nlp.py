@@ -1,48 +1,123 @@
 # ml_nlp.py
-from collections import Counter
-from typing import Dict, Any
+"""
+Lexicon NLP over comment text: questions, word-frequency topics, naive sentiment.
+
+Work is split into chunks of comments; each chunk gives a mergeable partial result
+(line count, question list, token Counter, lexicon tallies) and finish() turns the
+merged partial into the response shape. analyze_texts_nlp() streams any iterable of
+comments through the shared worker pool (utils/sentiment_engine), keeping at most two
+chunks per worker in flight, so memory is bounded by the chunk size and vocabulary,
+not by the number of comments.
+"""
+from collections import Counter, deque
+from itertools import chain
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 import re
 
+from .config import CONFIG
+from .utils.sentiment_engine import get_engine
+
+# naive sentiment lexicon (also used by the "lexicon" sentiment backend)
+POS_WORDS = set(["good","love","great","best","awesome","amazing","fun","win","respect","legend","wow","w","nice"])
+NEG_WORDS = set(["bad","suck","hate","worst","terrible","nope","disgust","dislike"])
+# common small words left out of the topics
+STOP_WORDS = set(["the","and","to","of","in","is","it","that","this","a","i","you","we","for","on","with","mrbeast","mr","beast"])
+TOKEN_RE = re.compile(r"[a-zA-Z0-9\#@]{2,}")
+
+
+def analyze_lines(texts: Iterable[str]) -> Dict[str, Any]:
+    """Partial result for one chunk of texts; every line of a multi-line text counts."""
+    questions = []
+    words = Counter()
+    lines = 0
+    for text in texts:
+        for ln in text.splitlines():
+            ln = ln.strip()
+            if not ln:
+                continue
+            lines += 1
+            if ln.endswith("?"):
+                questions.append(ln)
+            words.update(TOKEN_RE.findall(ln.lower()))
+    return {
+        "lines": lines,
+        "questions": questions,
+        "words": words,
+        "positive": sum(words[w] for w in POS_WORDS),
+        "negative": sum(words[w] for w in NEG_WORDS),
+    }
+
+
+def merge(total: Dict[str, Any], partial: Dict[str, Any], max_questions: int = 0) -> Dict[str, Any]:
+    """Folds partial into total (in place). Merge in input order to keep question and tie order."""
+    total["lines"] += partial["lines"]
+    total["questions"].extend(partial["questions"])
+    if max_questions:
+        del total["questions"][max_questions:]
+    total["words"].update(partial["words"])
+    total["positive"] += partial["positive"]
+    total["negative"] += partial["negative"]
+    return total
+
+
+def finish(total: Dict[str, Any]) -> Dict[str, Any]:
+    # keep top 20 excluding common small words
+    topics = [{"topic": w, "count": c} for w, c in total["words"].most_common(50) if w not in STOP_WORDS][:20]
+    pos, neg, lines = total["positive"], total["negative"], total["lines"]
+    return {
+        "questions": [{"author": None, "text": q} for q in total["questions"]],
+        "topics": topics,
+        "topic_counts": {"total_mentions": sum([t["count"] for t in topics])},
+        "sentiment": {"positive": pos, "negative": neg, "neutral": max(0, lines - pos - neg),
+                      "avg_score": (pos - neg) / max(1, lines)}
+    }
+
+
 def analyze_text_nlp(text: str) -> Dict[str, Any]:
     """
     Simple, robust NLP pipeline: tokenization, naive sentiment, extract questions & topics.
     For production you would replace with spaCy / transformers.
     """
-    if not text:
-        return {
-            "questions": [],
-            "topics": [],
-            "topic_counts": {"total_mentions": 0},
-            "sentiment": {"positive": 0, "negative": 0, "neutral": 0, "avg_score": 0.0}
-        }
-
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    questions = [ln for ln in lines if ln.endswith("?")]
-    # topics: naive word frequency (filtered)
-    words = []
-    for ln in lines:
-        tokens = re.findall(r"[a-zA-Z0-9\#@]{2,}", ln.lower())
-        words.extend(tokens)
-    cnt = Counter(words)
-    # keep top 20 excluding common small words
-    stop = set(["the","and","to","of","in","is","it","that","this","a","i","you","we","for","on","with","mrbeast","mr","beast"])
-    topics = [{"topic": w, "count": c} for w, c in cnt.most_common(50) if w not in stop][:20]
-
-    # naive sentiment: count emoticons / positive/negative words
-    pos_words = set(["good","love","great","best","awesome","amazing","fun","win","respect","legend","wow","w","nice"])
-    neg_words = set(["bad","suck","hate","worst","terrible","nope","disgust","dislike"])
-    pos = neg = 0
-    for w in words:
-        if w in pos_words:
-            pos += 1
-        if w in neg_words:
-            neg += 1
-    neutral = max(0, len(lines) - pos - neg)
-    avg_score = (pos - neg) / max(1, len(lines))
+    return finish(analyze_lines([text or ""]))
 
-    return {
-        "questions": [{"author": None, "text": q} for q in questions],
-        "topics": topics,
-        "topic_counts": {"total_mentions": sum([t["count"] for t in topics])},
-        "sentiment": {"positive": pos, "negative": neg, "neutral": neutral, "avg_score": avg_score}
-    }
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for text in texts:
+        chunk.append(text or "")
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_texts_nlp(texts: Iterable[str], chunk_size: Optional[int] = None,
+                      max_questions: Optional[int] = None, engine=None) -> Dict[str, Any]:
+    """
+    analyze_text_nlp over one text per comment, without joining them. Chunks run on
+    the worker pool when there is more than one; a single chunk is analyzed inline.
+    Keeps the first max_questions questions (NLP_MAX_QUESTIONS, 0 = all).
+    """
+    chunk_size = chunk_size or CONFIG.NLP_CHUNK_SIZE
+    max_questions = CONFIG.NLP_MAX_QUESTIONS if max_questions is None else max_questions
+    engine = engine or get_engine()
+    total = analyze_lines([])
+    chunks = _chunks(texts, chunk_size)
+    first = next(chunks, [])
+    second = next(chunks, None)
+    if second is None or engine.workers <= 1:
+        for chunk in chain([first, second or []], chunks):
+            merge(total, analyze_lines(chunk), max_questions)
+        return finish(total)
+
+    # Bounded window: the next chunk is submitted only once the oldest one is merged
+    window = engine.workers * 2
+    pending = deque()
+    for chunk in chain([first, second], chunks):
+        if len(pending) >= window:
+            merge(total, pending.popleft().result(), max_questions)
+        pending.append(engine.submit(analyze_lines, chunk))
+    while pending:
+        merge(total, pending.popleft().result(), max_questions)
+    return finish(total)
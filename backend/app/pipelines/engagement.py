@@ -0,0 +1,36 @@
+# pipelines/engagement.py
+from typing import Dict, Any, List
+from .youtube import parse_votes
+
+
+def _likes(comment: Dict[str, Any]) -> int:
+    # Scrapers give ints, the YouTube downloader gives "1.2K"-style strings
+    return parse_votes(comment.get("likes", comment.get("votes", 0)))
+
+
+def compute_engagement_metrics(source_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Likes and comment counts over the youtube / reddit entries of source_data
+    (the same shape aggregate_signals() takes).
+    """
+    comments: List[Dict[str, Any]] = []
+    per_platform = {}
+    for platform in ("youtube", "reddit"):
+        data = source_data.get(platform) or {}
+        platform_comments = data.get("comments", [])
+        likes = sum(_likes(c) for c in platform_comments)
+        per_platform[platform] = {
+            "comments": data.get("comments_count", len(platform_comments)),
+            "likes": likes,
+        }
+        comments.extend(platform_comments)
+
+    total_likes = sum(p["likes"] for p in per_platform.values())
+    top_comments = sorted(comments, key=_likes, reverse=True)[:5]
+    return {
+        "total_likes": total_likes,
+        "avg_likes": (total_likes / len(comments)) if comments else 0,
+        "total_comments": sum(p["comments"] for p in per_platform.values()),
+        "platforms": per_platform,
+        "top_comments": top_comments,
+    }
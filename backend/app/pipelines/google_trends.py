@@ -1,33 +1,160 @@
-from pytrends.request import TrendReq
-from typing import List, Dict, Any
-from config import CONFIG
+# pipelines/google_trends.py
+"""
+Google Trends interest for any number of terms.
 
-pytrends = TrendReq(hl='en-US', tz=360)
+Trends compares at most 5 keywords per request and scales every request so its own
+peak is 100, so numbers from two requests are not comparable. Longer term lists are
+split into 5-term groups that all contain one shared anchor keyword (TRENDS_ANCHOR,
+or the first term). Each term is stored as its peak relative to the anchor's mean in
+the same group, which puts every group on the anchor's scale. The final numbers are
+rescaled so the highest term is 100 again.
 
-def trends_for_terms(terms: List[str]) -> Dict[str, Any]:
+Groups run concurrently on one long-lived pool of TRENDS_CONCURRENCY threads, each
+with its own TrendReq (TrendReq keeps per-payload state), so the TrendReq sessions
+are reused across calls. Per-term ratios are cached per
+anchor/timeframe for TRENDS_CACHE_TTL seconds, so repeated topics are not requested
+again. Region interest comes from the first group only.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from ..cache import MemoryCache
+from ..config import CONFIG
+
+GROUP_SIZE = 5  # Trends limit per payload, anchor included
+
+
+def _load_pytrends():
+    from pytrends.request import TrendReq
+    return TrendReq(hl='en-US', tz=360)
+
+_local = threading.local()
+
+def _client():
+    """One TrendReq per thread: build_payload() stores the query on the instance."""
+    if getattr(_local, "pytrends", None) is None:
+        _local.pytrends = _load_pytrends()
+    return _local.pytrends
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_trends_executor() -> ThreadPoolExecutor:
+    """Shared by all calls, so each worker thread keeps its TrendReq."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CONFIG.TRENDS_CONCURRENCY, thread_name_prefix="trends")
+    return _executor
+
+
+def shutdown_trends_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+_cache = None
+
+def get_trends_cache() -> MemoryCache:
+    global _cache
+    if _cache is None:
+        _cache = MemoryCache(ttl=CONFIG.TRENDS_CACHE_TTL, max_entries=CONFIG.TRENDS_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def _key(timeframe: str, anchor: str, term: str) -> str:
+    return f"trends:{timeframe}:{anchor.lower()}:{term.lower()}"
+
+
+def make_groups(anchor: str, terms: List[str]) -> List[List[str]]:
+    """[anchor + up to 4 terms] per group; a lone anchor still gets a group of its own."""
+    others = [t for t in terms if t.lower() != anchor.lower()]
+    step = GROUP_SIZE - 1
+    return [[anchor] + others[i:i + step] for i in range(0, len(others), step)] or [[anchor]]
+
+
+def _fetch_group(group: List[str], timeframe: str, region: bool) -> Dict[str, Any]:
+    pytrends = _client()
+    pytrends.build_payload(group, cat=0, timeframe=timeframe, geo='', gprop='')
+    df = pytrends.interest_over_time()
+    out = {"peaks": {}, "anchor_mean": 0.0}
+    if not df.empty:
+        out["peaks"] = {kw: float(df[kw].max()) for kw in group}
+        out["anchor_mean"] = float(df[group[0]].mean())
+    if region:
+        out["region"] = pytrends.interest_by_region(resolution='COUNTRY').head(10).to_dict()
+    return out
+
+
+def trends_for_terms(terms: List[str], timeframe: Optional[str] = None,
+                     anchor: Optional[str] = None) -> Dict[str, Any]:
+    # Dedupe case-insensitively, keeping the caller's order and spelling
+    seen = set()
+    terms = [t for t in (t.strip() for t in terms) if t and not (t.lower() in seen or seen.add(t.lower()))]
     if not terms:
         return {"interest_over_time": {}, "top_terms": []}
 
-    try:
-        kw_list = terms[:5]  # max 5 keywords
-        pytrends.build_payload(
-            kw_list,
-            cat=0,
-            timeframe=CONFIG.PYTRENDS_TIMEFRAME,
-            geo='',
-            gprop=''
-        )
-
-        df = pytrends.interest_over_time()
+    timeframe = timeframe or CONFIG.PYTRENDS_TIMEFRAME
+    anchor = anchor or CONFIG.TRENDS_ANCHOR or terms[0]
+    anchor = next((t for t in terms if t.lower() == anchor.lower()), anchor)
+    cache = get_trends_cache()
 
-        if df.empty:
-            iot = {}
-        else:
-            iot = {kw: int(df[kw].max()) for kw in kw_list}
+    ratios = {}
+    for term in terms + [anchor]:
+        cached = cache.get(_key(timeframe, anchor, term))
+        if cached is not None:
+            ratios[term] = cached
+    missing = [t for t in terms if t not in ratios]
+    if anchor not in ratios and not missing:
+        missing = [anchor]
+    cached_terms = len([t for t in terms if t in ratios])
+    region = cache.get(_key(timeframe, anchor, "__region__"))
 
-        region = pytrends.interest_by_region(resolution='COUNTRY').head(10).to_dict()
+    errors = []
+    unscaled = {}
+    groups = make_groups(anchor, missing) if missing else []
+    if groups:
+        pool = get_trends_executor()
+        futures = [pool.submit(_fetch_group, g, timeframe, i == 0 and region is None)
+                   for i, g in enumerate(groups)]
+        for group, future in zip(groups, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append({"terms": group[1:], "error": str(e)})
+                continue
+            if "region" in result:
+                region = result["region"]
+                cache.set(_key(timeframe, anchor, "__region__"), region)
+            anchor_mean = result["anchor_mean"]
+            for term, peak in result["peaks"].items():
+                if anchor_mean > 0:
+                    # Comparable across groups: relative to the anchor in the same payload
+                    ratios[term] = peak / anchor_mean
+                    cache.set(_key(timeframe, anchor, term), ratios[term])
+                else:
+                    # No anchor interest to scale against: reported raw, not mixed into the scale
+                    unscaled[term] = int(peak)
 
-        return {"interest_over_time": iot, "interest_by_region_sample": region}
+    if groups and len(errors) == len(groups) and not any(t in ratios for t in terms):
+        return {"error": errors[0]["error"]}
 
-    except Exception as e:
-        return {"error": str(e)}
+    top = max([ratios.get(t, 0.0) for t in terms] + [0.0])
+    iot = {t: int(round(ratios[t] * 100 / top)) if top else 0 for t in terms if t in ratios}
+    result = {
+        "interest_over_time": iot,
+        "interest_by_region_sample": region or {},
+        "anchor": anchor,
+        "cached_terms": cached_terms,
+    }
+    unscaled = {t: v for t, v in unscaled.items() if t not in ratios}
+    if unscaled:
+        result["unscaled_interest"] = unscaled
+    if errors:
+        result["errors"] = errors
+    return result
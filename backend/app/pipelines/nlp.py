@@ -1,17 +1,60 @@
-import spacy
-from keybert import KeyBERT
-from transformers import pipeline
 import re
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Optional
+from ..config import CONFIG
+from ..utils.dedupe import collapse
+from ..utils.matcher import PatternMatcher
+from ..utils.model_registry import registry
+from ..utils.sentiment_backends import get_backend
 
-# Load NLP models once
-nlp = spacy.load("en_core_web_sm")
-kw_model = KeyBERT()
-sentiment_pipeline = pipeline(
-    "sentiment-analysis",
-    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-    return_all_scores=True
-)
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+# Newer checkpoints name their labels; keep everything keyed as LABEL_0/1/2
+LABEL_ALIASES = {"negative": "LABEL_0", "neutral": "LABEL_1", "positive": "LABEL_2"}
+
+
+def build_sentiment_pipeline(backend: str = "pytorch"):
+    """
+    CPU inference pipeline for the sentiment model.
+    backend: "pytorch" (fp32, default), "int8" (dynamically quantized Linear layers)
+    or "onnx" (ONNX Runtime export via optimum).
+    """
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL)
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL)
+        if backend == "int8":
+            import torch
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif backend != "pytorch":
+            raise ValueError(f"Unknown sentiment backend: {backend}")
+    return pipeline(
+        "sentiment-analysis",
+        model=model,
+        tokenizer=tokenizer,
+        top_k=None,
+        truncation=True,
+        device=-1
+    )
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+
+def _load_keybert():
+    from keybert import KeyBERT
+    return KeyBERT()
+
+
+# Models load on first use (or during the FastAPI warmup step), not at import
+registry.register("spacy", _load_spacy)
+registry.register("keybert", _load_keybert)
+registry.register("sentiment_transformer", lambda: build_sentiment_pipeline(CONFIG.SENTIMENT_BACKEND))
 
 
 def clean(text: str) -> str:
@@ -19,13 +62,23 @@ def clean(text: str) -> str:
 
 
 # ---------------- Questions ----------------
-def extract_questions(comments: List[Dict]) -> List[Dict]:
-    patterns = ["how", "what", "why", "can you", "where", "when", "which", "who", "is it"]
+QUESTION_PATTERNS = ["how", "what", "why", "can you", "where", "when", "which", "who", "is it"]
+QUESTION_MATCHER = PatternMatcher(QUESTION_PATTERNS)
+
+
+def extract_questions(comments: List[Dict], cleaned: Optional[List[str]] = None,
+                      matches: Optional[List[set]] = None) -> List[Dict]:
+    # cleaned / matches may be passed in by analyze_comments so the corpus is only
+    # cleaned and scanned once for questions and topics together
+    if cleaned is None:
+        cleaned = [clean(c["text"]) for c in comments]
+    if matches is None:
+        matches = QUESTION_MATCHER.scan(t.lower() for t in cleaned)
+    patterns = set(QUESTION_PATTERNS)
     questions = []
 
-    for c in comments:
-        txt = clean(c["text"]).lower()
-        if "?" in c["text"] or any(p in txt for p in patterns):
+    for c, txt, found in zip(comments, cleaned, matches):
+        if "?" in c["text"] or not patterns.isdisjoint(found):
             if len(txt) > 10:
                 questions.append(c)
 
@@ -44,7 +97,7 @@ def extract_questions(comments: List[Dict]) -> List[Dict]:
 # ---------------- Topics ----------------
 def safe_extract_keywords(texts):
     try:
-        return kw_model.extract_keywords(
+        return registry.get("keybert").extract_keywords(
             texts,
             keyphrase_ngram_range=(1, 3),
             stop_words='english',
@@ -54,74 +107,153 @@ def safe_extract_keywords(texts):
         return []
 
 
-def extract_topics(comments: List[Dict]) -> List[Dict]:
-    texts = [clean(c["text"]) for c in comments if len(clean(c["text"])) > 10]
-
+def keyphrases_for(texts: List[str]) -> List[str]:
     if not texts:
         return []
-
-    keywords = safe_extract_keywords(texts)
-    topics = []
-
-    for item in keywords:
+    keyphrases = []
+    for item in safe_extract_keywords(texts):
         if len(item) == 2:
             kw, score = item
         elif len(item) == 1:
             kw = item[0]
-            score = 0
         else:
             continue
+        keyphrases.append(kw)
+    return keyphrases
+
 
-        count = sum(1 for t in texts if kw.lower() in t.lower())
+def extract_topics(comments: List[Dict], cleaned: Optional[List[str]] = None,
+                   matches: Optional[List[set]] = None, keyphrases: Optional[List[str]] = None) -> List[Dict]:
+    if cleaned is None:
+        cleaned = [clean(c["text"]) for c in comments]
+    keep = [i for i, t in enumerate(cleaned) if len(t) > 10]
+    texts = [cleaned[i] for i in keep]
+
+    if not texts:
+        return []
+
+    if keyphrases is None:
+        keyphrases = keyphrases_for(texts)
+    if matches is None:
+        # Lowercase each text once and match every keyphrase against it
+        matcher = PatternMatcher(kw.lower() for kw in keyphrases)
+        matches = matcher.scan(t.lower() for t in cleaned)
+
+    # Collapsed comments (utils/dedupe.py) count once per duplicate they stand for
+    counts = Counter()
+    for i in keep:
+        weight = comments[i].get("weight", 1)
+        for found in matches[i]:
+            counts[found] += weight
+    total = sum(comments[i].get("weight", 1) for i in keep)
+
+    topics = []
+    for kw in keyphrases:
+        count = counts[kw.lower()]
         topics.append({
             "topic": kw.title(),
             "mentions": count,
-            "percentage": round(count / len(texts) * 100, 1)
+            "percentage": round(count / total * 100, 1)
         })
 
     return sorted(topics, key=lambda x: x["mentions"], reverse=True)[:10]
 
 
 # ---------------- Sentiment ----------------
-def analyze_sentiment(comments: List[Dict]) -> Dict:
-    texts = [clean(c["text"])[:500] for c in comments[:300]]
+def score_texts(texts: List[str], batch_size: Optional[int] = None, pipe=None) -> List[Dict[str, float]]:
+    """
+    Runs the sentiment model over texts and returns {"LABEL_0": p, "LABEL_1": p, "LABEL_2": p}
+    per text, in input order. Texts are sorted by length before batching so each batch
+    pads to a similar length, then results are put back in the original order.
+    """
+    if not texts:
+        return []
+    pipe = pipe or registry.get("sentiment_transformer")
+    batch_size = batch_size or CONFIG.SENTIMENT_BATCH_SIZE
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    outputs = pipe([texts[i] for i in order], batch_size=batch_size)
+
+    results = [None] * len(texts)
+    for i, out in zip(order, outputs):
+        results[i] = {LABEL_ALIASES.get(x["label"], x["label"]): x["score"] for x in out}
+    return results
+
+
+def label_for(scores: Dict[str, float]) -> str:
+    if scores.get("LABEL_2", 0) > 0.6:
+        return "positive"
+    if scores.get("LABEL_0", 0) > 0.6:
+        return "negative"
+    return "neutral"
+
+
+def analyze_sentiment(comments: List[Dict], max_comments: Optional[int] = None) -> Dict:
+    # max_comments=None uses SENTIMENT_MAX_COMMENTS; 0 means no cap
+    cap = CONFIG.SENTIMENT_MAX_COMMENTS if max_comments is None else max_comments
+    subset = comments[:cap] if cap else comments
+    texts = [clean(c["text"])[:500] for c in subset]
     if not texts:
         return {"positive": 0, "neutral": 0, "negative": 0}
 
-    results = sentiment_pipeline(texts)
+    cascade = None
+    if CONFIG.SENTIMENT_CASCADE:
+        # Only comments the cheap scorer is unsure about reach the transformer
+        cascade = get_backend("cascade")
+        scored = cascade.score(texts)
+        labels = [r["label"] for r in scored]
+    else:
+        labels = [label_for(scores) for scores in score_texts(texts)]
 
     pos = neu = neg = 0
 
-    for r in results:
-        scores = {x["label"]: x["score"] for x in r}
-        if scores.get("LABEL_2", 0) > 0.6:
-            pos += 1
-        elif scores.get("LABEL_0", 0) > 0.6:
-            neg += 1
+    for label, c in zip(labels, subset):
+        weight = c.get("weight", 1)
+        if label == "positive":
+            pos += weight
+        elif label == "negative":
+            neg += weight
         else:
-            neu += 1
+            neu += weight
 
-    total = len(results)
+    total = pos + neu + neg
 
-    return {
+    summary = {
         "positive": round(pos / total * 100, 1),
         "neutral": round(neu / total * 100, 1),
         "negative": round(neg / total * 100, 1)
     }
+    if cascade is not None:
+        summary["cascade"] = cascade.escalation_stats(scored)
+    return summary
 
 
 # ---------------- Main NLP Wrapper ----------------
 def analyze_comments(comments: List[Dict], video_url: str = "") -> Dict:
     if not comments:
         return {"error": "No comments found"}
+    total_comments = len(comments)
+    dedupe = None
+    if CONFIG.DEDUPE_ENABLED:
+        # Spam dropped, copy-paste comments collapsed into weighted representatives
+        comments, dedupe = collapse(comments, max_distance=CONFIG.DEDUPE_MAX_DISTANCE,
+                                    drop_spam=CONFIG.DEDUPE_DROP_SPAM)
+        if not comments:
+            return {"error": "No comments found"}
+
+    # Clean once, then find question patterns and keyphrase mentions in a single scan
+    cleaned = [clean(c["text"]) for c in comments]
+    keyphrases = keyphrases_for([t for t in cleaned if len(t) > 10])
+    matcher = PatternMatcher(QUESTION_PATTERNS + [kw.lower() for kw in keyphrases])
+    matches = matcher.scan(t.lower() for t in cleaned)
 
-    questions = extract_questions(comments)
-    topics = extract_topics(comments)
+    questions = extract_questions(comments, cleaned, matches)
+    topics = extract_topics(comments, cleaned, matches, keyphrases)
     sentiment = analyze_sentiment(comments)
 
-    return {
+    result = {
         "video_url": video_url,
-        "total_comments": len(comments),
+        "total_comments": total_comments,
         "milestone": "M1 + M2 COMPLETE",
         "questions": {
             "total": len(questions),
@@ -131,3 +263,6 @@ def analyze_comments(comments: List[Dict], video_url: str = "") -> Dict:
         "sentiment_percent": sentiment,
         "ready_for_m3": True
     }
+    if dedupe is not None:
+        result["dedupe"] = dedupe
+    return result
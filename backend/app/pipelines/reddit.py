@@ -1,6 +1,9 @@
 import httpx
-from typing import Dict, Any, List
-from utils.text_utils import clean_text
+from typing import Dict, Any, List, Optional
+from ..utils.text_utils import clean_text
+from ..http_pool import get_http_pool
+from ..search_cache import get_search_cache, search_cache_key
+from .reddit_comments import CommentTreeWalker
 import urllib.parse
 
 HEADERS = {"User-Agent": "ViralEdgeBot/1.0 (by you)"}
@@ -18,54 +21,41 @@ def fetch_reddit_post(url: str) -> Dict[str, Any]:
         json_url = f"https://www.reddit.com{path}.json"
     else:
         json_url = url
-    with httpx.Client(timeout=20.0, headers=HEADERS) as client:
-        r = client.get(json_url)
-        r.raise_for_status()
-        data = r.json()
+    parts = urllib.parse.urlsplit(json_url)
+    client = get_http_pool().sync
+    r = client.get(json_url, headers=HEADERS, timeout=20.0)
+    r.raise_for_status()
+    data = r.json()
     # Reddit returns list: [post, comments]
     post = data[0]["data"]["children"][0]["data"]
-    comments_raw = data[1]["data"]["children"]
-    comments = []
-    def extract(comments_list):
-        out = []
-        for c in comments_list:
-            kind = c.get("kind")
-            if kind != "t1":
-                continue
-            d = c.get("data", {})
-            out.append({
-                "author": d.get("author"),
-                "text": clean_text(d.get("body", "")),
-                "score": d.get("score", 0)
-            })
-            # replies
-            if d.get("replies"):
-                try:
-                    replies = d["replies"]["data"]["children"]
-                    out.extend(extract(replies))
-                except Exception:
-                    pass
-        return out
-    comments = extract(comments_raw)
+    walker = CommentTreeWalker(
+        data[1]["data"]["children"],
+        link_id=post.get("name") or f"t3_{post.get('id')}",
+        client=client,
+        base_url=f"{parts.scheme}://{parts.netloc}",
+        headers=HEADERS,
+    )
+    comments = [{
+        "author": d.get("author"),
+        "text": clean_text(d.get("body", "")),
+        "score": d.get("score", 0)
+    } for d in walker]
     return {
         "url": url,
         "title": post.get("title"),
         "author": post.get("author"),
         "content": clean_text(post.get("selftext", "")),
         "comments_count": len(comments),
-        "comments": comments
+        "comments": comments,
+        "comments_skipped": walker.skipped
     }
 
-def reddit_search(query: str, limit: int = 25) -> List[Dict[str, Any]]:
-    """
-    Very simple Reddit search via the public search endpoint.
-    """
-    url = "https://www.reddit.com/search.json"
-    params = {"q": query, "limit": limit, "sort": "relevance", "t": "week"}
-    with httpx.Client(timeout=15.0, headers=HEADERS) as client:
-        r = client.get(url, params=params)
-        r.raise_for_status()
-        data = r.json()
+SEARCH_URL = "https://www.reddit.com/search.json"
+
+def _search_params(query: str, limit: int, sort: str = "relevance", t: str = "week") -> Dict[str, Any]:
+    return {"q": query, "limit": limit, "sort": sort, "t": t}
+
+def _parse_search(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     results = []
     for c in data.get("data", {}).get("children", []):
         d = c.get("data", {})
@@ -76,3 +66,32 @@ def reddit_search(query: str, limit: int = 25) -> List[Dict[str, Any]]:
             "url": "https://www.reddit.com" + d.get("permalink", "")
         })
     return results
+
+def reddit_search(query: str, limit: int = 25, sort: str = "relevance", t: str = "week") -> List[Dict[str, Any]]:
+    """
+    Very simple Reddit search via the public search endpoint.
+    Served from the stale-while-revalidate search cache when possible.
+    """
+    def fetch():
+        params = _search_params(query, limit, sort, t)
+        r = get_http_pool().sync.get(SEARCH_URL, params=params, headers=HEADERS, timeout=15.0)
+        r.raise_for_status()
+        return _parse_search(r.json())
+
+    return get_search_cache().get_or_fetch_sync(search_cache_key(query, limit, sort, t), fetch)
+
+async def reddit_search_async(query: str, limit: int = 25,
+                              client: Optional[httpx.AsyncClient] = None,
+                              sort: str = "relevance", t: str = "week") -> List[Dict[str, Any]]:
+    """
+    Async reddit_search, over the shared HTTP pool unless a client is passed in.
+    """
+    client = client or get_http_pool().async_client
+
+    async def fetch():
+        params = _search_params(query, limit, sort, t)
+        r = await client.get(SEARCH_URL, params=params, headers=HEADERS, timeout=15.0)
+        r.raise_for_status()
+        return _parse_search(r.json())
+
+    return await get_search_cache().get_or_fetch(search_cache_key(query, limit, sort, t), fetch)
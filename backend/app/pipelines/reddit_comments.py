@@ -0,0 +1,128 @@
+# pipelines/reddit_comments.py
+"""
+Iterative walker over a Reddit comment tree (the second listing of <post>.json).
+
+The tree is walked with an explicit stack, so thread depth is not limited by the
+Python recursion limit, and comments are yielded as they are reached instead of
+being collected first. Reddit leaves two kinds of "more" placeholders in large threads:
+
+    {"kind": "more", "data": {"children": [ids...]}}              "load more comments"
+    {"kind": "more", "data": {"children": [], "parent_id": ...}}  "continue this thread"
+
+With a client, both are expanded once the initial tree has been walked: ids are sent
+to /api/morechildren in batches of 100, and deep threads are fetched from the parent
+comment's own permalink. Up to `concurrency` follow-up requests run at once, and
+`max_requests` caps the total per post. Whatever is still unexpanded at the end is
+reported in `skipped`.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from ..config import CONFIG
+
+MORE_BATCH = 100  # /api/morechildren accepts at most 100 ids per call
+
+
+class CommentTreeWalker:
+    """
+    Iterating yields the `data` dict of every t1 comment once, parents before replies.
+
+        walker = CommentTreeWalker(children, link_id="t3_abc", client=client)
+        comments = [d["body"] for d in walker]
+        walker.skipped  # comments left behind "more" nodes (request cap or errors)
+    """
+
+    def __init__(self, children: List[Dict[str, Any]], link_id: str = "",
+                 client: Optional[httpx.Client] = None, base_url: str = "https://www.reddit.com",
+                 concurrency: Optional[int] = None, max_requests: Optional[int] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.children = children
+        self.link_id = link_id
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.concurrency = concurrency or CONFIG.REDDIT_MORE_CONCURRENCY
+        self.max_requests = CONFIG.REDDIT_MORE_MAX_REQUESTS if max_requests is None else max_requests
+        self.requests = 0
+        self.skipped = 0
+        self._seen = set()
+        self._more_ids: List[str] = []
+        self._threads: List[str] = []
+
+    def _walk(self, children) -> Iterator[Dict[str, Any]]:
+        stack = list(reversed(children))
+        while stack:
+            node = stack.pop()
+            kind = node.get("kind")
+            data = node.get("data") or {}
+            if kind == "t1":
+                if data.get("id") not in self._seen:
+                    self._seen.add(data.get("id"))
+                    yield data
+                replies = data.get("replies")
+                if isinstance(replies, dict):
+                    stack.extend(reversed(replies.get("data", {}).get("children", [])))
+            elif kind == "more":
+                ids = data.get("children") or []
+                if ids:
+                    self._more_ids.extend(ids)
+                elif data.get("parent_id", "").startswith("t1_"):
+                    self._threads.append(data["parent_id"][3:])
+
+    def _fetch_more(self, ids: List[str]) -> List[Dict[str, Any]]:
+        r = self.client.get(f"{self.base_url}/api/morechildren.json", params={
+            "api_type": "json",
+            "link_id": self.link_id,
+            "children": ",".join(ids),
+            "limit_children": "false",
+            "raw_json": "1",
+        }, headers=self.headers)
+        r.raise_for_status()
+        return r.json().get("json", {}).get("data", {}).get("things", [])
+
+    def _fetch_thread(self, comment_id: str) -> List[Dict[str, Any]]:
+        # The listing starts at the parent comment itself (already seen); its replies are new
+        r = self.client.get(f"{self.base_url}/comments/{self.link_id[3:]}/_/{comment_id}.json",
+                            params={"raw_json": "1"}, headers=self.headers)
+        r.raise_for_status()
+        return r.json()[1]["data"]["children"]
+
+    def _next_request(self):
+        if self._threads:
+            return self._fetch_thread, self._threads.pop(0), 0
+        batch, self._more_ids = self._more_ids[:MORE_BATCH], self._more_ids[MORE_BATCH:]
+        return self._fetch_more, batch, len(batch)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield from self._walk(self.children)
+        if self.client is None or not self.link_id:
+            self.skipped = len(self._more_ids)
+            return
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        running = {}
+        try:
+            while True:
+                while ((self._more_ids or self._threads) and len(running) < self.concurrency
+                       and self.requests < self.max_requests):
+                    fetch, arg, count = self._next_request()
+                    running[pool.submit(fetch, arg)] = count
+                    self.requests += 1
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    count = running.pop(future)
+                    try:
+                        things = future.result()
+                    except (httpx.HTTPError, ValueError, KeyError, IndexError) as e:
+                        print(f"Reddit 'more' expansion failed: {e}")
+                        self.skipped += count
+                        continue
+                    yield from self._walk(things)
+        finally:
+            # Also runs when the consumer stops early: drop queued requests
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.skipped += len(self._more_ids)
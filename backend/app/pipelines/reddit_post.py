@@ -1,29 +1,24 @@
 # pipelines/reddit.py
-import httpx
-from utils.headers import get_headers
+import urllib.parse
 
+from ..http_pool import get_http_pool
+from .reddit_comments import CommentTreeWalker
 
-# ---------- Extract full comment tree ----------
-def extract_comments(comment_list, out):
-    for c in comment_list:
-        if c.get("kind") == "t1":  # A real comment
-            data = c.get("data", {})
 
-            out.append({
-                "author": data.get("author") or "unknown",
-                "text": data.get("body") or "",
-                "score": data.get("score") or 0,
-            })
+def _comment(data):
+    return {
+        "id": data.get("id"),
+        "author": data.get("author") or "unknown",
+        "text": data.get("body") or "",
+        "score": data.get("score") or 0,
+        "time": data.get("created_utc") or 0,
+    }
 
-            # Recursive replies
-            replies = data.get("replies")
-            if replies and isinstance(replies, dict):
-                nested = replies.get("data", {}).get("children", [])
-                extract_comments(nested, out)
 
-        elif c.get("kind") == "more":
-            # "more" nodes contain extra comment IDs we cannot fetch without OAuth
-            continue
+# ---------- Extract full comment tree ----------
+def extract_comments(comment_list, out):
+    # Initial tree only; get_reddit_post also expands "more" nodes
+    out.extend(_comment(d) for d in CommentTreeWalker(comment_list))
 
 
 # ---------- Fetch full Reddit post + comments ----------
@@ -32,18 +27,26 @@ def get_reddit_post(url: str):
         # Always convert into `.json` endpoint
         base = url.split("?")[0].rstrip("/")
         json_url = base + "/.json"
+        parts = urllib.parse.urlsplit(base)
+
+        pool = get_http_pool()
+        headers = pool.headers()
 
-        response = httpx.get(json_url, headers=get_headers(), timeout=30)
+        response = pool.sync.get(json_url, headers=headers, timeout=30)
         data = response.json()
 
         # Post details
         post_data = data[0]["data"]["children"][0]["data"]
 
-        # Comment tree
-        comment_tree = data[1]["data"]["children"]
-
-        all_comments = []
-        extract_comments(comment_tree, all_comments)
+        # Comment tree, plus the comments hidden behind "more" links
+        walker = CommentTreeWalker(
+            data[1]["data"]["children"],
+            link_id=post_data.get("name") or f"t3_{post_data.get('id')}",
+            client=pool.sync,
+            base_url=f"{parts.scheme}://{parts.netloc}",
+            headers=headers,
+        )
+        all_comments = [_comment(d) for d in walker]
 
         return {
             "url": base,
@@ -51,7 +54,8 @@ def get_reddit_post(url: str):
             "author": post_data.get("author"),
             "content": post_data.get("selftext") or "",
             "comments_count": len(all_comments),
-            "comments": all_comments
+            "comments": all_comments,
+            "comments_skipped": walker.skipped
         }
 
     except Exception as e:
@@ -1,6 +1,9 @@
 # pipelines/tiktok.py
-import requests
 import random
+from ..http_pool import get_http_pool
+
+# The comment endpoint is called as the mobile web app
+MOBILE_UA = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15"
 
 def get_tiktok_comments(video_url: str):
     try:
@@ -10,19 +13,19 @@ def get_tiktok_comments(video_url: str):
 
     # Working endpoint Nov 2025
     api_url = f"https://www.tiktok.com/api/comment/list/?aweme_id={video_id}&count=50"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15",
-        "Referer": "https://www.tiktok.com/",
-    }
+    pool = get_http_pool()
+    headers = pool.headers({"User-Agent": MOBILE_UA, "Referer": "https://www.tiktok.com/"})
 
     try:
-        r = requests.get(api_url, headers=headers, timeout=15)
+        # httpx doesn't follow redirects by default (requests did)
+        r = pool.sync.get(api_url, headers=headers, timeout=15, follow_redirects=True)
         if r.status_code != 200:
             raise
         data = r.json()
         comments = []
         for c in data.get("comments", [])[:50]:
             comments.append({
+                "id": c.get("cid"),
                 "text": c.get("text", ""),
                 "author": c.get("user", {}).get("unique_id", "unknown"),
                 "likes": c.get("digg_count", 0),
@@ -1,11 +1,13 @@
 from typing import Dict, Any, List
-from utils.nlp import top_topics, extract_questions, overall_sentiment_summary
-from utils.sentiment_utils import analyze_sentiment
-from pipelines.reddit import reddit_search
-from pipelines.google_trends import trends_for_terms
+from .nlp import extract_questions, extract_topics
+from ..utils.sentiment_utils import analyze_sentiment, overall_sentiment_summary
+from .reddit import reddit_search_async
+from .google_trends import trends_for_terms
 import datetime
 import asyncio
-from config import CONFIG
+import httpx
+from ..config import CONFIG
+from ..http_pool import get_http_pool
 
 
 def compute_engagement_stats(comments: List[Dict[str,Any]]) -> Dict[str,Any]:
@@ -14,27 +16,53 @@ def compute_engagement_stats(comments: List[Dict[str,Any]]) -> Dict[str,Any]:
     top_comments = sorted(comments, key=lambda c: c.get("likes", 0), reverse=True)[:5]
     return {"total_likes": total_likes, "avg_likes": avg_likes, "top_comments": top_comments}
 
+async def _reddit_query(client: httpx.AsyncClient, query: str) -> Dict[str, Any]:
+    try:
+        results = await asyncio.wait_for(reddit_search_async(query, client=client), CONFIG.REDDIT_TIMEOUT)
+        return {"query": query, "results": results}
+    except Exception as e:
+        # Partial results: a slow or failing query doesn't sink the whole analysis
+        return {"query": query, "results": [], "error": str(e) or type(e).__name__}
+
+async def _google_trends(terms: List[str]) -> Dict[str, Any]:
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(trends_for_terms, terms), CONFIG.TRENDS_TIMEOUT)
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+
 async def analyze_all(video_url: str, comments_payload: Dict[str,Any]) -> Dict[str,Any]:
     # comments_payload is the result from fetch_youtube_comments
     comments = comments_payload.get("comments", [])
-    # run sentiment analysis in thread to avoid blocking
-    sentiments = []
-    for c in comments:
-        s = analyze_sentiment(c.get("text", ""))
-        sentiments.append(s)
+    # KeyBERT topics are CPU-bound: keep them off the event loop
+    topics = await asyncio.to_thread(extract_topics, comments)
+    # build reddit queries from top topic strings
+    topic_terms = [t["topic"] for t in topics[:6]] or []
+
+    # Reddit queries and Google Trends run concurrently over the shared HTTP pool, while
+    # VADER sentiment and question extraction run in worker threads, so the stage takes
+    # about as long as the slowest single call instead of the sum of all of them.
+    client = get_http_pool().async_client
+    tasks = [
+        asyncio.ensure_future(asyncio.gather(*[_reddit_query(client, q) for q in topic_terms])),
+        asyncio.ensure_future(_google_trends(topic_terms)),
+        asyncio.ensure_future(asyncio.to_thread(lambda: [analyze_sentiment(c.get("text", "")) for c in comments])),
+        asyncio.ensure_future(asyncio.to_thread(extract_questions, comments)),
+    ]
+    try:
+        reddit_results, google, sentiments, questions = await asyncio.gather(*tasks)
+    finally:
+        # One signal failed (or we were cancelled): don't leave the others running
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    reddit_results = list(reddit_results)
+
     nlp_summary = {
-        "questions": extract_questions(comments),
-        "topics": top_topics(comments, top_k=12),
+        "questions": questions,
+        "topics": topics,
         "sentiment": overall_sentiment_summary(sentiments)
     }
     engagement = compute_engagement_stats(comments)
-    # build reddit queries from top topic strings
-    topic_terms = [t["topic"] for t in nlp_summary["topics"][:6]] or []
-    reddit_results = []
-    for q in topic_terms:
-        reddit_results.append({"query": q, "results": reddit_search(q)})
-    # google trends
-    google = trends_for_terms(topic_terms)
     # simple trend probability heuristic
     # weights: yt likes (40), reddit mentions (30), google interest (30)
     yt_score = min(100, engagement["avg_likes"] / 5)  # normalize heuristic
@@ -1,5 +1,15 @@
 from youtube_comment_downloader import YoutubeCommentDownloader
+import asyncio
+import threading
 import re
+from ..metrics import requests_hook
+
+# Comments handed to the consumer per batch by stream_youtube_comments
+STREAM_BATCH_SIZE = 50
+# Delta fetch stops after this many consecutive already-seen (or older) comments
+DELTA_STOP_STREAK = 10
+# Relative times ("2 days ago") are coarse, so allow this much slack (seconds)
+DELTA_TIME_SLACK = 24 * 3600
 
 def parse_votes(votes_str):
     if not votes_str:
@@ -14,34 +24,115 @@ def parse_votes(votes_str):
     except:
         return 0
 
-def fetch_youtube_comments(video_url, max_comments=100):
+def get_video_id(video_url):
+    if "v=" in video_url:
+        return video_url.split("v=")[1].split("&")[0]
+    elif "youtu.be" in video_url:
+        return video_url.split("/")[-1]
+    return None
+
+def iter_youtube_comments(video_id, max_comments=100):
+    """Yields comment records one by one as the downloader pages them in."""
     downloader = YoutubeCommentDownloader()
-    comments = []
-    
+    session = getattr(downloader, "session", None)
+    if session is not None:
+        session.hooks["response"].append(requests_hook)
+    count = 0
+    for comment in downloader.get_comments(video_id):
+        if count >= max_comments:
+            break
+        count += 1
+        yield {
+            "id": comment.get('cid'),
+            "text": comment['text'],
+            "author": comment['author'],
+            "likes": parse_votes(comment.get('votes', 0)),
+            "time": comment.get('time_parsed', 0) # Relative time
+        }
+
+def iter_new_youtube_comments(video_id, known_ids, high_water=0, max_comments=100):
+    """
+    Yields only comments newer than what is already stored. The downloader returns
+    newest first, so paging stops once a run of comments is either known or older
+    than the stored high-water mark. A streak is required because pinned comments
+    are listed first regardless of age.
+    """
+    cutoff = (high_water or 0) - DELTA_TIME_SLACK
+    streak = 0
+    for comment in iter_youtube_comments(video_id, max_comments=float("inf")):
+        if comment["id"] in known_ids or (high_water and (comment["time"] or 0) < cutoff):
+            streak += 1
+            if streak >= DELTA_STOP_STREAK:
+                break
+            continue
+        streak = 0
+        yield comment
+        max_comments -= 1
+        if max_comments <= 0:
+            break
+
+def fetch_youtube_comments(video_url, max_comments=100):
     try:
         # Extract Video ID
-        video_id = None
-        if "v=" in video_url:
-            video_id = video_url.split("v=")[1].split("&")[0]
-        elif "youtu.be" in video_url:
-            video_id = video_url.split("/")[-1]
-            
+        video_id = get_video_id(video_url)
         if not video_id:
             return []
 
         # Fetch comments
-        generator = downloader.get_comments(video_id)
-        for comment in generator:
-            if len(comments) >= max_comments:
-                break
-            comments.append({
-                "text": comment['text'],
-                "author": comment['author'],
-                "likes": parse_votes(comment.get('votes', 0)),
-                "time": comment.get('time_parsed', 0) # Relative time
-            })
-            
+        comments = list(iter_youtube_comments(video_id, max_comments))
         return {"comments": comments}
     except Exception as e:
         print(f"Error fetching comments: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+async def stream_youtube_comments(video_url, max_comments=100, batch_size=STREAM_BATCH_SIZE):
+    """
+    Async variant of fetch_youtube_comments that yields lists of comments as soon as
+    `batch_size` of them have been downloaded, so callers can start processing the
+    first batch while later pages are still being fetched.
+    The blocking downloader runs in a worker thread; errors are re-raised to the consumer.
+    """
+    video_id = get_video_id(video_url)
+    if not video_id:
+        raise ValueError("Invalid YouTube URL")
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def emit(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # Event loop already closed, nobody is listening anymore
+            stop.set()
+
+    def produce():
+        batch = []
+        try:
+            for comment in iter_youtube_comments(video_id, max_comments):
+                if stop.is_set():
+                    return
+                batch.append(comment)
+                if len(batch) >= batch_size:
+                    emit(batch)
+                    batch = []
+            if batch:
+                emit(batch)
+            emit(done)
+        except Exception as e:
+            emit(e)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Consumer stopped early (or finished): let the download thread wind down
+        stop.set()
@@ -0,0 +1,187 @@
+# sampling.py
+"""
+Stratified comment sampling for /m3/analyze?sample=N.
+
+NLP cost grows with every comment analyzed, but the sentiment and topic aggregates
+can be estimated from a sample. Comments are split into strata by like tier
+(LIKE_TIERS over the parse_votes counts) and by recency (time quantiles; comments
+without a usable time form their own bucket). The budget is shared out in
+proportion to stratum size times the tier's boost, so the few highly liked comments
+are over-sampled, and often taken whole, instead of being lost among thousands of
+zero-like ones. Every stratum gets at least SAMPLE_MIN_PER_STRATUM comments while
+the budget allows it, so its variance can be estimated.
+
+Each sampled comment carries the weight N_h / n_h (stratum size over stratum sample
+size). CommentAnalysis already counts comments by weight, so its sentiment
+percentages and topic frequencies estimate the whole population. intervals() gives
+a normal-approximation confidence interval for each sentiment percentage from the
+stratified variance estimate.
+"""
+import math
+import random
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional
+
+from .pipelines.youtube import parse_votes
+
+# Lower like-count bound of each tier, and how much more often a tier is sampled
+LIKE_TIERS = (0, 1, 10, 100, 1000)
+LIKE_BOOST = (1, 2, 3, 4, 5)
+LABELS = ("positive", "negative", "neutral")
+
+
+def like_tier(comment: Dict[str, Any]) -> int:
+    likes = comment["likes"] if "likes" in comment else parse_votes(comment.get("votes"))
+    tier = 0
+    for i, bound in enumerate(LIKE_TIERS):
+        if (likes or 0) >= bound:
+            tier = i
+    return tier
+
+
+def _tier_label(tier: int) -> str:
+    low = LIKE_TIERS[tier]
+    if tier + 1 == len(LIKE_TIERS):
+        return f"{low}+"
+    high = LIKE_TIERS[tier + 1] - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+def _timestamp(comment: Dict[str, Any]) -> Optional[float]:
+    try:
+        t = float(comment.get("time") or 0)
+    except (TypeError, ValueError):
+        return None
+    return t if t > 0 else None
+
+
+def recency_buckets(comments: List[Dict[str, Any]], buckets: int) -> List[Optional[int]]:
+    """Quantile bucket per comment (0 = oldest), None when the comment has no time."""
+    times = [_timestamp(c) for c in comments]
+    known = sorted(t for t in times if t is not None)
+    cuts = [known[len(known) * i // buckets] for i in range(1, buckets)] if known else []
+    return [None if t is None else sum(t >= cut for cut in cuts) for t in times]
+
+
+def allocate(sizes: List[int], boosts: List[float], budget: int, min_per_stratum: int = 2) -> List[int]:
+    """
+    Samples per stratum: at least min_per_stratum each (highest priority first while
+    the budget lasts), the rest in proportion to size x boost, capped at the size.
+    """
+    if budget >= sum(sizes):
+        return list(sizes)
+    priority = [n * b for n, b in zip(sizes, boosts)]
+    alloc = [0] * len(sizes)
+    left = budget
+    for i in sorted(range(len(sizes)), key=lambda i: -priority[i]):
+        alloc[i] = min(sizes[i], min_per_stratum, left)
+        left -= alloc[i]
+
+    active = [i for i in range(len(sizes)) if alloc[i] < sizes[i]]
+    while left > 0 and active:
+        total = sum(priority[i] for i in active)
+        shares = {i: left * priority[i] / total for i in active}
+        full = [i for i in active if alloc[i] + shares[i] >= sizes[i]]
+        if full:
+            # Take these strata whole and share what is left among the others
+            for i in full:
+                left -= sizes[i] - alloc[i]
+                alloc[i] = sizes[i]
+            active = [i for i in active if i not in full]
+            continue
+        base = {i: int(shares[i]) for i in active}
+        for i in active:
+            alloc[i] += base[i]
+        left -= sum(base.values())
+        # Largest remainders get the last few samples
+        for i in sorted(active, key=lambda i: base[i] - shares[i])[:left]:
+            alloc[i] += 1
+        left = 0
+    return alloc
+
+
+class StratifiedSample:
+    """
+    sample = StratifiedSample(comments, budget=2000)
+    sample.feed(analysis)           # analysis: CommentAnalysis, fed stratum by stratum
+    sample.intervals()              # {"positive": [low, high], ...} in percent
+    sample.summary()                # population, sample size, per-stratum sizes, intervals
+    """
+
+    def __init__(self, comments: List[Dict[str, Any]], budget: int, recency: int = 3,
+                 min_per_stratum: int = 2, confidence: float = 0.95, seed: int = 0):
+        self.population = len(comments)
+        self.confidence = confidence
+        members: Dict[tuple, List[int]] = {}
+        for i, (tier, bucket) in enumerate(zip(map(like_tier, comments), recency_buckets(comments, recency))):
+            members.setdefault((tier, bucket), []).append(i)
+        keys = sorted(members, key=lambda k: (k[0], -1 if k[1] is None else k[1]))
+        sizes = [len(members[k]) for k in keys]
+        alloc = allocate(sizes, [LIKE_BOOST[tier] for tier, _ in keys], budget, min_per_stratum)
+
+        # Seeded, so the same comments always give the same sample (and cached response)
+        rng = random.Random(seed)
+        self.strata = []
+        for key, size, n in zip(keys, sizes, alloc):
+            if not n:
+                continue
+            weight = size / n
+            picked = sorted(rng.sample(members[key], n))
+            self.strata.append({
+                "likes": _tier_label(key[0]),
+                "recency": key[1],
+                "population": size,
+                "sampled": n,
+                "comments": [{**comments[i], "weight": comments[i].get("weight", 1) * weight} for i in picked],
+                "counts": None,
+            })
+        self.size = sum(s["sampled"] for s in self.strata)
+        # Strata the budget could not reach at all are left out of the estimate
+        self.covered = sum(s["population"] for s in self.strata)
+
+    @property
+    def comments(self) -> List[Dict[str, Any]]:
+        return [c for s in self.strata for c in s["comments"]]
+
+    def feed(self, analysis) -> None:
+        """analysis.feed() one stratum at a time, recording each stratum's weighted label counts."""
+        for s in self.strata:
+            before = dict(analysis.counts)
+            analysis.feed(s["comments"])
+            s["counts"] = {label: analysis.counts[label] - before[label] for label in LABELS}
+
+    def intervals(self) -> Dict[str, List[float]]:
+        """
+        Confidence interval per sentiment percentage. Spam dropped by the analysis is
+        excluded, as in the percentages: each stratum's scored share estimates its
+        non-spam population.
+        """
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        strata = [s for s in self.strata if s["counts"] is not None and sum(s["counts"].values()) > 0]
+        total = sum(sum(s["counts"].values()) for s in strata)
+        out = {}
+        for label in LABELS:
+            if not total:
+                out[label] = [0.0, 0.0]
+                continue
+            estimate = sum(s["counts"][label] for s in strata) / total
+            variance = 0.0
+            for s in strata:
+                scored = sum(s["counts"].values())
+                n = scored * s["sampled"] / s["population"]  # non-spam comments sampled
+                p = s["counts"][label] / scored
+                fpc = 1 - s["sampled"] / s["population"]
+                variance += (scored / total) ** 2 * fpc * p * (1 - p) / max(n - 1, 1)
+            margin = z * math.sqrt(variance)
+            out[label] = [round(max(0.0, estimate - margin) * 100, 1), round(min(1.0, estimate + margin) * 100, 1)]
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "population": self.population,
+            "sampled": self.size,
+            "covered": self.covered,
+            "confidence": self.confidence,
+            "sentiment_ci": self.intervals(),
+            "strata": [{k: s[k] for k in ("likes", "recency", "population", "sampled")} for s in self.strata],
+        }
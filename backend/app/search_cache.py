@@ -0,0 +1,172 @@
+# search_cache.py
+"""
+Stale-while-revalidate cache for the Reddit search signal (pipelines/reddit.reddit_search).
+
+Entries are fresh for REDDIT_CACHE_TTL seconds and then kept REDDIT_CACHE_STALE
+seconds longer. A stale entry is returned straight away while one background
+refresh per key updates it; a failed refresh keeps the stale value. Empty results
+and errors are cached for REDDIT_CACHE_NEGATIVE_TTL only (0 = not cached): an errored
+query raises once, and lookups within that window then return [] without calling Reddit.
+In get_or_fetch the store is read and written in a worker thread unless it is the
+in-memory backend, so SQLite or Redis I/O never blocks the event loop. Storage uses the cache.py backends (REDDIT_CACHE_BACKEND), so REDDIT_CACHE_MAX_ENTRIES
+bounds memory use through their LRU eviction.
+"""
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .cache import BaseCache, make_cache
+from .config import CONFIG
+
+
+def search_cache_key(query: str, limit: int, sort: str, t: str) -> str:
+    q = re.sub(r"\s+", " ", str(query).lower()).strip()
+    return f"reddit:search:{sort}:{t}:{limit}:{q}"
+
+
+class SWRCache:
+
+    def __init__(self, store: BaseCache, fresh_ttl: int = 900, stale_ttl: int = 86400,
+                 negative_ttl: int = 120):
+        self.store = store
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.stale_served = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], str]:
+        """(value, state) with state "fresh", "stale" or "miss"."""
+        entry = self.store.get(key)
+        if entry is None:
+            return None, "miss"
+        if entry["fresh_until"] >= time.time():
+            return entry["value"], "fresh"
+        return entry["value"], "stale"
+
+    def put(self, key: str, value: Any) -> None:
+        if not value:
+            self.put_negative(key)
+            return
+        self.store.set(key, {"value": value, "fresh_until": time.time() + self.fresh_ttl},
+                       ttl=self.fresh_ttl + self.stale_ttl)
+
+    def put_negative(self, key: str) -> None:
+        if self.negative_ttl <= 0:
+            return
+        # Never replace a usable (stale) result with an empty one
+        current = self.store.peek(key)
+        if current is not None and current["value"]:
+            return
+        self.store.set(key, {"value": [], "fresh_until": time.time() + self.negative_ttl},
+                       ttl=self.negative_ttl)
+
+    async def _io(self, fn: Callable[..., Any], *args) -> Any:
+        # Memory lookups are cheaper than a thread hop; disk and network ones are not
+        if self.store.backend == "memory":
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except Exception:
+            await self._io(self.put_negative, key)
+            raise
+        await self._io(self.put, key, value)
+        return value
+
+    def _shared_fetch(self, key, fetch) -> asyncio.Task:
+        # One in-flight request per key; later callers wait on the same task
+        task = self._tasks.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch(key, fetch))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._tasks.pop(key, None) if self._tasks.get(key) is t else None)
+            # Errors are re-raised to waiting callers; this keeps orphaned ones from being logged
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value, state = await self._io(self.lookup, key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            self.stale_served += 1
+            if key not in self._tasks:
+                self.refreshes += 1
+                self._shared_fetch(key, fetch).add_done_callback(self._count_failure)
+            return value
+        # Shielded so a caller's timeout doesn't cancel the request for everyone else;
+        # a fetch that outlives its caller still fills the cache
+        return await asyncio.shield(self._shared_fetch(key, fetch))
+
+    def _count_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+
+    def get_or_fetch_sync(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Blocking variant; stale entries are refreshed on a daemon thread."""
+        value, state = self.lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            self.stale_served += 1
+            with self._lock:
+                start = key not in self._threads
+                self._threads.add(key)
+            if start:
+                self.refreshes += 1
+                threading.Thread(target=self._refresh_sync, args=(key, fetch), daemon=True).start()
+            return value
+        try:
+            value = fetch()
+        except Exception:
+            self.put_negative(key)
+            raise
+        self.put(key, value)
+        return value
+
+    def _refresh_sync(self, key, fetch) -> None:
+        try:
+            self.put(key, fetch())
+        except Exception as e:
+            self.refresh_failures += 1
+            print(f"Reddit search refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._threads.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.store.stats(),
+            "stale_served": self.stale_served,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+_search_cache = None
+
+def get_search_cache() -> SWRCache:
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SWRCache(
+            make_cache(
+                CONFIG.REDDIT_CACHE_BACKEND,
+                ttl=CONFIG.REDDIT_CACHE_TTL + CONFIG.REDDIT_CACHE_STALE,
+                max_entries=CONFIG.REDDIT_CACHE_MAX_ENTRIES,
+                redis_url=CONFIG.CACHE_REDIS_URL,
+                namespace="reddit",
+            ),
+            fresh_ttl=CONFIG.REDDIT_CACHE_TTL,
+            stale_ttl=CONFIG.REDDIT_CACHE_STALE,
+            negative_ttl=CONFIG.REDDIT_CACHE_NEGATIVE_TTL,
+        )
+    return _search_cache
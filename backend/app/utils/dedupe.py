@@ -0,0 +1,193 @@
+# utils/dedupe.py
+"""
+Near-duplicate and spam collapsing for comment lists, run before the NLP stages.
+
+Popular videos collect thousands of copy-paste comments ("first", emoji chains,
+bot links). DedupeIndex maps every comment to a group; only one representative per
+group goes through sentiment / topics, carrying the group size as its weight, so
+percentages match what scoring every comment would have produced.
+
+Grouping, cheapest first:
+- obvious bot / link spam is dropped (counted, never scored);
+- exact duplicates after normalization (case, punctuation, URLs, mentions,
+  stretched letters; emoji-only comments by their set of emoji). The set of
+  emoticons, emoji and ?/! marks stays part of the key, so "great :)" and
+  "great :(" or "ok!" and "ok?" are not merged under one sentiment label;
+- comments with at least `min_tokens` words by 64-bit SimHash over word unigrams
+  and bigrams: a Hamming distance of at most `max_distance` bits counts as the same
+  comment. The 64 bits are split into max_distance + 1 bands; two hashes within
+  max_distance bits agree on at least one whole band, so only comments sharing a
+  band value (and the same set of tone marks) are compared.
+
+Comments may already carry a "weight" (pre-collapsed input); it is added to the group.
+"""
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+SPAM_RE = re.compile(
+    r"sub\s?4\s?sub|check (?:out )?my (?:channel|profile|page|bio)|"
+    # Messaging apps only as a contact ask: "add me on telegram", a handle or number, t.me/ links
+    r"(?:add|dm|message|msg|text|contact|reach|find) me (?:on|via|at) (?:telegram|what'?s\s?app)|"
+    r"(?:telegram|what'?s\s?app) me\b|(?:telegram|what'?s\s?app)\s*(?:id|number|no\.?)?\s*[:-]?\s*(?:@\w|\+\d)|"
+    r"\b(?:t|wa)\.me/|"
+    r"free (?:robux|v-?bucks|gift ?cards?|followers)|dm me (?:on|for)|click (?:the |my )?link|"
+    r"\+\d[\d\s-]{8,}\d",
+    re.IGNORECASE,
+)
+LINK_OR_MENTION_RE = re.compile(r"https?://\S+|www\.\S+|@\w+")
+STRETCH_RE = re.compile(r"(\w)\1{2,}")
+NON_WORD_RE = re.compile(r"[\W_]+")
+# What sentiment reads but normalize() drops: text emoticons either way round
+# (:) :-( ;D :P :/ <3 ^^ (: D:), ?/!, and emoji / symbols (non-word chars from U+2190 up)
+TONE_RE = re.compile(
+    r"(?<!\w)(?:[:;=8][-^']?[()\[\]dDpP/\\|oO*3]|<3|\^_?\^|[()\[\]][-^']?[:;=8])(?!\w)"
+    r"|[?!]|[^\w\s\x00-\u218f]"
+)
+MAX_CANDIDATES = 8  # most recent groups compared per band bucket, keeps crowded buckets O(1)
+CHUNK = 2000  # texts per vectorized SimHash pass (bounds the bit matrix to a few MB)
+
+
+def is_spam(text: str) -> bool:
+    """Bot phrases, phone numbers, or a link with next to no text around it."""
+    if SPAM_RE.search(text):
+        return True
+    if URL_RE.search(text):
+        return len(URL_RE.sub(" ", text).split()) < 4
+    return False
+
+
+def normalize(text: str) -> str:
+    text = LINK_OR_MENTION_RE.sub(" ", text.lower())
+    text = STRETCH_RE.sub(r"\1\1", text)  # "soooo good" == "sooo good"
+    return NON_WORD_RE.sub(" ", text).strip()
+
+
+def tone_marks(text: str) -> str:
+    """Sorted set of the emoticons, emoji / symbols and ?/! in text, links and mentions left out."""
+    return " ".join(sorted(set(TONE_RE.findall(LINK_OR_MENTION_RE.sub(" ", text)))))
+
+
+class DedupeIndex:
+    """Incremental: feed comment batches to assign(); groups persist across batches."""
+
+    def __init__(self, max_distance: int = 4, drop_spam: bool = True, min_tokens: int = 4):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        widths = [64 // bands + (1 if i < 64 % bands else 0) for i in range(bands)]
+        self._bands_spec = [(sum(widths[:i]), (1 << w) - 1) for i, w in enumerate(widths)]
+        self.drop_spam = drop_spam
+        self.min_tokens = min_tokens
+        self.groups: List[Dict[str, Any]] = []  # representative comment per group, with "weight"
+        self.total = 0
+        self.spam = 0
+        self._exact: Dict[str, int] = {}
+        self._hashes: List[Optional[int]] = []
+        self._bands: Dict[Tuple[int, int], List[int]] = {}
+        self._token_hashes: Dict[str, int] = {}
+
+    def _key(self, text: str) -> Tuple[str, str, str]:
+        """(exact-match key, normalized words, tone marks)."""
+        words = normalize(text)
+        if not words:
+            # Emoji / symbol-only comments normalize to "": keyed by their set of symbols instead
+            return "~" + "".join(sorted(set(text) - set(" \t\n"))), "", ""
+        tone = tone_marks(text)
+        return (f"{words} ~{tone}" if tone else words), words, tone
+
+    def _hash(self, feature: str) -> int:
+        h = self._token_hashes.get(feature)
+        if h is None:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            self._token_hashes[feature] = h
+        return h
+
+    def simhashes(self, token_lists: List[List[str]]) -> List[int]:
+        out = []
+        for start in range(0, len(token_lists), CHUNK):
+            feats, offsets = [], []
+            for tokens in token_lists[start:start + CHUNK]:
+                offsets.append(len(feats))
+                feats.extend(self._hash(t) for t in tokens)
+                feats.extend(self._hash(a + " " + b) for a, b in zip(tokens, tokens[1:]))
+            bits = np.unpackbits(np.array(feats, dtype=np.uint64).view(np.uint8).reshape(-1, 8), axis=1)
+            votes = np.add.reduceat(bits.astype(np.int16) * 2 - 1, offsets, axis=0)
+            packed = np.packbits((votes > 0).astype(np.uint8), axis=1).view(np.uint64).ravel()
+            out.extend(int(h) for h in packed)
+        return out
+
+    def _band_keys(self, h: int, tone: str):
+        return [(band, (h >> shift) & mask, tone) for band, (shift, mask) in enumerate(self._bands_spec)]
+
+    def _near(self, h: int, tone: str) -> Optional[int]:
+        for key in self._band_keys(h, tone):
+            for gid in self._bands.get(key, ())[-MAX_CANDIDATES:]:
+                if (h ^ self._hashes[gid]).bit_count() <= self.max_distance:
+                    return gid
+        return None
+
+    def _new_group(self, comment, weight, h=None, tone="") -> int:
+        gid = len(self.groups)
+        self.groups.append({**comment, "weight": weight})
+        self._hashes.append(h)
+        if h is not None:
+            for key in self._band_keys(h, tone):
+                self._bands.setdefault(key, []).append(gid)
+        return gid
+
+    def assign(self, comments: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """Group id per comment (None for dropped spam); ids >= the old len(groups) are new."""
+        gids: List[Optional[int]] = [None] * len(comments)
+        pending = []  # (index, key, tone, tokens) needing a SimHash lookup
+        for i, c in enumerate(comments):
+            weight = c.get("weight", 1)
+            self.total += weight
+            text = c.get("text", "")
+            if self.drop_spam and is_spam(text):
+                self.spam += weight
+                continue
+            key, words, tone = self._key(text)
+            gid = self._exact.get(key)
+            if gid is not None:
+                self.groups[gid]["weight"] += weight
+                gids[i] = gid
+                continue
+            tokens = words.split()
+            if len(tokens) >= self.min_tokens:
+                pending.append((i, key, tone, tokens))
+            else:
+                gids[i] = self._exact[key] = self._new_group(c, weight)
+
+        hashes = self.simhashes([tokens for _, _, _, tokens in pending]) if pending else []
+        for (i, key, tone, _), h in zip(pending, hashes):
+            c = comments[i]
+            weight = c.get("weight", 1)
+            gid = self._exact.get(key)  # an exact repeat earlier in this batch
+            if gid is None:
+                gid = self._near(h, tone)
+            if gid is None:
+                gid = self._new_group(c, weight, h, tone)
+            else:
+                self.groups[gid]["weight"] += weight
+            self._exact.setdefault(key, gid)
+            gids[i] = gid
+        return gids
+
+    def stats(self) -> Dict[str, int]:
+        unique = len(self.groups)
+        return {
+            "comments": self.total,
+            "unique": unique,
+            "duplicates": self.total - self.spam - unique,
+            "spam": self.spam,
+        }
+
+
+def collapse(comments: List[Dict[str, Any]], **kwargs) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """One-shot DedupeIndex: (representatives with "weight", stats)."""
+    index = DedupeIndex(**kwargs)
+    index.assign(comments)
+    return index.groups, index.stats()
@@ -0,0 +1,102 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+Event = Tuple[str, Any]
+
+
+class IncrementalJSONParser:
+    """
+    Consumes a JSON document in arbitrary text chunks (e.g. an LLM token stream) and
+    emits selected sub-objects the moment their closing bracket arrives.
+
+    `watch` maps a path to an event name. A path is a tuple of object keys from the
+    root, with "*" standing for "any array element", e.g.
+        {("ai_recommendations", "next_best_content", "*"): "idea"}
+    Text before the first "{" (prose, ```json fences) is ignored. When the root
+    object closes a ("complete", document) event is emitted. If the stream ends
+    early, everything that did close has already been emitted, so a truncated
+    response never loses finished items.
+    """
+
+    def __init__(self, watch: Dict[Tuple[str, ...], str]):
+        self.watch = watch
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._started = False
+        self._stack: List[Dict[str, Any]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+    def _path(self) -> Tuple[str, ...]:
+        return tuple("*" if e["type"] == "arr" else e["key"] for e in self._stack)
+
+    def feed(self, chunk: str) -> List[Event]:
+        events = []
+        if self.done:
+            return events
+        self.buffer += chunk
+        buf = self.buffer
+        while self._pos < len(buf) and not self.done:
+            i = self._pos
+            ch = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append({"type": "obj", "key": None, "expect_key": True, "start": i, "path": ()})
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    top = self._stack[-1]
+                    if top["type"] == "obj" and top["expect_key"]:
+                        top["key"] = json.loads(buf[self._string_start:i + 1])
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                path = self._path()
+                self._stack.append({
+                    "type": "obj" if ch == "{" else "arr",
+                    "key": None,
+                    "expect_key": ch == "{",
+                    "start": i,
+                    "path": path,
+                })
+            elif ch in "}]":
+                entry = self._stack.pop()
+                name = self.watch.get(entry["path"])
+                if name or not self._stack:
+                    try:
+                        value = json.loads(buf[entry["start"]:i + 1])
+                    except ValueError:
+                        value = None
+                    if value is not None and name:
+                        events.append((name, value))
+                    if not self._stack:
+                        self.done = True
+                        if value is not None:
+                            events.append(("complete", value))
+            elif ch == ":":
+                self._stack[-1]["expect_key"] = False
+            elif ch == ",":
+                top = self._stack[-1]
+                if top["type"] == "obj":
+                    top["expect_key"] = True
+                    top["key"] = None
+        return events
+
+    @property
+    def truncated(self) -> bool:
+        return self._started and not self.done
+
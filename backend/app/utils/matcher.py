@@ -0,0 +1,23 @@
+from typing import Iterable, List, Set
+
+
+class PatternMatcher:
+    """
+    Substring matching of a fixed set of patterns over a corpus.
+    find(text) returns every pattern occurring in text (`pattern in text`). At the
+    K this pipeline uses (9 question patterns + ~15 keyphrases) the C-level `in`
+    loop beats a pure-Python automaton or one lookahead regex; the win is scanning
+    each lowered text once for questions and topics together.
+    Matching is case sensitive: lowercase patterns and texts beforehand.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+
+    def find(self, text: str) -> Set[str]:
+        return {p for p in self.patterns if p in text}
+
+    def scan(self, texts: Iterable[str]) -> List[Set[str]]:
+        """Patterns found in each text, in input order."""
+        patterns = self.patterns
+        return [{p for p in patterns if p in t} for t in texts]
@@ -0,0 +1,71 @@
+import threading
+import time
+from datetime import datetime
+
+
+class ModelRegistry:
+    """
+    Loads models on first use instead of at import time.
+    Modules register a zero-argument loader under a name; get(name) runs it once
+    (thread-safe) and caches the result. warmup() preloads a list of models, e.g.
+    from the FastAPI lifespan, and status() reports what is warm and how long it took.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._info = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._info.setdefault(name, {"loaded": False})
+
+    def get(self, name):
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                try:
+                    model = self._loaders[name]()
+                except Exception as e:
+                    self._info[name] = {"loaded": False, "error": str(e)}
+                    raise
+                self._models[name] = model
+                self._info[name] = {
+                    "loaded": True,
+                    "load_seconds": round(time.perf_counter() - start, 3),
+                    "loaded_at": datetime.utcnow().isoformat() + "Z"
+                }
+        return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warmup(self, names=None, stop=None):
+        """`stop` (a threading.Event) ends a warmup running in a thread before its next model."""
+        for name in (names if names is not None else list(self._loaders)):
+            if stop is not None and stop.is_set():
+                break
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Warmup failed for {name}: {e}")
+        return self.status()
+
+    def unload(self, name):
+        with self._locks.get(name, self._lock):
+            self._models.pop(name, None)
+            self._info[name] = {"loaded": False}
+
+    def status(self):
+        return {name: dict(self._info.get(name, {"loaded": False})) for name in self._loaders}
+
+
+registry = ModelRegistry()
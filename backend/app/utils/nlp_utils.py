@@ -1,72 +1,163 @@
-from textblob import TextBlob
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer
 from collections import Counter
+import numpy as np
 import re
+import time
+from ..config import CONFIG
+from .dedupe import DedupeIndex
+from .model_registry import registry
+from . import sentiment_engine  # registers "textblob_pool"
 
 def clean_text(text):
     text = re.sub(r'http\S+', '', text) # Remove URLs
     text = re.sub(r'[^\w\s]', '', text) # Remove punctuation
     return text.lower()
 
-def analyze_comments(comments):
-    if not comments:
-        return {
-            "sentiment": {"positive": 0, "negative": 0, "neutral": 0},
-            "topics": [],
-            "questions": []
+def top_terms(texts, weights, k=10):
+    """
+    The vocabulary TfidfVectorizer(stop_words='english', max_features=k) would keep,
+    with each text counted `weight` times: terms ranked by weighted corpus frequency.
+    """
+    vectorizer = CountVectorizer(stop_words='english')
+    counts = vectorizer.fit_transform(texts)
+    # Sampled comments carry fractional weights; plain counts stay integer
+    dtype = np.int64 if all(float(w).is_integer() for w in weights) else np.float64
+    tfs = np.asarray(counts.T @ np.asarray(weights, dtype=dtype)).ravel()
+    names = vectorizer.get_feature_names_out()
+    return sorted(names[(-tfs).argsort()[:k]])
+
+class CommentAnalysis:
+    """
+    Incremental version of analyze_comments. Per-comment work (dedupe, cleaning,
+    sentiment, question detection) happens in feed() as batches arrive; corpus-wide
+    work (TF-IDF topics, percentages, engagement) happens once in result().
+
+    With DEDUPE_ENABLED, spam is dropped and near-duplicates are collapsed first
+    (utils/dedupe.py): each group's representative is scored once and counted with
+    the group's weight, while engagement reports the true number of comments.
+    """
+
+    def __init__(self, dedupe=None):
+        dedupe = CONFIG.DEDUPE_ENABLED if dedupe is None else dedupe
+        self.index = DedupeIndex(CONFIG.DEDUPE_MAX_DISTANCE, CONFIG.DEDUPE_DROP_SPAM) if dedupe else None
+        self.counts = {"positive": 0, "negative": 0, "neutral": 0}
+        self.cleaned_texts = []
+        self.weights = []
+        self.labels = []
+        self.questions = []
+        self.total_likes = 0
+        self.total = 0
+        self._pending = None
+        # Seconds spent per step, summed over all feed() calls (for the stage metrics)
+        self.timings = {"clean": 0.0, "sentiment": 0.0, "questions": 0.0, "topics": 0.0}
+
+    def add(self, comments):
+        """
+        First half of feed(): groups the comments and returns the texts of the new
+        representatives, which must be labelled and passed to score() before the
+        next add(). Split out so a batch of videos can share one scoring pass.
+        """
+        start = time.perf_counter()
+        if self.index is not None:
+            first_new = len(self.index.groups)
+            gids = self.index.assign(comments)
+            new = self.index.groups[first_new:]
+        else:
+            first_new = len(self.labels)
+            gids = list(range(first_new, first_new + len(comments)))
+            new = comments
+        self.cleaned_texts.extend(clean_text(c['text']) for c in new)
+        if self.index is None:
+            self.weights.extend(c.get('weight', 1) for c in new)
+        self.timings["clean"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for c in new:
+            # 3. Question Extraction
+            text = c['text']
+            if "?" in text or text.lower().startswith(("how", "what", "why", "when", "can")):
+                self.questions.append({"text": text, "likes": 0})
+        for c in comments:
+            self.total_likes += c.get('likes', 0)
+            self.total += c.get('weight', 1)
+        self.timings["questions"] += time.perf_counter() - start
+
+        self._pending = [(gid, c.get('weight', 1)) for gid, c in zip(gids, comments)]
+        return [c['text'] for c in new]
+
+    def score(self, labels):
+        """Second half of feed(): labels for the texts add() returned, in order."""
+        self.labels.extend(labels)
+        for gid, weight in self._pending:
+            if gid is not None:  # None: dropped as spam
+                self.counts[self.labels[gid]] += weight
+        self._pending = None
+
+    def feed(self, comments):
+        texts = self.add(comments)
+
+        # 1. Sentiment Analysis (batched, spread over the sentiment worker pool)
+        start = time.perf_counter()
+        labels = registry.get("textblob_pool").labels(texts)
+        self.timings["sentiment"] += time.perf_counter() - start
+        self.score(labels)
+
+    def result(self):
+        if not self.total:
+            return {
+                "sentiment": {"positive": 0, "negative": 0, "neutral": 0},
+                "topics": [],
+                "questions": []
+            }
+
+        total = self.total
+        # Percentages over every non-spam comment, duplicates included via their weights
+        scored = sum(self.counts.values()) or 1
+        sentiment = {
+            "positive": round((self.counts["positive"]/scored)*100),
+            "negative": round((self.counts["negative"]/scored)*100),
+            "neutral": round((self.counts["neutral"]/scored)*100)
         }
 
-    texts = [c['text'] for c in comments]
-    cleaned_texts = [clean_text(t) for t in texts]
-
-    # 1. Sentiment Analysis
-    pos, neg, neu = 0, 0, 0
-    for text in texts:
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        if polarity > 0.1: pos += 1
-        elif polarity < -0.1: neg += 1
-        else: neu += 1
-    
-    total = len(texts)
-    sentiment = {
-        "positive": round((pos/total)*100),
-        "negative": round((neg/total)*100),
-        "neutral": round((neu/total)*100)
-    }
-
-    # 2. Topic Extraction (TF-IDF)
-    try:
-        vectorizer = TfidfVectorizer(stop_words='english', max_features=10)
-        tfidf_matrix = vectorizer.fit_transform(cleaned_texts)
-        feature_names = vectorizer.get_feature_names_out()
-        topics = [{"topic": word, "weight": 10} for word in feature_names]
-    except:
-        # Fallback if too few words
-        all_words = " ".join(cleaned_texts).split()
-        common = Counter(all_words).most_common(5)
-        topics = [{"topic": word, "weight": count} for word, count in common]
-
-    # 3. Question Extraction
-    questions = []
-    for text in texts:
-        if "?" in text or text.lower().startswith(("how", "what", "why", "when", "can")):
-            questions.append({"text": text, "likes": 0})
-    
-    # Sort questions by length (heuristic for quality) and take top 10
-    questions.sort(key=lambda x: len(x['text']), reverse=True)
-    
-    # 4. Engagement Metrics
-    total_likes = sum(c.get('likes', 0) for c in comments)
-    engagement = {
-        "comments_count": len(comments),
-        "total_likes": total_likes,
-        "avg_likes": round(total_likes / len(comments)) if comments else 0
-    }
-
-    return {
-        "sentiment": sentiment,
-        "topics": topics,
-        "questions": questions[:10],
-        "engagement": engagement
-    }
\ No newline at end of file
+        # 2. Topic Extraction (TF-IDF)
+        start = time.perf_counter()
+        # Group sizes keep growing as later batches add duplicates, so read them now
+        weights = [g["weight"] for g in self.index.groups] if self.index is not None else self.weights
+        try:
+            feature_names = top_terms(self.cleaned_texts, weights, 10)
+            topics = [{"topic": word, "weight": 10} for word in feature_names]
+        except:
+            # Fallback if too few words
+            all_words = Counter()
+            for text, weight in zip(self.cleaned_texts, weights):
+                for word in text.split():
+                    all_words[word] += weight
+            common = all_words.most_common(5)
+            topics = [{"topic": word, "weight": count} for word, count in common]
+        self.timings["topics"] = time.perf_counter() - start
+
+        # Sort questions by length (heuristic for quality) and take top 10
+        questions = sorted(self.questions, key=lambda x: len(x['text']), reverse=True)
+
+        # 4. Engagement Metrics
+        engagement = {
+            "comments_count": total,
+            "total_likes": self.total_likes,
+            "avg_likes": round(self.total_likes / total)
+        }
+
+        result = {
+            "sentiment": sentiment,
+            "topics": topics,
+            "questions": questions[:10],
+            "engagement": engagement
+        }
+        if self.index is not None:
+            # Fractional when the comments are a weighted sample
+            result["dedupe"] = {k: round(v) for k, v in self.index.stats().items()}
+        return result
+
+def analyze_comments(comments):
+    analysis = CommentAnalysis()
+    analysis.feed(comments or [])
+    return analysis.result()
@@ -0,0 +1,154 @@
+import re
+from typing import Dict, List
+
+from textblob import TextBlob
+
+from .sentiment_engine import classify
+
+# One result schema for every backend, one dict per input text:
+#   label:      "positive" | "neutral" | "negative"
+#   score:      polarity in [-1, 1] (negative .. positive)
+#   confidence: how sure the backend is of `label`, in [0, 1]
+LABELS = ("positive", "neutral", "negative")
+
+
+class SentimentBackend:
+    """
+    Batch sentiment scorer. score(texts) returns one result per text, in input order.
+    Subclasses set `name` and implement score(); heavy models are loaded lazily
+    through the model registry, so constructing a backend is cheap.
+    """
+    name = ""
+
+    def score(self, texts: List[str]) -> List[Dict]:
+        raise NotImplementedError
+
+    def summary(self, texts: List[str]) -> Dict[str, float]:
+        """Label percentages over texts, the shape the API responses use."""
+        return summarize(self.score(texts))
+
+
+def summarize(results: List[Dict]) -> Dict[str, float]:
+    total = len(results)
+    if not total:
+        return {label: 0 for label in LABELS}
+    counts = {label: 0 for label in LABELS}
+    for r in results:
+        counts[r["label"]] += 1
+    return {label: round(counts[label] / total * 100, 1) for label in LABELS}
+
+
+class TextBlobBackend(SentimentBackend):
+    """Pattern-based polarity, same thresholds as analyze_comments."""
+    name = "textblob"
+
+    def score(self, texts):
+        results = []
+        for text in texts:
+            polarity = TextBlob(text or "").sentiment.polarity
+            results.append({"label": classify(polarity), "score": polarity, "confidence": abs(polarity)})
+        return results
+
+
+class VaderBackend(SentimentBackend):
+    """VADER compound score, same thresholds as sentiment_utils.analyze_sentiment."""
+    name = "vader"
+
+    def score(self, texts):
+        from .sentiment_utils import analyze_sentiment
+        results = []
+        for text in texts:
+            compound = analyze_sentiment(text)["compound"]
+            label = "positive" if compound >= 0.05 else "negative" if compound <= -0.05 else "neutral"
+            results.append({"label": label, "score": compound, "confidence": abs(compound)})
+        return results
+
+
+class LexiconBackend(SentimentBackend):
+    """The hand word list from ml_nlp.analyze_text_nlp, applied per comment."""
+    name = "lexicon"
+    TOKEN_RE = re.compile(r"[a-zA-Z0-9\#@]{2,}")
+
+    def score(self, texts):
+        from ..ml_nlp import POS_WORDS, NEG_WORDS
+        results = []
+        for text in texts:
+            words = self.TOKEN_RE.findall((text or "").lower())
+            pos = sum(w in POS_WORDS for w in words)
+            neg = sum(w in NEG_WORDS for w in words)
+            score = (pos - neg) / (pos + neg) if pos + neg else 0.0
+            label = "positive" if score > 0 else "negative" if score < 0 else "neutral"
+            # No lexicon hits at all means "no opinion found", not "confidently neutral"
+            results.append({"label": label, "score": score, "confidence": abs(score) if pos + neg else 0.0})
+        return results
+
+
+class TransformerBackend(SentimentBackend):
+    """RoBERTa via pipelines.nlp (length-sorted batching, SENTIMENT_BACKEND runtime)."""
+    name = "roberta"
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size
+
+    def score(self, texts):
+        from ..pipelines.nlp import clean, label_for, score_texts
+        results = []
+        for probs in score_texts([clean(t or "")[:500] for t in texts], batch_size=self.batch_size):
+            results.append({
+                "label": label_for(probs),
+                "score": probs.get("LABEL_2", 0) - probs.get("LABEL_0", 0),
+                "confidence": max(probs.values()) if probs else 0.0,
+            })
+        return results
+
+
+class CascadeBackend(SentimentBackend):
+    """
+    Cheap backend first, transformer only where it is unsure.
+    Every text is scored by `first` (vader or lexicon); texts whose confidence is below
+    `threshold` are re-scored by the transformer and take its result. Each result
+    records which backend decided it under "backend", so callers can report the
+    escalated fraction (see escalation_stats).
+    """
+    name = "cascade"
+
+    def __init__(self, first=None, threshold=None, final="roberta"):
+        from ..config import CONFIG
+        self.first = first or CONFIG.SENTIMENT_CASCADE or "vader"
+        self.threshold = CONFIG.SENTIMENT_CASCADE_THRESHOLD if threshold is None else threshold
+        self.final = final
+
+    def score(self, texts):
+        results = [dict(r, backend=self.first) for r in get_backend(self.first).score(texts)]
+        unsure = [i for i, r in enumerate(results) if r["confidence"] < self.threshold]
+        if unsure:
+            rescored = get_backend(self.final).score([texts[i] for i in unsure])
+            for i, r in zip(unsure, rescored):
+                results[i] = dict(r, backend=self.final)
+        return results
+
+    def escalation_stats(self, results: List[Dict]) -> Dict[str, float]:
+        escalated = sum(r.get("backend") == self.final for r in results)
+        return {
+            "escalated": escalated,
+            "escalated_fraction": round(escalated / len(results), 4) if results else 0.0,
+        }
+
+
+BACKENDS = {}
+
+def register_backend(cls):
+    BACKENDS[cls.name] = cls
+    return cls
+
+for _cls in (TextBlobBackend, VaderBackend, LexiconBackend, TransformerBackend, CascadeBackend):
+    register_backend(_cls)
+
+_instances = {}
+
+def get_backend(name: str) -> SentimentBackend:
+    if name not in BACKENDS:
+        raise KeyError(f"Unknown sentiment backend: {name} (available: {', '.join(BACKENDS)})")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
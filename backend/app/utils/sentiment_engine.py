@@ -0,0 +1,123 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
+from textblob import TextBlob
+from ..config import CONFIG
+from .model_registry import registry
+
+# Same polarity thresholds analyze_comments has always used
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+# Default pool size cap: every API worker process warms its own pool at startup
+DEFAULT_MAX_WORKERS = 4
+
+def classify(polarity):
+    if polarity > POSITIVE_THRESHOLD:
+        return "positive"
+    if polarity < NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+def score_buckets(texts):
+    """Single-process scoring: counts of positive/negative/neutral texts."""
+    counts = {"positive": 0, "negative": 0, "neutral": 0}
+    for text in texts:
+        counts[classify(TextBlob(text).sentiment.polarity)] += 1
+    return counts
+
+def score_labels(texts):
+    """Single-process scoring: one label per text, in order."""
+    return [classify(TextBlob(text).sentiment.polarity) for text in texts]
+
+def _warm_worker():
+    # Pays TextBlob's lazy imports / lexicon load once per worker, not on the first real chunk
+    TextBlob("warm up").sentiment
+    return os.getpid()
+
+class BatchSentimentEngine:
+    """
+    Scores a whole list of texts in chunks across a process pool.
+    The pool is created and warmed on first use and reused for every later call.
+    Small inputs are scored inline since pickling them to workers costs more than it saves.
+    """
+
+    def __init__(self, workers=None, chunk_size=250, min_parallel=500):
+        self.workers = workers or min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.min_parallel = min_parallel
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._pool is None and self.workers > 1:
+                pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                # One warm-up task per worker forces every process to spawn now
+                for f in [pool.submit(_warm_worker) for _ in range(self.workers)]:
+                    f.result()
+                self._pool = pool
+        return self
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def submit(self, fn, *args):
+        """
+        Runs fn(*args) on the worker pool, for other chunked CPU-bound work (ml_nlp):
+        one set of processes per core instead of a pool per feature. Needs workers > 1.
+        """
+        self.start()
+        return self._pool.submit(fn, *args)
+
+    def buckets(self, texts):
+        texts = list(texts)
+        if self.workers <= 1 or len(texts) < self.min_parallel:
+            return score_buckets(texts)
+        self.start()
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        counts = {"positive": 0, "negative": 0, "neutral": 0}
+        for partial in self._pool.map(score_buckets, chunks):
+            for k, v in partial.items():
+                counts[k] += v
+        return counts
+
+    def labels_many(self, text_sets):
+        """
+        Per-text labels for several independent text lists in one pass: chunks from
+        every list go to the pool together, so small lists share the workers instead
+        of each paying for its own round trip. Returns one label list per input list.
+        """
+        text_sets = [list(texts) for texts in text_sets]
+        if self.workers <= 1 or sum(map(len, text_sets)) < self.min_parallel:
+            return [score_labels(texts) for texts in text_sets]
+        self.start()
+        owners, chunks = [], []
+        for i, texts in enumerate(text_sets):
+            for j in range(0, len(texts), self.chunk_size):
+                owners.append(i)
+                chunks.append(texts[j:j + self.chunk_size])
+        results = [[] for _ in text_sets]
+        for i, partial in zip(owners, self._pool.map(score_labels, chunks)):
+            results[i].extend(partial)
+        return results
+
+    def labels(self, texts):
+        return self.labels_many([texts])[0]
+
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = BatchSentimentEngine(workers=CONFIG.SENTIMENT_WORKERS or None)
+    return _engine
+
+# Warming the pool spawns and primes every worker process
+registry.register("textblob_pool", lambda: get_engine().start())
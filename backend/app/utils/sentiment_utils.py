@@ -1,10 +1,14 @@
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict
+from typing import Dict, List
+from .model_registry import registry
 
-_analyzer = SentimentIntensityAnalyzer()
+def _load_vader():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+registry.register("vader", _load_vader)
 
 def analyze_sentiment(text: str) -> Dict[str, float]:
-    scores = _analyzer.polarity_scores(text or "")
+    scores = registry.get("vader").polarity_scores(text or "")
     # map to simple labels
     compound = scores.get("compound", 0.0)
     if compound >= 0.05:
@@ -14,3 +18,14 @@ def analyze_sentiment(text: str) -> Dict[str, float]:
     else:
         label = "neutral"
     return {"label": label, "scores": scores, "compound": compound}
+
+
+def overall_sentiment_summary(sentiments: List[Dict]) -> Dict[str, float]:
+    """Label percentages and mean compound score over analyze_sentiment() results."""
+    if not sentiments:
+        return {"positive": 0.0, "neutral": 0.0, "negative": 0.0, "avg_compound": 0.0}
+    total = len(sentiments)
+    summary = {label: round(sum(s["label"] == label for s in sentiments) / total * 100, 1)
+               for label in ("positive", "neutral", "negative")}
+    summary["avg_compound"] = round(sum(s["compound"] for s in sentiments) / total, 4)
+    return summary
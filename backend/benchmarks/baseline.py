@@ -0,0 +1,73 @@
+# benchmarks/baseline.py
+"""JSON baselines for the benchmarks, and comparison against a stored run."""
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+def environment():
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "recorded_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def save(path, results, **meta):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), **meta, "results": results}, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def _flatten(results, prefix=""):
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + "/")
+        elif isinstance(value, (int, float)):
+            yield name, value
+
+
+def compare(current, baseline, metrics, tolerance=1.3, higher_is_better=(), floor=0.0):
+    """
+    Ratios of current vs baseline for every numeric leaf whose name ends in one of
+    `metrics`. A ratio above `tolerance` is a regression; for metrics listed in
+    higher_is_better (e.g. throughput) the ratio is inverted so that holds too.
+    Values where both runs are below `floor` are skipped as timer noise.
+    Returns a list of {"metric", "baseline", "current", "ratio", "regression"}.
+    """
+    old = dict(_flatten(baseline))
+    report = []
+    for name, value in _flatten(current):
+        metric = name.rsplit("/", 1)[-1]
+        if metric not in metrics or name not in old or not old[name] or not value:
+            continue
+        if max(old[name], value) < floor:
+            continue
+        ratio = old[name] / value if metric in higher_is_better else value / old[name]
+        report.append({
+            "metric": name,
+            "baseline": old[name],
+            "current": value,
+            "ratio": round(ratio, 3),
+            "regression": ratio > tolerance,
+        })
+    return report
+
+
+def print_report(report):
+    for r in report:
+        flag = "REGRESSION" if r["regression"] else "ok"
+        print(f"{r['metric']:<48} {r['baseline']:>12} -> {r['current']:>12}   x{r['ratio']:<6} {flag}")
+    return any(r["regression"] for r in report)
@@ -0,0 +1,91 @@
+# benchmarks/corpus.py
+"""Comment corpora shared by the benchmarks."""
+import json
+import random
+import re
+
+from app.pipelines.youtube import parse_votes
+
+SAMPLES = [
+    "W video", "love this so much", "this is the worst thing I've watched all week",
+    "ok", "Who is here in 2025?", "not bad but the middle part dragged on way too long honestly",
+    "what camera do you use?", "🔥🔥🔥", "Can you do a tutorial on the editing style next time please",
+    "I disagree with basically everything said here, the data is cherry picked",
+    "lol", "the ending had me crying, genuinely one of the best uploads on this channel",
+]
+
+
+def clean(text):
+    # Same as pipelines.nlp.clean, without importing the model stack
+    return re.sub(r"http\S+|@\w+|#\w+", "", text).strip()
+
+
+def load_texts(corpus, n):
+    if corpus:
+        with open(corpus) as f:
+            data = json.load(f)
+        items = data.get("comments", data) if isinstance(data, dict) else data
+        texts = [c["text"] if isinstance(c, dict) else str(c) for c in items]
+    else:
+        rng = random.Random(7)
+        texts = [" ".join(rng.choice(SAMPLES) for _ in range(rng.randint(1, 4))) for _ in range(n)]
+    return [clean(t)[:500] for t in texts[:n]]
+
+
+# ---------------- Synthetic corpora ----------------
+SIZES = (100, 1000, 10000, 100000)
+
+WORDS = (
+    "video editing camera music intro ending tutorial channel upload part thumbnail sound "
+    "audio light setup gear lens story edit color grade beat drop song voice script "
+    "honestly literally really actually the a this that and but so it is was are of to in "
+    "for on with you your my we i love hate best worst great bad amazing boring nice fun"
+).split()
+EMOJI = ["🔥", "😂", "❤️", "👏", "💯", "😭", "🤯", "👀", "🙌", "😍"]
+OPENERS = ["how", "what", "why", "can you", "where", "when", "which", "who", "is it"]
+VOTES = ["", "0", "3", "12", "87", "450", "1.2K", "3K", "15K", "1.1M"]
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def synthetic_text(rng):
+    # Comment lengths are long-tailed: mostly a few words, some paragraphs
+    n = min(120, max(1, int(rng.lognormvariate(2.0, 0.9))))
+    kind = rng.random()
+    if kind < 0.2:
+        text = f"{rng.choice(OPENERS)} {_sentence(rng, n)}?"
+    elif kind < 0.25:
+        text = rng.choice(SAMPLES)
+    else:
+        text = _sentence(rng, n)
+    if rng.random() < 0.3:
+        text += " " + "".join(rng.choice(EMOJI) for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.05:
+        text += f" https://example.com/watch?v={rng.randrange(10**6)}"
+    if rng.random() < 0.05:
+        text = f"@user{rng.randrange(1000)} {text}"
+    if rng.random() < 0.03:
+        text += f" #{rng.choice(WORDS)}"
+    return text
+
+
+def generate_comments(n, seed=7):
+    """
+    n comment records shaped like the YouTube pipeline's output, plus the raw
+    vote strings the downloader returns (for parse_votes). Deterministic per seed.
+    """
+    rng = random.Random(seed)
+    comments = []
+    for i in range(n):
+        votes = rng.choice(VOTES)
+        comments.append({
+            "id": f"c{seed}-{i}",
+            "text": synthetic_text(rng),
+            "author": f"@user{rng.randrange(5000)}",
+            "votes": votes,
+            "likes": parse_votes(votes),
+            "time": 1700000000 - i * rng.randint(1, 600),
+        })
+    return comments
@@ -0,0 +1,124 @@
+# benchmarks/hot_paths.py
+"""
+Micro-benchmarks for the analysis hot paths over synthetic corpora of 100, 1k, 10k
+and 100k comments (benchmarks/corpus.generate_comments).
+
+Timed per corpus size (median of --repeat runs, one run at 100k):
+    analyze_comments       utils/nlp_utils.analyze_comments (dedupe + TextBlob pool + TF-IDF)
+    collapse_duplicates    utils/dedupe.collapse (spam + near-duplicate grouping alone)
+    analyze_text_nlp       ml_nlp.analyze_text_nlp over the joined comment text
+    analyze_texts_nlp      ml_nlp.analyze_texts_nlp, chunked over the worker pool
+    extract_topics         pipelines/nlp.extract_topics with fixed keyphrases (no KeyBERT)
+    extract_questions      pipelines/nlp.extract_questions
+    repair_json            m3_ideas.repair_json on one truncated response with n/50 ideas
+    calculate_viral_score  m3_ideas.calculate_viral_score, n calls
+    parse_votes            pipelines/youtube.parse_votes over every raw vote string
+
+Run from backend/:
+    python -m benchmarks.hot_paths --sizes 100 1000 10000
+    python -m benchmarks.hot_paths --out benchmarks/baselines/hot_paths.json      # new baseline
+    python -m benchmarks.hot_paths --baseline benchmarks/baselines/hot_paths.json  # compare, exit 1 on regression
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from app.m3_ideas import calculate_viral_score, repair_json
+from app.ml_nlp import analyze_text_nlp, analyze_texts_nlp
+from app.pipelines.nlp import extract_questions, extract_topics
+from app.pipelines.youtube import parse_votes
+from app.utils.dedupe import collapse
+from app.utils.nlp_utils import analyze_comments
+from app.utils.sentiment_engine import get_engine
+from benchmarks import baseline
+from benchmarks.corpus import SIZES, generate_comments
+
+KEYPHRASES = ["video editing", "camera", "music", "tutorial", "sound", "intro", "color grade",
+              "thumbnail", "setup", "beat drop", "voice", "story", "gear", "lens", "song"]
+
+
+def truncated_response(ideas):
+    doc = {
+        "ai_recommendations": {"next_best_content": [{
+            "title": f"Idea {i}",
+            "score": 80,
+            "blueprint": {"hooks": ["Hook 1", "Hook 2"], "script_mini": "Outline " * 20,
+                          "scene_directions": ["Scene 1", "Scene 2"]},
+        } for i in range(ideas)]},
+        "seo_keyword_generator": {"primary_keywords": ["a", "b"]},
+    }
+    text = json.dumps(doc)
+    return text[:int(len(text) * 0.9)]  # cut off mid-stream, like a max_tokens stop
+
+
+def cases(comments):
+    n = len(comments)
+    joined = "\n".join(c["text"] for c in comments)
+    votes = [c["votes"] for c in comments]
+    truncated = truncated_response(max(1, n // 50))
+    m2 = {"topics": [{"topic": k} for k in KEYPHRASES[:6]],
+          "questions": [{"text": "how?"}] * 8,
+          "sentiment": {"positive": 60, "negative": 10}}
+    return {
+        "analyze_comments": lambda: analyze_comments(comments),
+        "collapse_duplicates": lambda: collapse(comments),
+        "analyze_text_nlp": lambda: analyze_text_nlp(joined),
+        "analyze_texts_nlp": lambda: analyze_texts_nlp(c["text"] for c in comments),
+        "extract_topics": lambda: extract_topics(comments, keyphrases=KEYPHRASES),
+        "extract_questions": lambda: extract_questions(comments),
+        "repair_json": lambda: repair_json(truncated),
+        "calculate_viral_score": lambda: [calculate_viral_score(m2) for _ in range(n)],
+        "parse_votes": lambda: [parse_votes(v) for v in votes],
+    }
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="run only these cases")
+    parser.add_argument("--out", help="write results as a JSON baseline to this path")
+    parser.add_argument("--baseline", help="compare against this baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown ratio")
+    args = parser.parse_args()
+
+    results = {}
+    try:
+        for n in args.sizes:
+            comments = generate_comments(n)
+            repeat = args.repeat if n <= 10000 else 1
+            for name, fn in cases(comments).items():
+                if args.only and name not in args.only:
+                    continue
+                fn()  # warm up (process pool, lazy imports)
+                seconds = measure(fn, repeat)
+                results.setdefault(name, {})[str(n)] = {
+                    "seconds": round(seconds, 6),
+                    "comments_per_sec": round(n / seconds, 1) if seconds else None,
+                }
+                print(f"{name:<22} n={n:<7} {seconds * 1000:>10.2f} ms   {n / seconds:>12.0f} comments/s")
+    finally:
+        get_engine().shutdown()
+
+    if args.out:
+        baseline.save(args.out, results, repeat=args.repeat)
+    if args.baseline:
+        report = baseline.compare(results, baseline.load(args.baseline), {"seconds"}, args.tolerance,
+                                  floor=0.01)
+        if baseline.print_report(report):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
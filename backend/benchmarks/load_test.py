@@ -0,0 +1,177 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test of GET /m3/analyze with local stand-ins for the outside world:
+
+    YouTube     the comment downloader is swapped for one that pages synthetic
+                comments (20 per page, --yt-page-ms per page)
+    OpenRouter  a local HTTP server that streams a canned DeepSeek response over
+                SSE (--llm-ms total), reached through OPENROUTER_URL
+
+Every request uses a distinct video id and the response / LLM caches and comment
+store are off, so each one runs the full pipeline. Requests go through the ASGI app
+in-process (app lifespan included); reports throughput and latency percentiles.
+
+Run from backend/:
+    python -m benchmarks.load_test --requests 200 --concurrency 20 --limit 100
+    python -m benchmarks.load_test --out benchmarks/baselines/load_test.json
+    python -m benchmarks.load_test --baseline benchmarks/baselines/load_test.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from app.config import CONFIG
+from benchmarks import baseline
+from benchmarks.corpus import generate_comments
+
+
+def canned_llm_response(ideas=5):
+    return json.dumps({
+        "ai_recommendations": {"next_best_content": [{
+            "title": f"Load test idea {i}",
+            "score": 80,
+            "blueprint": {"hooks": ["Hook 1", "Hook 2"], "script_mini": "Outline...",
+                          "voiceover": {"tone": "Energetic", "gender": "Any"},
+                          "scene_directions": ["Scene 1", "Scene 2"]},
+        } for i in range(ideas)]},
+        "seo_keyword_generator": {"primary_keywords": ["Key1", "Key2"], "secondary_keywords": ["Key3"],
+                                  "search_volume": {"Key1": "10K"}},
+    })
+
+
+def start_openrouter_standin(latency, chunks=40):
+    body = canned_llm_response()
+    size = -(-len(body) // chunks)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not payload.get("stream"):
+                time.sleep(latency)
+                data = json.dumps({"choices": [{"message": {"content": body}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(body), size):
+                time.sleep(latency / chunks)
+                delta = {"choices": [{"delta": {"content": body[i:i + size]}}]}
+                self.wfile.write(f"data: {json.dumps(delta)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def youtube_standin(page_latency):
+    class FakeDownloader:
+        def get_comments(self, video_id, *args, **kwargs):
+            for i, c in enumerate(generate_comments(2000, seed=zlib.crc32(video_id.encode()) % 10000)):
+                if i % 20 == 0:
+                    time.sleep(page_latency)
+                yield {"cid": c["id"], "text": c["text"], "author": c["author"],
+                       "votes": c["votes"], "time_parsed": c["time"]}
+    return FakeDownloader
+
+
+async def run(args):
+    server = start_openrouter_standin(args.llm_ms / 1000)
+    CONFIG.OPENROUTER_URL = f"http://127.0.0.1:{server.server_port}/api/v1/chat/completions"
+    CONFIG.OPENROUTER_API_KEY = CONFIG.OPENROUTER_API_KEY or "load-test"
+    CONFIG.OPENROUTER_RPM = 10 ** 6
+    CONFIG.CACHE_BACKEND = "off"
+    CONFIG.LLM_CACHE_BACKEND = "off"
+    CONFIG.COMMENT_STORE_ENABLED = False
+
+    from app.pipelines import youtube
+    youtube.YoutubeCommentDownloader = youtube_standin(args.yt_page_ms / 1000)
+    from main import app
+
+    latencies, statuses = [], {}
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(client, i):
+        async with sem:
+            start = time.perf_counter()
+            r = await client.get("/m3/analyze", params={
+                "url": f"https://www.youtube.com/watch?v=load{i:06d}", "limit": args.limit})
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            await asyncio.gather(*[one(client, -i - 1) for i in range(args.concurrency)])  # warm up
+            latencies.clear()
+            statuses.clear()
+            start = time.perf_counter()
+            await asyncio.gather(*[one(client, i) for i in range(args.requests)])
+            elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    ordered = sorted(latencies)
+    pct = lambda p: ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "limit": args.limit,
+        "errors": sum(n for code, n in statuses.items() if code != 200),
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "requests_per_sec": round(args.requests / elapsed, 2),
+        "mean_ms": round(statistics.mean(ordered), 1),
+        "p50_ms": round(pct(50), 1),
+        "p95_ms": round(pct(95), 1),
+        "p99_ms": round(pct(99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=100, help="comments per request")
+    parser.add_argument("--yt-page-ms", type=float, default=50, help="stand-in latency per 20-comment page")
+    parser.add_argument("--llm-ms", type=float, default=800, help="stand-in time to stream the full LLM answer")
+    parser.add_argument("--out", help="write results as a JSON baseline to this path")
+    parser.add_argument("--baseline", help="compare against this baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown ratio")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    if args.out:
+        baseline.save(args.out, results, yt_page_ms=args.yt_page_ms, llm_ms=args.llm_ms)
+    if args.baseline:
+        report = baseline.compare(results, baseline.load(args.baseline),
+                                  {"p50_ms", "p99_ms", "requests_per_sec"}, args.tolerance,
+                                  higher_is_better={"requests_per_sec"})
+        if baseline.print_report(report) or results["errors"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
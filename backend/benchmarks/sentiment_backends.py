@@ -0,0 +1,117 @@
+# benchmarks/sentiment_backends.py
+"""
+Compares the registered sentiment backends (textblob, vader, lexicon, roberta).
+
+For every backend and batch size: comments/sec, p50/p99 latency per batch, and the
+peak RSS of a fresh process that loaded only that backend. Accuracy against the
+hand-labelled fixture and pairwise label agreement between backends come from
+fixtures/labelled_comments.json. Backends whose dependencies are missing are skipped.
+
+Run from backend/:
+    python -m benchmarks.sentiment_backends --texts 2000 --batch-sizes 1 32 256
+    python -m benchmarks.sentiment_backends --backends textblob vader --out sentiment.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+from benchmarks.corpus import load_texts
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "labelled_comments.json")
+
+
+def load_fixture(path=FIXTURE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def run_backend(name, texts, batch_sizes, fixture_texts):
+    """Runs in its own process so ru_maxrss reflects this backend alone."""
+    from app.utils.sentiment_backends import get_backend
+
+    backend = get_backend(name)
+    backend.score(texts[:4])  # load models / lexicons before timing
+    runs = []
+    for bs in batch_sizes:
+        latencies = []
+        start = time.perf_counter()
+        for i in range(0, len(texts), bs):
+            t0 = time.perf_counter()
+            backend.score(texts[i:i + bs])
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - start
+        runs.append({
+            "batch_size": bs,
+            "comments_per_sec": round(len(texts) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        })
+    labels = [r["label"] for r in backend.score(fixture_texts)]
+    # Linux reports ru_maxrss in KiB
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"backend": name, "runs": runs, "peak_rss_mb": round(peak_rss_mb, 1), "fixture_labels": labels}
+
+
+def agreement(a, b):
+    return sum(x == y for x, y in zip(a, b)) / len(a) if a else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSON list of comments (or {'comments': [...]})")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--backends", nargs="+", default=["textblob", "vader", "lexicon", "roberta"])
+    parser.add_argument("--fixture", default=FIXTURE, help="JSON list of {'text', 'label'}")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus, args.texts)
+    fixture = load_fixture(args.fixture)
+    gold = [item["label"] for item in fixture]
+    fixture_texts = [item["text"] for item in fixture]
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in args.backends:
+        with ctx.Pool(1) as pool:
+            try:
+                result = pool.apply(run_backend, (name, texts, args.batch_sizes, fixture_texts))
+            except (ImportError, OSError) as e:
+                print(f"skipping {name}: {e}")
+                continue
+        result["accuracy"] = round(agreement(result["fixture_labels"], gold), 4)
+        results.append(result)
+
+    pairwise = {}
+    for i, a in enumerate(results):
+        for b in results[i + 1:]:
+            pairwise[f"{a['backend']}~{b['backend']}"] = round(agreement(a["fixture_labels"], b["fixture_labels"]), 4)
+
+    for r in results:
+        print(f"{r['backend']:<10} accuracy {r['accuracy']:.2%}   peak RSS {r['peak_rss_mb']} MB")
+        for run in r["runs"]:
+            print(f"    bs{run['batch_size']:<5} {run['comments_per_sec']:>10} comments/s   "
+                  f"p50 {run['p50_ms']} ms   p99 {run['p99_ms']} ms")
+    for pair, value in pairwise.items():
+        print(f"agreement {pair}: {value:.2%}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"texts": len(texts), "fixture": len(fixture), "results": results,
+                       "pairwise_agreement": pairwise}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
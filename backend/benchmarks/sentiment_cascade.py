@@ -0,0 +1,84 @@
+# benchmarks/sentiment_cascade.py
+"""
+Measures the sentiment cascade (cheap backend first, RoBERTa only below a confidence
+threshold) against running RoBERTa on every comment.
+
+For each first-stage backend and threshold: share of comments escalated to the
+transformer, label agreement with the full-transformer run, accuracy on the labelled
+fixture, and speedup over the full run on the timing corpus.
+
+Run from backend/:
+    python -m benchmarks.sentiment_cascade --texts 2000 --thresholds 0.3 0.5 0.7
+    python -m benchmarks.sentiment_cascade --first vader lexicon --out cascade.json
+"""
+import argparse
+import json
+import time
+
+from app.utils.sentiment_backends import CascadeBackend, get_backend
+from benchmarks.corpus import load_texts
+from benchmarks.sentiment_backends import FIXTURE, agreement, load_fixture
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def labels(results):
+    return [r["label"] for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSON list of comments (or {'comments': [...]})")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--first", nargs="+", default=["vader", "lexicon"])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.3, 0.5, 0.7])
+    parser.add_argument("--fixture", default=FIXTURE, help="JSON list of {'text', 'label'}")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus, args.texts)
+    fixture = load_fixture(args.fixture)
+    gold = [item["label"] for item in fixture]
+    fixture_texts = [item["text"] for item in fixture]
+
+    transformer = get_backend("roberta")
+    try:
+        transformer.score(texts[:4])  # load the model before timing
+    except ImportError as e:
+        raise SystemExit(f"the cascade needs the transformer backend: {e}")
+    full, full_elapsed = timed(lambda: transformer.score(texts))
+    full_fixture = labels(transformer.score(fixture_texts))
+    results = [{
+        "mode": "roberta (all)",
+        "escalated_fraction": 1.0,
+        "agreement_with_full": 1.0,
+        "accuracy": round(agreement(full_fixture, gold), 4),
+        "speedup": 1.0,
+    }]
+
+    for first in args.first:
+        for threshold in args.thresholds:
+            cascade = CascadeBackend(first=first, threshold=threshold)
+            scored, elapsed = timed(lambda: cascade.score(texts))
+            results.append({
+                "mode": f"{first}>{threshold}",
+                "escalated_fraction": cascade.escalation_stats(scored)["escalated_fraction"],
+                "agreement_with_full": round(agreement(labels(scored), labels(full)), 4),
+                "accuracy": round(agreement(labels(cascade.score(fixture_texts)), gold), 4),
+                "speedup": round(full_elapsed / elapsed, 2),
+            })
+
+    for r in results:
+        print(f"{r['mode']:<16} escalated {r['escalated_fraction']:>7.2%}   agreement {r['agreement_with_full']:.2%}   "
+              f"accuracy {r['accuracy']:.2%}   speedup {r['speedup']}x")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"texts": len(texts), "fixture": len(fixture), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/transformer_sentiment.py
+"""
+Compares CPU throughput and label agreement of the RoBERTa sentiment modes.
+
+Baseline is the original path (one pipeline call, default batching, fp32, input
+order). Every other mode is scored against the baseline labels.
+
+Run from backend/:
+    python -m benchmarks.transformer_sentiment --texts 1000 --batch-sizes 8 32 64
+    python -m benchmarks.transformer_sentiment --corpus comments.json --out bench.json
+"""
+import argparse
+import json
+import time
+
+from transformers import pipeline
+
+from app.pipelines.nlp import SENTIMENT_MODEL, LABEL_ALIASES, build_sentiment_pipeline, label_for, score_texts
+from benchmarks.corpus import load_texts
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSON list of comments (or {'comments': [...]})")
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "int8", "onnx"])
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus, args.texts)
+
+    baseline_pipe = pipeline("sentiment-analysis", model=SENTIMENT_MODEL, return_all_scores=True)
+    baseline_pipe(texts[:4])  # warm up
+    raw, elapsed = timed(lambda: baseline_pipe(texts))
+    baseline = [label_for({LABEL_ALIASES.get(x["label"], x["label"]): x["score"] for x in r}) for r in raw]
+    results = [{"mode": "baseline", "texts_per_sec": round(len(texts) / elapsed, 1), "agreement": 1.0}]
+
+    for backend in args.backends:
+        try:
+            pipe = build_sentiment_pipeline(backend)
+        except ImportError as e:
+            print(f"skipping {backend}: {e}")
+            continue
+        pipe(texts[:4])
+        for bs in args.batch_sizes:
+            scores, elapsed = timed(lambda: score_texts(texts, batch_size=bs, pipe=pipe))
+            labels = [label_for(s) for s in scores]
+            agreement = sum(a == b for a, b in zip(labels, baseline)) / len(texts)
+            results.append({
+                "mode": f"{backend}/sorted/bs{bs}",
+                "texts_per_sec": round(len(texts) / elapsed, 1),
+                "agreement": round(agreement, 4),
+            })
+
+    for r in results:
+        print(f"{r['mode']:<24} {r['texts_per_sec']:>10} texts/s   agreement {r['agreement']:.2%}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"texts": len(texts), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
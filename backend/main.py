@@ -1,16 +1,57 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 import asyncio
+import threading
+import time
+from typing import List, Optional
+from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from datetime import datetime
-from app.pipelines.youtube import fetch_youtube_comments
-from app.utils.nlp_utils import analyze_comments
-from app.m3_ideas import generate_m3
+from app.m3_pipeline import run_m3_analysis, format_sse, format_ndjson
+from app.m3_batch import run_m3_batch
+from app.llm_client import get_llm_client
+from app.http_pool import get_http_pool
+from app.cache import get_cache
+from app.comment_store import get_comment_store, refresh_reddit, refresh_tiktok
+from app.llm_cache import get_llm_cache
+from app.search_cache import get_search_cache
+from app.jobs import get_job_runner
+from app.pipelines.google_trends import shutdown_trends_executor
+from app.config import CONFIG
+from app.metrics import REGISTRY, HTTP_REQUESTS, HTTP_LATENCY, HTTP_INFLIGHT, cache_collector, gauge_collector
+from app.utils.model_registry import registry
+from app.utils.sentiment_engine import get_engine
+# Imported so their lazily-loaded models show up in /health/ready
+from app.pipelines import nlp as _nlp  # noqa: F401
+from app.utils import sentiment_utils as _sentiment_utils  # noqa: F401
 from fastapi.middleware.cors import CORSMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm models in the background so the server accepts traffic (and /health) immediately;
+    # /health/ready flips to ready once every WARMUP_MODELS entry is loaded.
+    # The thread can't be cancelled; stop_warmup makes it skip the models it hasn't reached
+    stop_warmup = threading.Event()
+    warmup = asyncio.create_task(asyncio.to_thread(registry.warmup, CONFIG.WARMUP_MODELS, stop_warmup))
+    jobs = get_job_runner()
+    jobs.start(CONFIG.JOB_WORKERS)
+    yield
+    stop_warmup.set()
+    warmup.cancel()
+    await jobs.stop()
+    get_engine().shutdown()
+    await get_llm_client().aclose()
+    await get_http_pool().aclose()
+    shutdown_trends_executor()
+
+
 app = FastAPI(
     title="ViralEdge M3 Engine",
     description="Professional AI-powered viral content generator",
     version="3.0",
-    root_path="/api/py"
+    root_path="/api/py",
+    lifespan=lifespan
 )
 
 
@@ -23,6 +64,32 @@ app.add_middleware(
 )
 
 
+REGISTRY.register_collector(cache_collector({
+    "analyze": lambda: get_cache().stats(),
+    "llm": lambda: get_llm_cache().stats(),
+    "reddit_search": lambda: get_search_cache().stats(),
+}))
+REGISTRY.register_collector(gauge_collector(
+    "job_queue_depth", "Background jobs waiting for a worker.", lambda: get_job_runner().queue.depth()))
+
+
+@app.middleware("http")
+async def record_timing(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    HTTP_INFLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_INFLIGHT.dec()
+        # Label by route template, not raw path, to keep label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=str(status))
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Agentic Eye API"}
@@ -32,70 +99,109 @@ async def m3_analyze(
     url: str = Query(..., description="Video URL"), 
     tier: str = Query("Free", description="User Tier"),
     platform: str = Query("youtube", description="Platform (youtube/tiktok)"),
-    limit: int = Query(100, description="Comment limit")
+    limit: int = Query(100, description="Comment limit"),
+    refresh: bool = Query(False, description="Bypass the response cache"),
+    sample: Optional[int] = Query(None, description="Analyze a stratified sample of this many comments (default SAMPLE_BUDGET, 0 = all)")
 ):
-    try:
-        if platform == "tiktok":
-            # Mock TikTok Analysis for now as we don't have a TikTok scraper
-            m2 = {
-                "topics": [{"topic": "Trending Challenge"}, {"topic": "Viral Sound"}, {"topic": "Dance"}],
-                "questions": [{"text": "What is this song?"}, {"text": "Tutorial please!"}],
-                "sentiment": {"positive": 85},
-                "engagement": {"comments_count": 1200}
-            }
-        # 1. Fetch Comments
-        # The original code used asyncio.to_thread for fetch_youtube_comments,
-        # but the new snippet calls it directly. Assuming fetch_youtube_comments
-        # is now synchronous or handles its own async.
-        # If fetch_youtube_comments is still synchronous and blocking,
-        # it should be wrapped in asyncio.to_thread.
-        comments_data = await asyncio.to_thread(fetch_youtube_comments, url, max_comments=limit)
-        if "error" in comments_data:
-            return JSONResponse(content={"error": f"YouTube Error: {comments_data['error']}"}, status_code=400)
-        
-        comments = comments_data["comments"]
-        if not comments:
-             return JSONResponse(content={"error": "No comments found or video is private."}, status_code=400)
-
-        # 2. Analyze Sentiment & Topics (NLP)
-        # We pass the raw comments list to the NLP analyzer
-        nlp_results = analyze_comments(comments)
-        
-        # 3. Generate Viral Ideas & Script (DeepSeek AI)
-        # We construct a rich prompt context
-        ai_context = {
-            "video_url": url,
-            "platform": platform,
-            "tier": tier,
-            "sentiment_summary": nlp_results.get("sentiment", {}),
-            "top_topics": nlp_results.get("topics", [])[:5],
-            "comments_sample": [c["text"] for c in comments[:20]] # Feed top 20 comments to AI
-        }
-        
-        m3_results = await generate_m3(ai_context)
-        
-        # 4. Construct Final JSON Response
-        response_data = {
-            "viral_score": m3_results.get("viral_prediction_engine", {}).get("score", 85), # Fallback to 85 if AI fails
-            "sentiment": nlp_results.get("sentiment", {"positive": 0, "negative": 0, "neutral": 0}),
-            "topics": nlp_results.get("topics", []),
-            "ideas": m3_results.get("content_ideas_agent", {}).get("ideas", []),
-            "full_script": m3_results.get("script_generation_agent", {}).get("script", "Script generation unavailable."),
-            "engagement_metrics": nlp_results.get("engagement_metrics", {
-                "comments_count": len(comments),
-                "total_likes": sum(c.get('votes', 0) for c in comments),
-                "avg_likes": 0
-            }),
-            "m2_analysis": nlp_results, # Keep legacy structure for backward compatibility if needed
-            "m3_generation": m3_results
-        }
-
-        return response_data
-
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(content={"error": str(e), "trace": traceback.format_exc()}, status_code=500)
+    async for event, data in run_m3_analysis(url, tier, platform, limit, refresh, sample):
+        if event == "error":
+            status = data.pop("status", 500)
+            return JSONResponse(content=data, status_code=status)
+        if event == "result":
+            return data
+
+@app.get("/m3/analyze/stream")
+async def m3_analyze_stream(
+    url: str = Query(..., description="Video URL"),
+    tier: str = Query("Free", description="User Tier"),
+    platform: str = Query("youtube", description="Platform (youtube/tiktok)"),
+    limit: int = Query(100, description="Comment limit"),
+    refresh: bool = Query(False, description="Bypass the response cache"),
+    sample: Optional[int] = Query(None, description="Analyze a stratified sample of this many comments (default SAMPLE_BUDGET, 0 = all)"),
+    format: str = Query("sse", description="Event format (sse/ndjson)")
+):
+    # Same pipeline as /m3/analyze, but every stage is sent as soon as it finishes
+    formatter = format_ndjson if format == "ndjson" else format_sse
+
+    async def events():
+        async for event, data in run_m3_analysis(url, tier, platform, limit, refresh, sample):
+            yield formatter(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson" if format == "ndjson" else "text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class BatchRequest(BaseModel):
+    urls: List[str]
+    tier: str = "Free"
+    limit: int = 100
+    refresh: bool = False
+
+@app.post("/m3/analyze/batch")
+async def m3_analyze_batch(
+    body: BatchRequest,
+    format: str = Query("ndjson", description="Event format (ndjson/sse)")
+):
+    # One result (or error) event per URL as each video finishes, then a "done" summary
+    if not body.urls:
+        raise HTTPException(status_code=400, detail="urls must not be empty")
+    if len(body.urls) > CONFIG.BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {CONFIG.BATCH_MAX_URLS} urls per batch")
+    formatter = format_sse if format == "sse" else format_ndjson
+
+    async def events():
+        async for event, data in run_m3_batch(body.urls, body.tier, body.limit, body.refresh):
+            yield formatter(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/m3/jobs", status_code=202)
+async def create_job(
+    url: str = Query(..., description="Video URL"),
+    tier: str = Query("Free", description="User Tier"),
+    platform: str = Query("youtube", description="Platform (youtube/tiktok)"),
+    limit: int = Query(100, description="Comment limit"),
+    refresh: bool = Query(False, description="Bypass the response cache"),
+    sample: Optional[int] = Query(None, description="Analyze a stratified sample of this many comments (default SAMPLE_BUDGET, 0 = all)")
+):
+    # Queue the analysis and return immediately; poll GET /m3/jobs/{id} for progress
+    params = {"url": url, "tier": tier, "platform": platform, "limit": limit, "refresh": refresh,
+              "sample": sample}
+    job = await asyncio.to_thread(get_job_runner().submit, params)
+    if job is None:
+        return JSONResponse(content={"error": "Job queue is full, retry later."}, status_code=429,
+                            headers={"Retry-After": "30"})
+    return {"job_id": job["id"], "status": job["status"], "status_url": f"/m3/jobs/{job['id']}"}
+
+@app.get("/m3/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(get_job_runner().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+@app.get("/reddit/post")
+async def reddit_post(url: str = Query(..., description="Reddit post URL")):
+    store = get_comment_store() if CONFIG.COMMENT_STORE_ENABLED else None
+    data = await asyncio.to_thread(refresh_reddit, store, url)
+    if "error" in data:
+        return JSONResponse(content=data, status_code=502)
+    return data
+
+@app.get("/tiktok/comments")
+async def tiktok_comments(url: str = Query(..., description="TikTok video URL")):
+    store = get_comment_store() if CONFIG.COMMENT_STORE_ENABLED else None
+    data = await asyncio.to_thread(refresh_tiktok, store, url)
+    if "error" in data:
+        status = 400 if data["error"] == "Invalid TikTok URL" else 502
+        return JSONResponse(content=data, status_code=status)
+    return data
 
 @app.post("/m3/generate-script")
 async def generate_script_endpoint(
@@ -156,6 +262,19 @@ async def generate_script_endpoint(
     
     return {"script": structure, "status": "Generated"}
 
+@app.get("/m3/cache")
+async def cache_stats():
+    return {
+        "analyze": await asyncio.to_thread(get_cache().stats),
+        "llm": await asyncio.to_thread(get_llm_cache().stats)
+    }
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text exposition format
+    text = await asyncio.to_thread(REGISTRY.render)
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health():
     return {
@@ -163,4 +282,13 @@ async def health():
         "service": "AgenticEye Backend",
         "version": "3.0",
         "time": datetime.utcnow().isoformat() + "Z"
-    }
\ No newline at end of file
+    }
+
+@app.get("/health/ready")
+async def ready():
+    models = registry.status()
+    is_ready = all(models.get(name, {}).get("loaded") for name in CONFIG.WARMUP_MODELS)
+    return JSONResponse(
+        content={"ready": is_ready, "warmup": CONFIG.WARMUP_MODELS, "models": models},
+        status_code=200 if is_ready else 503
+    )
@@ -172,7 +172,7 @@ def analyze_video(url):
         status_text.text("Generating viral concepts with DeepSeek-V3...")
         
         # 3. Idea Generation (M3)
-        m3 = generate_m3(m2)
+        m3 = asyncio.run(generate_m3(m2))
         
         progress_bar.progress(100)
         status_text.empty()
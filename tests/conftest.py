@@ -0,0 +1,144 @@
+import fnmatch
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+# The backend is run from backend/ (see backend/Dockerfile), so mirror that here
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_disk_state(tmp_path, monkeypatch):
+    """On-disk caches and the comment store go to tmp_path, never .cache/ in the checkout."""
+    from app import cache, comment_store, llm_cache
+    from app.config import CONFIG
+
+    monkeypatch.setattr(CONFIG, "CACHE_SQLITE_PATH", str(tmp_path / "analyze.sqlite3"))
+    monkeypatch.setattr(CONFIG, "LLM_CACHE_SQLITE_PATH", str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(CONFIG, "COMMENT_STORE_PATH", str(tmp_path / "comments.sqlite3"))
+    # Singletons created by an earlier test would still point at the old paths
+    monkeypatch.setattr(cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_llm_cache", None)
+    monkeypatch.setattr(comment_store, "_store", None)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """
+    Local stand-in for a Redis server over RESP: GET, SET [EX], DEL, EXISTS, SCAN, DBSIZE
+    and the list commands LPUSH, RPUSH, LLEN, LRANGE, LREM, BLMOVE.
+    """
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            cmd = args[0].upper()
+            now = time.time()
+            if cmd == b"GET":
+                value, expires_at = store.get(args[1], (None, None))
+                if value is None or (expires_at and expires_at < now):
+                    store.pop(args[1], None)  # expired keys are dropped lazily, as in Redis
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif cmd == b"SET":
+                ttl = int(args[4]) if len(args) > 4 else None
+                if ttl is not None and ttl <= 0:
+                    # Same reply as a real server
+                    self.wfile.write(b"-ERR invalid expire time in 'set' command\r\n")
+                    continue
+                self.server.commands.append(args)
+                store[args[1]] = (args[2], now + ttl if ttl else None)
+                self.wfile.write(b"+OK\r\n")
+            elif cmd == b"DEL":
+                removed = sum(1 for k in args[1:] if store.pop(k, None))
+                self.wfile.write(b":%d\r\n" % removed)
+            elif cmd == b"SCAN":
+                # SCAN cursor MATCH pattern COUNT n; the cursor is an offset into the keys
+                # as of cursor 0, so deleting scanned keys doesn't skip any (as in Redis)
+                start, count = int(args[1]), int(args[5])
+                if not start:
+                    self.scan_keys = list(store)
+                keys = self.scan_keys
+                page = [k for k in keys[start:start + count] if fnmatch.fnmatch(k.decode(), args[3].decode())]
+                cursor = b"%d" % (start + count) if start + count < len(keys) else b"0"
+                self.wfile.write(b"*2\r\n$%d\r\n%s\r\n*%d\r\n" % (len(cursor), cursor, len(page)))
+                for k in page:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(k), k))
+            elif cmd == b"DBSIZE":
+                self.wfile.write(b":%d\r\n" % len(store))
+            elif cmd == b"EXISTS":
+                value, expires_at = store.get(args[1], (None, None))
+                self.wfile.write(b":%d\r\n" % (value is not None and not (expires_at and expires_at < now)))
+            elif cmd in (b"LPUSH", b"RPUSH"):
+                with self.server.lists_changed:
+                    items = self.server.lists.setdefault(args[1], [])
+                    if cmd == b"LPUSH":
+                        items[:0] = reversed(args[2:])
+                    else:
+                        items.extend(args[2:])
+                    self.server.lists_changed.notify_all()
+                    self.wfile.write(b":%d\r\n" % len(items))
+            elif cmd == b"LLEN":
+                self.wfile.write(b":%d\r\n" % len(self.server.lists.get(args[1], [])))
+            elif cmd == b"LRANGE":
+                items = self.server.lists.get(args[1], [])
+                stop = int(args[3])
+                items = items[int(args[2]):None if stop == -1 else stop + 1]
+                self.wfile.write(b"*%d\r\n" % len(items))
+                for item in items:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(item), item))
+            elif cmd == b"LREM":
+                # LREM key 1 value: first occurrence only
+                with self.server.lists_changed:
+                    items = self.server.lists.get(args[1], [])
+                    removed = 1 if args[3] in items else 0
+                    if removed:
+                        items.remove(args[3])
+                self.wfile.write(b":%d\r\n" % removed)
+            elif cmd == b"BLMOVE":
+                # BLMOVE source destination RIGHT LEFT timeout
+                source, destination, timeout = args[1], args[2], float(args[5])
+                with self.server.lists_changed:
+                    self.server.lists_changed.wait_for(lambda: self.server.lists.get(source), timeout or None)
+                    items = self.server.lists.get(source)
+                    value = items.pop() if items else None
+                    if value is not None:
+                        self.server.lists.setdefault(destination, []).insert(0, value)
+                if value is None:
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def redis_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), FakeRedisHandler)
+    server.daemon_threads = True
+    server.store = {}
+    server.commands = []
+    server.lists = {}
+    server.lists_changed = threading.Condition()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,20 @@
+from benchmarks import baseline
+from benchmarks.corpus import generate_comments
+
+
+def test_synthetic_corpus_is_deterministic_and_varied():
+    comments = generate_comments(500)
+    assert comments == generate_comments(500)
+    texts = [c["text"] for c in comments]
+    assert len(set(texts)) > 400
+    assert any("?" in t for t in texts)
+    assert any("http" in t for t in texts)
+    assert all(isinstance(c["likes"], int) for c in comments)
+
+
+def test_compare_flags_slowdowns_and_throughput_drops():
+    old = {"analyze": {"1000": {"seconds": 1.0}}, "rps": 10.0, "tiny": {"seconds": 0.0001}}
+    new = {"analyze": {"1000": {"seconds": 1.5}}, "rps": 5.0, "tiny": {"seconds": 0.0009}}
+    report = baseline.compare(new, old, {"seconds", "rps"}, tolerance=1.3,
+                              higher_is_better={"rps"}, floor=0.01)
+    assert {r["metric"]: r["regression"] for r in report} == {"analyze/1000/seconds": True, "rps": True}
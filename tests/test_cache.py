@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from app.cache import MemoryCache, SqliteCache, RedisCache, analyze_cache_key
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(ttl=60, max_entries=2)
+    if request.param == "sqlite":
+        return SqliteCache(str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=2)
+    return RedisCache(request.getfixturevalue("redis_server").url, ttl=60, max_entries=2)
+
+
+def test_roundtrip_and_counters(cache):
+    assert cache.get("a") is None
+    cache.set("a", {"viral_score": 91, "topics": ["x"]})
+    assert cache.get("a") == {"viral_score": 91, "topics": ["x"]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_expired_entries_miss(cache):
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is None
+    cache.set("b", 2)
+    cache.set("b", 3, ttl=0)  # expiring an entry also drops its older value
+    assert cache.get("b") is None
+
+
+def test_redis_expiry_and_clear(redis_server):
+    cache = RedisCache(redis_server.url, ttl=60, prefix="ns:")
+    cache.set("a", 1, ttl=1)
+    cache.set("b", 2, ttl=0)
+    # A real server rejects a non-positive EX, so none is ever sent
+    assert [args[0] for args in redis_server.commands] == [b"SET"]
+    time.sleep(1.1)
+    assert cache.get("a") is None
+
+    redis_server.store[b"other:x"] = (b"1", None)
+    for i in range(1200):
+        cache.set(f"k{i}", i)
+    assert len(cache) == 1201
+    cache.clear()  # pages through SCAN, other namespaces are kept
+    assert list(redis_server.store) == [b"other:x"]
+
+
+@pytest.mark.parametrize("cls", [MemoryCache, SqliteCache])
+def test_lru_eviction(cls, tmp_path):
+    cache = cls(str(tmp_path / "c.sqlite3"), 60, 2) if cls is SqliteCache else cls(60, 2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_analyze_key_normalizes_video_url():
+    a = analyze_cache_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s", 100, "youtube", "Free")
+    b = analyze_cache_key("https://youtu.be/dQw4w9WgXcQ", 100, "YouTube", "free")
+    assert a == b
+    assert a != analyze_cache_key("https://youtu.be/dQw4w9WgXcQ", 500, "youtube", "Free")
+    assert a != analyze_cache_key("https://youtu.be/dQw4w9WgXcQ", 100, "youtube", "Diamond")
+
@@ -0,0 +1,104 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app import comment_store
+from app.comment_store import CommentStore, refresh_youtube
+from app.config import CONFIG
+from app.pipelines import reddit_post, tiktok, youtube
+
+
+def make_downloader(raw):
+    class FakeDownloader:
+        def get_comments(self, video_id):
+            yield from raw
+    return FakeDownloader
+
+
+def test_merge_dedupes_and_tracks_high_water(tmp_path):
+    store = CommentStore(str(tmp_path / "comments.sqlite3"))
+    assert store.add_comments("reddit", "p1", [{"id": "a", "text": "x", "time": 10}, {"id": "b", "text": "y", "time": 20}]) == 2
+    assert store.add_comments("reddit", "p1", [{"id": "b", "text": "y", "time": 20}, {"id": "c", "text": "z", "time": 30}]) == 1
+    assert store.high_water_mark("reddit", "p1") == 30
+    assert [c["id"] for c in store.get_comments("reddit", "p1")] == ["c", "b", "a"]
+    assert store.count("tiktok", "p1") == 0
+
+
+def test_youtube_refresh_only_pages_new_comments(tmp_path, monkeypatch):
+    now = time.time()
+    raw = [{"cid": f"old{i}", "text": "old", "author": "a", "votes": "1", "time_parsed": now - i * 3600} for i in range(300)]
+    pulled = []
+
+    class CountingDownloader(make_downloader(raw)):
+        def get_comments(self, video_id):
+            for c in super().get_comments(video_id):
+                pulled.append(c["cid"])
+                yield c
+
+    monkeypatch.setattr(youtube, "YoutubeCommentDownloader", CountingDownloader)
+    store = CommentStore(str(tmp_path / "comments.sqlite3"))
+    assert refresh_youtube(store, "https://youtu.be/abc", 100)["new_comments"] == 100
+
+    raw[:0] = [{"cid": f"new{i}", "text": "new", "author": "b", "votes": "3", "time_parsed": now + 60 - i} for i in range(5)]
+    pulled.clear()
+    result = refresh_youtube(store, "https://youtu.be/abc", 100)
+    assert result["new_comments"] == 5
+    assert [c["id"] for c in result["comments"][:5]] == [f"new{i}" for i in range(5)]
+    assert len(pulled) < 20
+
+
+def test_youtube_refresh_backfills_when_limit_grows(tmp_path, monkeypatch):
+    now = time.time()
+    raw = [{"cid": f"c{i}", "text": "hi", "author": "a", "votes": "1", "time_parsed": now - i * 3600} for i in range(300)]
+    monkeypatch.setattr(youtube, "YoutubeCommentDownloader", make_downloader(raw))
+    store = CommentStore(str(tmp_path / "comments.sqlite3"))
+    assert len(refresh_youtube(store, "https://youtu.be/abc", 100)["comments"]) == 100
+
+    result = refresh_youtube(store, "https://youtu.be/abc", 250)
+    assert result["new_comments"] == 150
+    assert [c["id"] for c in result["comments"]] == [f"c{i}" for i in range(250)]
+    assert store.count("youtube", "abc") == 250
+
+
+def test_known_comments_are_refreshed_and_old_videos_evicted(tmp_path):
+    store = CommentStore(str(tmp_path / "comments.sqlite3"), max_videos=2)
+    store.add_comments("youtube", "v1", [{"id": "a", "text": "x", "likes": 1, "time": 10}])
+    assert store.add_comments("youtube", "v1", [{"id": "a", "text": "x", "likes": 40, "time": 99}]) == 0
+    assert store.get_comments("youtube", "v1") == [{"id": "a", "text": "x", "likes": 40, "time": 99}]
+    assert store.high_water_mark("youtube", "v1") == 99
+
+    store.add_comments("reddit", "p1", [{"id": "b", "text": "y", "time": 20}])
+    store.add_comments("tiktok", "t1", [{"id": "c", "text": "z", "time": 30}])
+    assert not store.has_video("youtube", "v1") and store.count("youtube", "v1") == 0
+    assert store.has_video("reddit", "p1") and store.has_video("tiktok", "t1")
+
+
+def test_reddit_and_tiktok_endpoints_merge_into_store(tmp_path, monkeypatch):
+    import main
+
+    store = CommentStore(str(tmp_path / "comments.sqlite3"))
+    monkeypatch.setattr(main, "get_comment_store", lambda: store)
+    monkeypatch.setattr(CONFIG, "COMMENT_STORE_ENABLED", True)
+    thread = [{"id": "r1", "text": "first", "score": 2, "time": 10}]
+    monkeypatch.setattr(reddit_post, "get_reddit_post", lambda url: {
+        "url": url, "title": "t", "author": "a", "content": "", "comments_count": len(thread),
+        "comments": list(thread)})
+    monkeypatch.setattr(tiktok, "get_tiktok_comments", lambda url: {
+        "video_url": url, "comments": [{"id": "k1", "text": "hi", "time": 5}], "total": 1})
+    client = TestClient(main.app)
+
+    url = "https://www.reddit.com/r/x/comments/1"
+    assert client.get("/reddit/post", params={"url": url}).json()["new_comments"] == 1
+    thread[0] = {**thread[0], "score": 9}
+    thread.append({"id": "r2", "text": "second", "score": 1, "time": 20})
+    data = client.get("/reddit/post", params={"url": url}).json()
+    assert data["new_comments"] == 1
+    assert [(c["id"], c["score"]) for c in data["comments"]] == [("r2", 1), ("r1", 9)]
+    assert store.get_meta("reddit", url)["title"] == "t"
+
+    data = client.get("/tiktok/comments", params={"url": "https://www.tiktok.com/@u/video/77"}).json()
+    assert data["new_comments"] == 1 and store.count("tiktok", "77") == 1
+
+    monkeypatch.setattr(CONFIG, "COMMENT_STORE_ENABLED", False)
+    assert "new_comments" not in client.get("/reddit/post", params={"url": url}).json()
+    assert comment_store.refresh_tiktok(None, "https://www.tiktok.com/@u/video/77")["total"] == 1
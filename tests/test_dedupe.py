@@ -0,0 +1,89 @@
+import random
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.utils import nlp_utils
+from app.utils.dedupe import DedupeIndex, collapse, is_spam
+from app.utils.nlp_utils import CommentAnalysis, top_terms
+from app.utils.sentiment_engine import BatchSentimentEngine
+from benchmarks.corpus import generate_comments
+
+
+def test_collapse_groups_copies_and_drops_spam():
+    comments = [
+        {"text": "first"}, {"text": "FIRST"}, {"text": "🔥🔥🔥"}, {"text": "🔥 🔥"},
+        {"text": "check out my channel pls"}, {"text": "https://bit.ly/xyz"},
+        {"text": "This is honestly the best tutorial on colour grading I have seen"},
+        {"text": "this is honestly the best tutorial on colour grading i have seeeen"},
+        {"text": "Loved the lighting at 2:35, see https://youtu.be/abc for the same setup"},
+    ]
+    reps, stats = collapse(comments)
+    assert [(r["text"], r["weight"]) for r in reps] == [
+        ("first", 2), ("🔥🔥🔥", 2),
+        ("This is honestly the best tutorial on colour grading I have seen", 2),
+        ("Loved the lighting at 2:35, see https://youtu.be/abc for the same setup", 1),
+    ]
+    assert stats == {"comments": 9, "unique": 4, "duplicates": 3, "spam": 2}
+
+
+def test_emoticons_and_punctuation_keep_groups_apart():
+    comments = [{"text": t} for t in ("great :)", "Great :)", "great :(", "ok!", "ok!!", "ok?", "love it 😍", "love it 😡")]
+    reps, _ = collapse(comments)
+    assert [(r["text"], r["weight"]) for r in reps] == [
+        ("great :)", 2), ("great :(", 1), ("ok!", 2), ("ok?", 1), ("love it 😍", 1), ("love it 😡", 1)]
+
+    # Near-duplicates only merge when they carry the same marks
+    base = "the colour grade in this video is absolutely stunning and so clean"
+    index = DedupeIndex(max_distance=4)
+    assert index.assign([{"text": base + " :)"}, {"text": "wow " + base + " :)"}, {"text": base + " :("}]) == [0, 0, 1]
+
+
+def test_near_duplicates_match_across_batches():
+    index = DedupeIndex(max_distance=4)
+    base = "the colour grade in this video is absolutely stunning and so clean"
+    assert index.assign([{"text": base}]) == [0]
+    assert index.assign([{"text": "wow " + base}, {"text": "completely different comment about the audio mix"}]) == [0, 1]
+    assert index.groups[0]["weight"] == 2
+
+
+def test_spam_rules_keep_real_comments():
+    assert is_spam("sub4sub anyone??")
+    assert is_spam("DM me on telegram for collabs")
+    assert not is_spam("How did you light this scene?")
+    assert not is_spam("Subscribed! The part at 3:10 was great")
+    assert is_spam("add me on WhatsApp")
+    assert is_spam("Telegram: @crypto_gains")
+    assert is_spam("join t.me/freesignals")
+    # Naming a messaging app is not spam
+    assert not is_spam("Telegram's new update is better than WhatsApp")
+    assert not is_spam("I switched to telegram: it's faster")
+    assert not is_spam("whats app do you use for editing?")
+
+
+def test_top_terms_matches_tfidf_vocabulary():
+    texts = [nlp_utils.clean_text(c["text"]) for c in generate_comments(500)]
+    expected = TfidfVectorizer(stop_words='english', max_features=10).fit(texts).get_feature_names_out()
+    assert top_terms(texts, [1] * len(texts)) == list(expected)
+
+
+def test_weighted_analysis_matches_scoring_every_copy(monkeypatch):
+    engine = BatchSentimentEngine(workers=1)
+    monkeypatch.setattr(nlp_utils.registry, "get", lambda name: engine)
+    unique = generate_comments(200, seed=3)
+    rng = random.Random(5)
+    # Viral-video shape: a few comments copied many times over, in random order
+    comments = unique + [dict(rng.choice(unique[:20])) for _ in range(2000)]
+    rng.shuffle(comments)
+
+    full = CommentAnalysis(dedupe=False)
+    deduped = CommentAnalysis(dedupe=True)
+    for i in range(0, len(comments), 100):
+        full.feed(comments[i:i + 100])
+        deduped.feed(comments[i:i + 100])
+    a, b = full.result(), deduped.result()
+
+    assert len(deduped.labels) < len(full.labels) / 5
+    assert b["sentiment"] == a["sentiment"]
+    assert b["topics"] == a["topics"]
+    assert b["engagement"] == a["engagement"]
+    assert b["dedupe"]["comments"] == len(comments)
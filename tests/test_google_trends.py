@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from app.cache import MemoryCache
+from app.pipelines import google_trends
+
+# Search volume per term; each fake payload is normalised to its own peak, like Trends
+VOLUME = {"editing": 50, "camera": 200, "music": 400, "lens": 20, "tutorial": 100,
+          "sound": 80, "intro": 10, "lut": 5, "gimbal": 30}
+
+
+class Series(list):
+    def max(self):
+        return max(self)
+
+    def mean(self):
+        return sum(self) / len(self)
+
+
+class Frame(dict):
+    empty = False
+
+
+class FakeTrendReq:
+    instances = []
+    payloads = []
+
+    def __init__(self):
+        self.kw_list = None
+        self.thread = threading.get_ident()
+        FakeTrendReq.instances.append(self)
+
+    def build_payload(self, kw_list, **kwargs):
+        assert len(kw_list) <= 5
+        self.kw_list = kw_list
+        FakeTrendReq.payloads.append(list(kw_list))
+
+    def interest_over_time(self):
+        peak = max(VOLUME[k] for k in self.kw_list)
+        return Frame({k: Series([VOLUME[k] * 100 / peak * f for f in (0.5, 1.0, 0.75)]) for k in self.kw_list})
+
+    def interest_by_region(self, resolution="COUNTRY"):
+        class Regions:
+            def head(self, n):
+                return self
+
+            def to_dict(self):
+                return {"US": 100}
+        return Regions()
+
+
+@pytest.fixture(autouse=True)
+def fake_trends(monkeypatch):
+    FakeTrendReq.instances, FakeTrendReq.payloads = [], []
+    monkeypatch.setattr(google_trends, "_load_pytrends", FakeTrendReq)
+    monkeypatch.setattr(google_trends, "_local", threading.local())
+    monkeypatch.setattr(google_trends, "_cache", MemoryCache(ttl=60))
+
+
+def test_more_than_five_terms_share_one_scale():
+    terms = list(VOLUME)
+    result = google_trends.trends_for_terms(terms, anchor="editing")
+
+    assert set(result["interest_over_time"]) == set(terms)
+    assert all(p[0] == "editing" for p in FakeTrendReq.payloads)
+    assert len(FakeTrendReq.payloads) == 2
+    iot = result["interest_over_time"]
+    assert iot["music"] == 100
+    # Ratios survive the per-group normalisation: camera is half of music, lut 1/80th
+    assert iot["camera"] == 50
+    assert iot["lens"] == 5
+    assert iot["gimbal"] == round(30 / 400 * 100)
+    assert result["interest_by_region_sample"] == {"US": 100}
+
+
+def test_cached_terms_are_not_requested_again():
+    google_trends.trends_for_terms(["editing", "camera", "music"])
+    FakeTrendReq.payloads.clear()
+    result = google_trends.trends_for_terms(["editing", "music", "lens"])
+
+    assert FakeTrendReq.payloads == [["editing", "lens"]]
+    assert result["cached_terms"] == 2
+    assert result["interest_over_time"] == {"editing": 12, "music": 100, "lens": 5}
+
+
+def test_failed_groups_are_reported_without_dropping_the_rest(monkeypatch):
+    fetch = google_trends._fetch_group
+
+    def flaky(group, timeframe, region):
+        if "sound" in group:
+            raise RuntimeError("429 Too Many Requests")
+        return fetch(group, timeframe, region)
+
+    monkeypatch.setattr(google_trends, "_fetch_group", flaky)
+    result = google_trends.trends_for_terms(list(VOLUME), anchor="editing")
+    assert "sound" not in result["interest_over_time"]
+    assert "camera" in result["interest_over_time"]
+    assert result["errors"][0]["error"] == "429 Too Many Requests"
+
+
+def test_groups_overlap_on_the_anchor():
+    assert google_trends.make_groups("a", ["a", "b", "c", "d", "e", "f"]) == [["a", "b", "c", "d", "e"], ["a", "f"]]
+    assert google_trends.make_groups("a", ["a"]) == [["a"]]
+
+
+def test_trendreq_is_reused_across_calls(monkeypatch):
+    monkeypatch.setattr(google_trends.CONFIG, "TRENDS_CONCURRENCY", 2)
+    google_trends.shutdown_trends_executor()
+    try:
+        for _ in range(3):
+            monkeypatch.setattr(google_trends, "_cache", MemoryCache(ttl=60))
+            google_trends.trends_for_terms(list(VOLUME), anchor="editing")
+        assert len(FakeTrendReq.payloads) == 6
+        assert len(FakeTrendReq.instances) <= 2  # one per pool thread, not per call
+    finally:
+        google_trends.shutdown_trends_executor()
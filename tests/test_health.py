@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import CONFIG
+from app.utils.model_registry import ModelRegistry, registry
+
+
+def test_registry_loads_once_and_reports_status():
+    reg = ModelRegistry()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "loaded-model"
+
+    reg.register("model", load)
+    reg.register("broken", lambda: 1 / 0)
+    assert reg.status() == {"model": {"loaded": False}, "broken": {"loaded": False}}
+
+    threads = [threading.Thread(target=reg.get, args=("model",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert reg.get("model") == "loaded-model"
+    assert calls == [1]
+
+    status = reg.warmup()
+    assert status["model"]["loaded"] and status["model"]["load_seconds"] >= 0
+    assert status["broken"]["loaded"] is False and "division by zero" in status["broken"]["error"]
+    with pytest.raises(KeyError):
+        reg.get("unknown")
+
+    reg.unload("model")
+    assert not reg.is_loaded("model")
+
+
+def test_warmup_stops_between_models():
+    reg = ModelRegistry()
+    stop = threading.Event()
+
+    def load_first():
+        stop.set()  # shutdown arrives while the first model is loading
+        return 1
+
+    reg.register("first", load_first)
+    reg.register("second", lambda: 2)
+    status = reg.warmup(["first", "second"], stop=stop)
+    assert status["first"]["loaded"] and not status["second"]["loaded"]
+
+
+def test_ready_waits_for_warmup_models(monkeypatch):
+    import main
+
+    registry.register("test_ready_model", lambda: object())
+    monkeypatch.setattr(CONFIG, "WARMUP_MODELS", ["test_ready_model"])
+    client = TestClient(main.app)  # no `with`: the lifespan (real warmup, job workers) does not run
+    try:
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+
+        registry.get("test_ready_model")
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["models"]["test_ready_model"]["loaded"] is True
+    finally:
+        registry.unload("test_ready_model")
@@ -0,0 +1,114 @@
+import asyncio
+import gc
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.http_pool import HttpPool
+
+
+@pytest.fixture
+def server():
+    peers = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            peers.append(self.client_address[1])
+            body = self.headers.get("User-Agent", "").encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", peers
+    httpd.shutdown()
+
+
+def test_sync_client_reuses_connections(server):
+    url, peers = server
+    pool = HttpPool()
+    try:
+        for _ in range(5):
+            assert pool.sync.get(url, headers=pool.headers()).status_code == 200
+    finally:
+        pool.close()
+    assert len(peers) == 5
+    assert len(set(peers)) == 1
+
+
+def test_async_client_is_shared_per_loop(server):
+    url, peers = server
+    pool = HttpPool()
+
+    async def scenario():
+        client = pool.async_client
+        assert pool.async_client is client
+        for _ in range(3):
+            await client.get(url)
+        await pool.aclose()
+
+    asyncio.run(scenario())
+    assert len(set(peers)) == 1
+
+
+def test_headers_rotate_without_hop_by_hop_fields():
+    pool = HttpPool()
+    headers = pool.headers({"Referer": "https://www.tiktok.com/"})
+    assert "User-Agent" in headers and headers["Referer"] == "https://www.tiktok.com/"
+    assert "Connection" not in headers
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr("app.http_pool._h2_available", lambda: False)
+    assert HttpPool(http2=True).http2 is False
+
+
+def test_async_client_is_dropped_with_its_loop():
+    pool = HttpPool()
+
+    async def grab():
+        assert pool.async_client is pool.async_client
+
+    asyncio.run(grab())
+    asyncio.run(grab())
+    gc.collect()
+    assert len(pool._async) == 0  # nothing kept alive for finished loops
+
+    async def close():
+        client = pool.async_client
+        await pool.aclose()
+        return client
+
+    assert asyncio.run(close()).is_closed
+    assert len(pool._async) == 0
+
+
+def test_tiktok_follows_redirects_with_mobile_ua(monkeypatch):
+    from app.pipelines import tiktok
+
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.headers["User-Agent"]))
+        if request.url.path == "/api/comment/list/":
+            return httpx.Response(302, headers={"Location": "https://www.tiktok.com/api/v2/comment/list/"})
+        return httpx.Response(200, json={"comments": [{"cid": "1", "text": "hi", "user": {"unique_id": "u"}}]})
+
+    pool = HttpPool()
+    pool._sync = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(tiktok, "get_http_pool", lambda: pool)
+
+    out = tiktok.get_tiktok_comments("https://www.tiktok.com/@u/video/123?lang=en")
+    assert out["total"] == 1 and out["comments"][0]["author"] == "u"
+    assert [path for path, _ in seen] == ["/api/comment/list/", "/api/v2/comment/list/"]
+    assert all(ua == tiktok.MOBILE_UA for _, ua in seen)
+    pool.close()
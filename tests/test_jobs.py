@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+from app import jobs, m3_pipeline
+from app.cache import MemoryCache
+from app.config import CONFIG
+from app.jobs import JobRunner, LocalJobQueue, RedisJobQueue, new_job
+
+
+def fake_pipeline(outcomes):
+    """run_m3_analysis stand-in: each call pops the next outcome ("ok" or an HTTP status)."""
+    calls = []
+
+    async def run(**params):
+        calls.append(params)
+        outcome = outcomes.pop(0)
+        yield "comments", {"count": 3}
+        if outcome != "ok":
+            yield "error", {"error": "boom", "status": outcome}
+            return
+        yield "idea", {"title": "Idea"}
+        yield "result", {"viral_score": 70}
+
+    return run, calls
+
+
+async def wait_for_status(runner, job_id, statuses, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = runner.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stuck in {runner.get(job_id)['status']}")
+
+
+def test_job_retries_server_errors_then_succeeds(monkeypatch):
+    run, calls = fake_pipeline([502, "ok"])
+    monkeypatch.setattr(jobs, "run_m3_analysis", run)
+
+    async def scenario():
+        runner = JobRunner(LocalJobQueue(max_size=5), max_attempts=3, retry_backoff=0.01)
+        runner.start(2)
+        try:
+            job = runner.submit({"url": "https://youtu.be/abc", "tier": "Free"})
+            return await wait_for_status(runner, job["id"], {"done", "failed"})
+        finally:
+            await runner.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "done"
+    assert job["attempts"] == 2
+    assert job["stages"]["comments"] == {"count": 3}
+    assert job["ideas"] == [{"title": "Idea"}]
+    assert job["result"] == {"viral_score": 70}
+    assert len(calls) == 2
+
+
+def test_client_errors_fail_without_retry(monkeypatch):
+    run, calls = fake_pipeline([400, "ok"])
+    monkeypatch.setattr(jobs, "run_m3_analysis", run)
+
+    async def scenario():
+        runner = JobRunner(LocalJobQueue(), max_attempts=3, retry_backoff=0.01)
+        job = runner.submit({"url": "bad"})
+        await runner.run(runner.queue.dequeue(0.1))
+        return runner.get(job["id"])
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["error"]["status"] == 400
+    assert len(calls) == 1
+
+
+def test_bounded_queue_rejects_when_full():
+    runner = JobRunner(LocalJobQueue(max_size=2))
+    assert runner.submit({"url": "a"}) is not None
+    assert runner.submit({"url": "b"}) is not None
+    assert runner.submit({"url": "c"}) is None
+    assert runner.queue.depth() == 2
+
+
+def test_retry_starts_with_fresh_stages_and_ideas(monkeypatch):
+    attempts = []
+
+    async def run(**params):
+        attempts.append(params)
+        yield "comments", {"count": 3}
+        yield "idea", {"title": "Idea"}
+        if len(attempts) == 1:
+            yield "error", {"error": "upstream", "status": 502}
+            return
+        yield "result", {"viral_score": 70}
+
+    monkeypatch.setattr(jobs, "run_m3_analysis", run)
+
+    async def scenario():
+        runner = JobRunner(LocalJobQueue(max_size=5), max_attempts=3, retry_backoff=0.01)
+        runner.start(1)
+        try:
+            job = runner.submit({"url": "https://youtu.be/abc"})
+            return await wait_for_status(runner, job["id"], {"done", "failed"})
+        finally:
+            await runner.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "done" and job["attempts"] == 2
+    assert job["ideas"] == [{"title": "Idea"}]
+    assert job["error"] is None
+
+
+def test_fetch_failures_are_retryable(monkeypatch):
+    async def failing_stream(url, max_comments):
+        raise ConnectionError("connection reset")
+        yield
+
+    monkeypatch.setattr(m3_pipeline, "stream_youtube_comments", failing_stream)
+    monkeypatch.setattr(m3_pipeline, "get_cache", lambda: MemoryCache())
+    monkeypatch.setattr(CONFIG, "COMMENT_STORE_ENABLED", False)
+
+    async def stages(url):
+        return [stage async for stage in m3_pipeline.run_m3_analysis(url)]
+
+    assert asyncio.run(stages("https://youtu.be/abc")) == [
+        ("error", {"error": "YouTube Error: connection reset", "status": 502})]
+    assert asyncio.run(stages("https://example.com/not-a-video"))[0][1]["status"] == 400
+
+
+def test_redis_job_queue(redis_server):
+    queue = RedisJobQueue(redis_server.url, max_size=2, ttl=60)
+    first, second, third = (new_job({"url": f"https://youtu.be/{i}"}, 3) for i in range(3))
+    assert queue.enqueue(first) and queue.enqueue(second)
+    assert not queue.enqueue(third)  # full
+    assert queue.depth() == 2
+    assert queue.enqueue(third, force=True) and queue.depth() == 3
+
+    # FIFO: LPUSH on one end, BLMOVE from the other
+    assert [queue.dequeue(1) for _ in range(3)] == [first["id"], second["id"], third["id"]]
+    assert queue.depth() == 0
+    assert queue.dequeue(1) is None  # times out on an empty queue
+    assert len(redis_server.lists[b"agenticeye:jobs:processing"]) == 3
+
+    first["status"] = "done"
+    queue.save(first)
+    queue.ack(first["id"])
+    assert queue.load(first["id"])["status"] == "done"
+    assert queue.load("missing") is None
+    assert queue.reclaim() == 0  # the others still hold their leases
+
+
+def test_redis_queue_reclaims_jobs_of_dead_workers(redis_server, monkeypatch):
+    run, calls = fake_pipeline(["ok"])
+    monkeypatch.setattr(jobs, "run_m3_analysis", run)
+    queue = RedisJobQueue(redis_server.url, ttl=60, lease_ttl=1)
+    job = new_job({"url": "https://youtu.be/abc"}, 3)
+    queue.enqueue(job)
+    assert queue.dequeue(1) == job["id"]  # this worker then dies without acking
+
+    time.sleep(1.1)
+    assert queue.reclaim() == 1
+    assert queue.reclaim() == 0
+    assert queue.depth() == 1
+
+    async def scenario():
+        runner = JobRunner(queue)
+        await runner.run(queue.dequeue(1))
+        return runner.get(job["id"])
+
+    assert asyncio.run(scenario())["status"] == "done"
+    assert len(calls) == 1
+    assert redis_server.lists[b"agenticeye:jobs:processing"] == []
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from app import m3_ideas
+from app.cache import MemoryCache
+from app.llm_cache import LLMResultCache
+from app.utils.json_stream import IncrementalJSONParser
+
+WATCH = {("ai_recommendations", "next_best_content", "*"): "idea", ("seo_keyword_generator",): "seo"}
+DOC = {
+    "ai_recommendations": {"next_best_content": [
+        {"title": "One {brace} \"quoted\"", "blueprint": {"hooks": ["a", "b"]}},
+        {"title": "Two", "blueprint": {"hooks": []}},
+    ]},
+    "seo_keyword_generator": {"primary_keywords": ["k"]},
+}
+
+
+def feed_chars(parser, text):
+    events = []
+    for ch in text:
+        events.extend(parser.feed(ch))
+    return events
+
+
+def test_emits_items_as_they_close():
+    text = "Sure! ```json\n" + json.dumps(DOC, indent=2) + "\n``` hope that helps {"
+    events = feed_chars(IncrementalJSONParser(WATCH), text)
+    assert [name for name, _ in events] == ["idea", "idea", "seo", "complete"]
+    assert events[0][1] == DOC["ai_recommendations"]["next_best_content"][0]
+    assert events[-1][1] == DOC
+
+
+def test_truncated_stream_keeps_finished_items():
+    text = json.dumps(DOC)
+    cut = text.index('{"title": "Two"') + 10
+    parser = IncrementalJSONParser(WATCH)
+    events = feed_chars(parser, text[:cut])
+    assert [name for name, _ in events] == ["idea"]
+    assert parser.truncated
+
+
+def test_stream_m3_keeps_ideas_from_cut_off_response(monkeypatch):
+    text = json.dumps(DOC)
+
+    async def cut_off_llm(prompt):
+        yield text[:len(text) // 2]
+        yield text[len(text) // 2:text.index('{"title": "Two"') + 5]
+        raise ValueError("connection reset")
+
+    monkeypatch.setattr(m3_ideas, "stream_openrouter_deepseek", cut_off_llm)
+    monkeypatch.setattr(m3_ideas, "get_llm_cache", lambda: LLMResultCache(MemoryCache()))
+
+    async def collect():
+        return [e async for e in m3_ideas.stream_m3({"topics": [{"topic": "x"}]})]
+
+    events = asyncio.run(collect())
+    assert [name for name, _ in events] == ["idea", "m3"]
+    result = events[-1][1]
+    assert result["truncated"] is True
+    assert result["generated_by"] == "ViralEdge-M3 (DeepSeek Enhanced)"
+    assert result["ai_recommendations"]["next_best_content"][0]["title"] == "One {brace} \"quoted\""
@@ -0,0 +1,45 @@
+import asyncio
+
+from app import m3_ideas
+from app.cache import MemoryCache
+from app.llm_cache import LLMResultCache, fingerprint
+
+RESULT = {"ai_recommendations": {"next_best_content": [{"title": "Idea", "score": 1}]}}
+
+
+def test_fingerprint_is_canonical():
+    a = fingerprint(["Camera Gear", "editing"], ["How do you edit?"], "Free", "m")
+    b = fingerprint(["editing", "camera  gear!"], ["how do you edit"], "free", "m")
+    assert a == b
+    assert a != fingerprint(["editing"], ["how do you edit"], "free", "m")
+    assert a != fingerprint(["camera gear", "editing"], ["how do you edit"], "Diamond", "m")
+
+
+def test_similarity_mode_matches_overlapping_topics():
+    cache = LLMResultCache(MemoryCache(), similarity=0.6)
+    cache.set(["camera", "editing", "lighting"], [], "Free", "m", RESULT)
+    assert cache.get(["camera", "editing", "lighting", "audio"], ["new?"], "Free", "m") == RESULT
+    assert cache.get(["camera", "travel"], [], "Free", "m") is None
+    assert cache.get(["camera", "editing", "lighting"], [], "Diamond", "m") is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_generate_m3_reuses_cached_result(monkeypatch):
+    calls = []
+
+    async def fake_llm(prompt):
+        calls.append(prompt)
+        yield '{"ai_recommendations": {"next_best_content": [{"title": "Idea", "score": 1}]}}'
+
+    monkeypatch.setattr(m3_ideas, "stream_openrouter_deepseek", fake_llm)
+    monkeypatch.setattr(m3_ideas, "get_llm_cache", lambda: cache)
+    cache = LLMResultCache(MemoryCache())
+    m2 = {"topics": [{"topic": "camera"}], "questions": [{"text": "which lens?"}]}
+
+    asyncio.run(m3_ideas.generate_m3(m2))
+    second = asyncio.run(m3_ideas.generate_m3(m2))
+    assert len(calls) == 1
+    idea = second["ai_recommendations"]["next_best_content"][0]
+    assert idea["title"] == "Idea"
+    assert idea["score"] == second["viral_prediction_engine"]["score"]
+    assert cache.stats()["hits"] == 1
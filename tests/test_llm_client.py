@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.llm_client import FileTokenBucket, LLMClient, TokenBucket
+
+
+class FakeClock:
+    """Time only moves when someone sleeps."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+def test_token_bucket_spaces_requests_at_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    async def run():
+        for _ in range(4):
+            await bucket.acquire()
+
+    asyncio.run(run())
+    # The burst of 2 is free, then one token every 0.5s
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_file_bucket_is_shared_between_instances(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "llm.bucket")
+    a = FileTokenBucket(path, rate=1, clock=clock, sleep=clock.sleep)
+    b = FileTokenBucket(path, rate=1, clock=clock, sleep=clock.sleep)
+
+    async def run():
+        await a.acquire()
+        await b.acquire()  # same file: the token a took is gone
+        await a.acquire()
+
+    asyncio.run(run())
+    assert clock.sleeps == [1.0, 1.0]
+
+
+def fake_llm(responses):
+    """LLMClient on a MockTransport that replays `responses` (status, headers, body)."""
+    requests = []
+    clock = FakeClock()
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        status, headers, body = responses.pop(0)
+        return httpx.Response(status, headers=headers, content=body)
+
+    client = LLMClient("key", limiter=TokenBucket(rate=1000, capacity=1000, clock=clock, sleep=clock.sleep),
+                       transport=httpx.MockTransport(handler), sleep=clock.sleep, max_retries=2)
+    return client, requests, clock
+
+
+def completion(text):
+    return json.dumps({"choices": [{"message": {"content": text}}]}).encode()
+
+
+def test_chat_retries_429_after_retry_after():
+    client, requests, clock = fake_llm([(429, {"Retry-After": "3"}, b"slow down"), (200, {}, completion("ok"))])
+    assert asyncio.run(client.chat("hi")) == "ok"
+    assert len(requests) == 2 and requests[0] == requests[1]
+    assert clock.sleeps == [3.0]
+
+
+def test_chat_gives_up_after_max_retries():
+    client, requests, clock = fake_llm([(503, {}, b"down")] * 3)
+    with pytest.raises(ValueError, match="503"):
+        asyncio.run(client.chat("hi"))
+    assert len(requests) == 3
+    assert clock.sleeps == [1.0, 2.0]  # exponential backoff without Retry-After
+
+
+def test_client_errors_are_not_retried():
+    client, requests, clock = fake_llm([(400, {}, b"bad request"), (200, {}, completion("never"))])
+    with pytest.raises(ValueError, match="400"):
+        asyncio.run(client.chat("hi"))
+    assert len(requests) == 1 and clock.sleeps == []
+
+
+def test_stream_chat_retries_before_streaming():
+    sse = b"".join(b"data: " + json.dumps({"choices": [{"delta": {"content": t}}]}).encode() + b"\n\n"
+                   for t in ["Hel", "lo"]) + b"data: [DONE]\n\n"
+    client, requests, clock = fake_llm([(429, {"Retry-After": "120"}, b""), (200, {}, sse)])
+
+    async def run():
+        return [delta async for delta in client.stream_chat("hi")]
+
+    assert asyncio.run(run()) == ["Hel", "lo"]
+    assert requests[1]["stream"] is True
+    assert clock.sleeps == [30.0]  # Retry-After is capped
+
+
+def test_one_client_per_event_loop():
+    client, _, _ = fake_llm([])
+    seen = []
+
+    async def use():
+        seen.append(client.client)
+        assert client.client is seen[-1]
+
+    asyncio.run(use())
+    asyncio.run(use())
+    assert seen[0] is not seen[1]
+
+    async def close():
+        current = client.client
+        await client.aclose()
+        return current
+
+    assert asyncio.run(close()).is_closed
+    assert len(client._clients) == 0
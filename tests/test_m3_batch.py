@@ -0,0 +1,72 @@
+import asyncio
+
+from app import m3_batch
+from app.cache import MemoryCache
+from app.utils.sentiment_engine import BatchSentimentEngine, score_labels
+
+
+def run_batch(urls, **kwargs):
+    async def collect():
+        return [stage async for stage in m3_batch.run_m3_batch(urls, **kwargs)]
+    return asyncio.run(collect())
+
+
+def fake_fetch(comments_by_id, calls):
+    async def fetch(url, video_id, limit):
+        calls.append(video_id)
+        return comments_by_id.get(video_id, [])
+    return fetch
+
+
+async def fake_generate_m3(ai_context, tier="Free", viral_score=None):
+    return {"viral_prediction_engine": {"score": 70}, "ai_recommendations": {"next_best_content": []}}
+
+
+def test_batch_dedupes_urls_and_streams_per_url(monkeypatch):
+    calls = []
+    comments = {"dQw4w9WgXcQ": [{"text": "Great video, how did you edit this?", "votes": 3}]}
+    monkeypatch.setattr(m3_batch, "fetch_comments", fake_fetch(comments, calls))
+    monkeypatch.setattr(m3_batch, "generate_m3", fake_generate_m3)
+    monkeypatch.setattr(m3_batch, "get_cache", lambda: MemoryCache(ttl=60))
+
+    stages = run_batch([
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ",
+        "not a url",
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+    ])
+
+    assert sorted(calls) == ["aaaaaaaaaaa", "dQw4w9WgXcQ"]
+    results = [d for e, d in stages if e == "result"]
+    errors = [d for e, d in stages if e == "error"]
+    assert [r["url"] for r in results] == ["https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                                           "https://youtu.be/dQw4w9WgXcQ"]
+    assert results[0]["data"]["viral_score"] == 70
+    assert {e["url"] for e in errors} == {"not a url", "https://www.youtube.com/watch?v=aaaaaaaaaaa"}
+    assert stages[-1][0] == "done"
+    assert stages[-1][1]["unique_videos"] == 2
+    assert stages[-1][1]["failed"] == 2
+
+
+def test_batch_serves_cached_videos_without_fetching(monkeypatch):
+    calls = []
+    comments = {"dQw4w9WgXcQ": [{"text": "Love it", "votes": 1}]}
+    cache = MemoryCache(ttl=60)
+    monkeypatch.setattr(m3_batch, "fetch_comments", fake_fetch(comments, calls))
+    monkeypatch.setattr(m3_batch, "generate_m3", fake_generate_m3)
+    monkeypatch.setattr(m3_batch, "get_cache", lambda: cache)
+
+    run_batch(["https://youtu.be/dQw4w9WgXcQ"])
+    stages = run_batch(["https://www.youtube.com/watch?v=dQw4w9WgXcQ"])
+
+    assert calls == ["dQw4w9WgXcQ"]
+    assert stages[-1][1]["cached"] == 1
+
+
+def test_labels_many_matches_per_set_scoring():
+    sets = [["I love this", "terrible audio"] * 150, ["meh"], [], ["so good!!"] * 400]
+    engine = BatchSentimentEngine(workers=2, chunk_size=100, min_parallel=10)
+    try:
+        assert engine.labels_many(sets) == [score_labels(texts) for texts in sets]
+    finally:
+        engine.shutdown()
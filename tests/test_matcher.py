@@ -0,0 +1,21 @@
+import random
+
+from app.utils.matcher import PatternMatcher
+
+
+def test_matches_same_as_substring_search():
+    patterns = ["how", "show", "who", "whole", "is it", "video", "video editing", "editing", "it", "t"]
+    words = "the how show whole video editing is it tutorial who shows edit".split()
+    rng = random.Random(3)
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 12))) for _ in range(300)]
+
+    matcher = PatternMatcher(patterns)
+    for text in texts:
+        assert matcher.find(text) == {p for p in patterns if p in text}
+
+
+
+def test_duplicate_and_empty_patterns_are_dropped():
+    matcher = PatternMatcher(["camera", "cam", "", "cam"])
+    assert matcher.patterns == ["camera", "cam"]
+    assert matcher.scan(["camera camera", "cam", "nothing"]) == [{"camera", "cam"}, {"cam"}, set()]
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_and_counter_exposition():
+    registry = MetricsRegistry()
+    hist = registry.register(Histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.1, 1.0)))
+    calls = registry.register(Counter("calls_total", "Calls.", ("host", "status")))
+    hist.observe(0.05, stage="fetch")
+    hist.observe(0.5, stage="fetch")
+    hist.observe(5, stage="fetch")
+    calls.inc(host="www.reddit.com", status="200")
+    calls.inc(host="www.reddit.com", status="200")
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="fetch",le="1.0"} 2' in text
+    assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="fetch"} 3' in text
+    assert 'calls_total{host="www.reddit.com",status="200"} 2' in text
+
+
+def test_metrics_endpoint_reports_requests_by_route():
+    from main import app
+
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+    r = client.get("/metrics")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in r.text
+    assert 'cache_hit_ratio{cache="analyze"}' in r.text
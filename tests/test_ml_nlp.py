@@ -0,0 +1,61 @@
+from app.ml_nlp import analyze_text_nlp, analyze_texts_nlp
+from app.utils.sentiment_engine import BatchSentimentEngine
+from benchmarks.corpus import generate_comments
+
+
+def corpus():
+    texts = [c["text"] for c in generate_comments(3000, seed=11)]
+    # Multi-line comments and blank ones are split / skipped like in the joined text
+    texts[5] = "love the intro\n\nwhat lens is that?\r\nworst ending"
+    texts[6] = ""
+    return texts
+
+
+def test_chunked_matches_joined_text():
+    texts = corpus()
+    expected = analyze_text_nlp("\n".join(texts))
+    inline = BatchSentimentEngine(workers=1)
+    assert analyze_texts_nlp(iter(texts), chunk_size=128, max_questions=0, engine=inline) == expected
+    assert analyze_texts_nlp(texts, chunk_size=10000, max_questions=0, engine=inline) == expected
+
+
+def test_chunks_run_on_the_worker_pool():
+    texts = corpus()
+    expected = analyze_text_nlp("\n".join(texts))
+    engine = BatchSentimentEngine(workers=2)
+    try:
+        result = analyze_texts_nlp(texts, chunk_size=200, max_questions=0, engine=engine)
+    finally:
+        engine.shutdown()
+    assert result == expected
+
+
+def test_question_cap_keeps_the_first_ones():
+    texts = [f"question {i}?" for i in range(50)]
+    result = analyze_texts_nlp(texts, chunk_size=7, max_questions=10, engine=BatchSentimentEngine(workers=1))
+    assert [q["text"] for q in result["questions"]] == [f"question {i}?" for i in range(10)]
+    assert result["sentiment"]["neutral"] == 50
+    assert analyze_texts_nlp([], engine=BatchSentimentEngine(workers=1)) == analyze_text_nlp("")
+
+
+def test_aggregate_signals_combines_platforms():
+    from app.analysis import aggregate_signals
+
+    source = {
+        "youtube": {"comments_count": 3, "comments": [
+            {"text": "love this, great edit", "likes": "1.2K"},
+            {"text": "what camera is that?", "likes": 30},
+            {"text": "worst ending", "likes": 0},
+        ]},
+        "reddit": {"comments_count": 1, "comments": [{"text": "great breakdown", "likes": 5}]},
+        "serp": {"total_results": 200000},
+    }
+    result = aggregate_signals(source)
+
+    assert result["stats"] == {"comments_aggregated": 4}
+    assert result["engagement"]["total_likes"] == 1235
+    assert result["engagement"]["platforms"]["youtube"] == {"comments": 3, "likes": 1230}
+    assert result["engagement"]["top_comments"][0]["likes"] == "1.2K"
+    assert result["nlp"] == analyze_text_nlp("\n".join(c["text"] for p in ("youtube", "reddit")
+                                                       for c in source[p]["comments"]))
+    assert result["summary"]["trend_reason"].startswith("likes=1235,")
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from app.pipelines import reddit, reddit_post
+from app.pipelines.reddit_comments import CommentTreeWalker
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "reddit")
+
+
+def fixture_for(path, query):
+    """Recorded response for a request path, as Reddit would serve it."""
+    if path.endswith("/comments/abc123/colour_grading/.json") or path.endswith("/comments/abc123/colour_grading.json"):
+        return "post.json"
+    if path == "/api/morechildren.json":
+        return "morechildren_" + "_".join(query["children"][0].split(",")) + ".json"
+    if path == "/comments/abc123/_/c3.json":
+        return "thread_c3.json"
+    return None
+
+
+@pytest.fixture
+def reddit_stub():
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            requests.append(self.path)
+            name = fixture_for(parts.path, parse_qs(parts.query))
+            if name is None or not os.path.exists(os.path.join(FIXTURES, name)):
+                self.send_response(404)
+                self.end_headers()
+                return
+            with open(os.path.join(FIXTURES, name), "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
+
+
+def test_get_reddit_post_expands_more_nodes(reddit_stub):
+    base, requests = reddit_stub
+    post = reddit_post.get_reddit_post(f"{base}/r/videography/comments/abc123/colour_grading/?utm=x")
+
+    ids = [c["id"] for c in post["comments"]]
+    assert ids[:4] == ["c1", "c2", "c3", "c4"]  # initial tree first, parents before replies
+    assert sorted(ids) == ["c1", "c2", "c3", "c4", "c5", "c6", "m1", "m2", "m3"]
+    assert post["comments_count"] == 9
+    assert post["comments_skipped"] == 0
+    assert post["title"] == "How do you colour grade on a budget?"
+    assert sum("/api/morechildren.json" in r for r in requests) == 2
+
+
+def test_fetch_reddit_post_uses_the_same_walker(reddit_stub):
+    base, _ = reddit_stub
+    post = reddit.fetch_reddit_post(f"{base}/r/videography/comments/abc123/colour_grading.json")
+    assert post["comments_count"] == 9
+    assert {"author", "text", "score"} == set(post["comments"][0])
+
+
+def test_request_cap_reports_skipped_comments(reddit_stub):
+    base, requests = reddit_stub
+    with open(os.path.join(FIXTURES, "post.json")) as f:
+        tree = json.load(f)[1]["data"]["children"]
+    with httpx.Client() as client:
+        walker = CommentTreeWalker(tree, link_id="t3_abc123", client=client, base_url=base,
+                                   concurrency=1, max_requests=1)
+        ids = [d["id"] for d in walker]
+    assert ids == ["c1", "c2", "c3", "c4", "c5", "c6"]  # deep thread expanded first, then the cap
+    assert walker.skipped == 2
+
+
+def test_deep_threads_do_not_recurse():
+    node = {"kind": "t1", "data": {"id": "0", "body": "root", "replies": ""}}
+    root = node
+    for i in range(1, 5000):
+        child = {"kind": "t1", "data": {"id": str(i), "body": "reply", "replies": ""}}
+        node["data"]["replies"] = {"kind": "Listing", "data": {"children": [child]}}
+        node = child
+    walker = CommentTreeWalker([root, {"kind": "more", "data": {"children": ["x", "y"]}}])
+    assert sum(1 for _ in walker) == 5000
+    assert walker.skipped == 2
@@ -0,0 +1,117 @@
+import asyncio
+import random
+
+from app import m3_pipeline
+from app.cache import MemoryCache
+from app.config import CONFIG
+from app.sampling import StratifiedSample, allocate, like_tier, recency_buckets
+
+
+def test_allocate_favours_liked_tiers_and_stays_in_budget():
+    alloc = allocate([10000, 500, 200], [1, 3, 5], budget=3000)
+    assert sum(alloc) == 3000
+    assert alloc[2] == 200  # small high-engagement stratum is taken whole
+    # Sampling rate rises with the boost
+    assert alloc[0] / 10000 < alloc[1] / 500 < alloc[2] / 200
+    assert allocate([5, 3], [1, 1], budget=100) == [5, 3]
+    # Budget below the floors: the highest-priority strata get theirs first
+    assert allocate([100, 100, 100], [1, 2, 3], budget=5) == [1, 2, 2]
+
+
+def test_strata_cover_likes_and_recency():
+    assert [like_tier({"likes": n}) for n in (0, 1, 9, 10, 250, 5000)] == [0, 1, 1, 2, 3, 4]
+    assert like_tier({"votes": "1.2K"}) == 4
+    comments = [{"time": t} for t in (10, 20, 30, 40, 50, 60)] + [{"time": 0}, {}]
+    assert recency_buckets(comments, 3) == [0, 0, 1, 1, 2, 2, None, None]
+
+
+class FakeAnalysis:
+    """CommentAnalysis stand-in: the label is carried by the comment."""
+
+    def __init__(self):
+        self.counts = {"positive": 0, "negative": 0, "neutral": 0}
+
+    def feed(self, comments):
+        for c in comments:
+            self.counts[c["label"]] += c.get("weight", 1)
+
+
+def population(n, seed=3):
+    # Liked comments skew positive, recent ones negative: a plain random sample of
+    # mostly zero-like comments would miss the liked ones almost entirely
+    rng = random.Random(seed)
+    comments = []
+    for i in range(n):
+        likes = rng.choice([0] * 90 + [3] * 7 + [40, 40, 500])
+        recent = i < n // 3
+        positive = 0.8 if likes >= 10 else 0.3
+        negative = 0.5 if recent else 0.2
+        r = rng.random()
+        label = "positive" if r < positive else "negative" if r < positive + negative else "neutral"
+        comments.append({"id": i, "text": "x", "likes": likes, "time": 1700000000 - i, "label": label})
+    return comments
+
+
+def test_weighted_sample_estimates_population_within_interval():
+    comments = population(50000)
+    truth = {label: 100 * sum(c["label"] == label for c in comments) / len(comments)
+             for label in ("positive", "negative", "neutral")}
+
+    sample = StratifiedSample(comments, budget=2000)
+    assert sample.size == 2000
+    assert abs(sum(c["weight"] for c in sample.comments) - 50000) < 1e-6
+    analysis = FakeAnalysis()
+    sample.feed(analysis)
+
+    intervals = sample.intervals()
+    scored = sum(analysis.counts.values())
+    for label, (low, high) in intervals.items():
+        estimate = 100 * analysis.counts[label] / scored
+        assert low <= estimate <= high
+        assert low <= truth[label] <= high
+        assert high - low < 6
+
+    summary = sample.summary()
+    assert summary["population"] == summary["covered"] == 50000
+    assert sum(s["population"] for s in summary["strata"]) == 50000
+    liked = [s for s in summary["strata"] if s["likes"] == "100-999"]
+    assert all(s["sampled"] / s["population"] > 0.04 for s in liked)
+
+
+def test_pipeline_analyzes_sample_and_reports_intervals(monkeypatch):
+    comments = [{"id": str(i), "text": f"great tutorial number {i}, loved it" if i % 2 else f"boring part {i}",
+                 "author": "a", "likes": i % 50, "time": 1700000000 - i} for i in range(600)]
+
+    async def fake_stream(url, max_comments):
+        for start in range(0, min(max_comments, len(comments)), 50):
+            yield comments[start:start + 50]
+
+    async def fake_m3(context, tier="Free", viral_score=None):
+        yield "m3", {}
+
+    fed = []
+    real_feed = m3_pipeline.CommentAnalysis.feed
+
+    def counting_feed(self, batch):
+        fed.append(len(batch))
+        real_feed(self, batch)
+
+    monkeypatch.setattr(m3_pipeline.CommentAnalysis, "feed", counting_feed)
+    monkeypatch.setattr(m3_pipeline, "stream_youtube_comments", fake_stream)
+    monkeypatch.setattr(m3_pipeline, "stream_m3", fake_m3)
+    monkeypatch.setattr(m3_pipeline, "calculate_viral_score", lambda context: 50)
+    monkeypatch.setattr(m3_pipeline, "get_cache", lambda: MemoryCache())
+    monkeypatch.setattr(CONFIG, "COMMENT_STORE_ENABLED", False)
+
+    async def run():
+        return [stage async for stage in m3_pipeline.run_m3_analysis(
+            "https://youtu.be/abc", limit=1000, sample=100)]
+
+    stages = dict(asyncio.run(run()))
+    assert stages["comments"] == {"count": 600, "sampled": 100}
+    assert sum(fed) == 100
+    m2 = stages["result"]["m2_analysis"]
+    assert m2["engagement"]["comments_count"] == 600
+    assert m2["sampling"]["sampled"] == 100
+    low, high = m2["sampling"]["sentiment_ci"]["positive"]
+    assert low <= m2["sentiment"]["positive"] <= high
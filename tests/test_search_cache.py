@@ -0,0 +1,150 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.cache import MemoryCache, SqliteCache
+from app.pipelines import reddit
+from app.search_cache import SWRCache, search_cache_key
+
+
+def counting_fetch(values):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        value = values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return fetch, calls
+
+
+def test_fresh_entries_skip_the_fetch():
+    cache = SWRCache(MemoryCache(ttl=60), fresh_ttl=60)
+    fetch, calls = counting_fetch([["a"], ["b"]])
+
+    async def scenario():
+        return [await cache.get_or_fetch("k", fetch) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [["a"]] * 3
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_it_refreshes():
+    cache = SWRCache(MemoryCache(ttl=60), fresh_ttl=0, stale_ttl=60)
+    fetch, calls = counting_fetch([["old"], ["new"], ["newer"]])
+
+    async def scenario():
+        first = await cache.get_or_fetch("k", fetch)
+        stale = await cache.get_or_fetch("k", fetch)
+        again = await cache.get_or_fetch("k", fetch)  # refresh already running: no second one
+        await asyncio.sleep(0.05)
+        return first, stale, again, cache.store.peek("k")["value"]
+
+    first, stale, again, stored = asyncio.run(scenario())
+    assert (first, stale, again, stored) == (["old"], ["old"], ["old"], ["new"])
+    assert len(calls) == 2
+    assert cache.stats()["stale_served"] == 2
+
+
+def test_failed_refresh_keeps_the_stale_value():
+    cache = SWRCache(MemoryCache(ttl=60), fresh_ttl=0, stale_ttl=60)
+    fetch, _ = counting_fetch([["old"], httpx.ConnectError("down")])
+
+    async def scenario():
+        await cache.get_or_fetch("k", fetch)
+        await cache.get_or_fetch("k", fetch)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert cache.store.peek("k")["value"] == ["old"]
+    assert cache.refresh_failures == 1
+
+
+def test_errors_and_empty_results_are_negatively_cached():
+    cache = SWRCache(MemoryCache(ttl=60), negative_ttl=60)
+    fetch, calls = counting_fetch([httpx.ConnectError("down"), []])
+
+    async def scenario():
+        with pytest.raises(httpx.ConnectError):
+            await cache.get_or_fetch("err", fetch)
+        assert await cache.get_or_fetch("err", fetch) == []
+        assert await cache.get_or_fetch("empty", fetch) == []
+        assert await cache.get_or_fetch("empty", fetch) == []
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_zero_negative_ttl_disables_negative_caching():
+    cache = SWRCache(MemoryCache(ttl=60), negative_ttl=0)
+    fetch, calls = counting_fetch([[], ["a"]])
+
+    async def scenario():
+        assert await cache.get_or_fetch("k", fetch) == []
+        return await cache.get_or_fetch("k", fetch)
+
+    assert asyncio.run(scenario()) == ["a"]
+    assert len(calls) == 2
+
+
+def test_disk_store_is_used_off_the_event_loop(tmp_path):
+    threads = set()
+
+    class RecordingCache(SqliteCache):
+        def _get(self, key):
+            threads.add(threading.get_ident())
+            return super()._get(key)
+
+        def _set(self, key, value, ttl):
+            threads.add(threading.get_ident())
+            super()._set(key, value, ttl)
+
+    cache = SWRCache(RecordingCache(str(tmp_path / "reddit.sqlite3"), ttl=60))
+    fetch, _ = counting_fetch([["a"]])
+
+    async def scenario():
+        assert await cache.get_or_fetch("k", fetch) == ["a"]
+        assert await cache.get_or_fetch("k", fetch) == ["a"]
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads and loop_thread not in threads
+
+
+def test_concurrent_misses_share_one_request():
+    cache = SWRCache(MemoryCache(ttl=60))
+    fetch, calls = counting_fetch([["a"]])
+
+    async def scenario():
+        return await asyncio.gather(*[cache.get_or_fetch("k", fetch) for _ in range(5)])
+
+    assert asyncio.run(scenario()) == [["a"]] * 5
+    assert len(calls) == 1
+
+
+def test_reddit_search_keys_on_normalized_query(monkeypatch):
+    cache = SWRCache(MemoryCache(ttl=60))
+    monkeypatch.setattr(reddit, "get_search_cache", lambda: cache)
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.params["q"])
+        return httpx.Response(200, json={"data": {"children": [
+            {"data": {"title": "Budget grading", "subreddit": "videography", "ups": 12, "permalink": "/r/x/1"}}]}})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            a = await reddit.reddit_search_async("Colour  Grading", client=client)
+            b = await reddit.reddit_search_async(" colour grading ", client=client)
+            c = await reddit.reddit_search_async("colour grading", client=client, t="month")
+        return a, b, c
+
+    a, b, c = asyncio.run(scenario())
+    assert a == b == c
+    assert len(requests) == 2  # t=month is a different key
+    assert search_cache_key("A  b", 25, "relevance", "week") == search_cache_key("a b", 25, "relevance", "week")
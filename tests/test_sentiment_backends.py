@@ -0,0 +1,76 @@
+import pytest
+
+from app.utils.sentiment_backends import BACKENDS, get_backend, summarize
+
+
+@pytest.mark.parametrize("name", ["textblob", "vader", "lexicon"])
+def test_backends_share_one_schema(name):
+    texts = ["love this, amazing video", "worst upload, I hate it", "uploaded on a tuesday", ""]
+    results = get_backend(name).score(texts)
+
+    assert len(results) == len(texts)
+    for r in results:
+        assert r["label"] in ("positive", "neutral", "negative")
+        assert -1 <= r["score"] <= 1
+        assert 0 <= r["confidence"] <= 1
+    assert results[0]["label"] == "positive"
+    assert results[1]["label"] == "negative"
+
+
+def test_registry_and_summary():
+    assert set(BACKENDS) >= {"textblob", "vader", "lexicon", "roberta"}
+    with pytest.raises(KeyError):
+        get_backend("nope")
+    results = [{"label": "positive"}, {"label": "positive"}, {"label": "negative"}, {"label": "neutral"}]
+    assert summarize(results) == {"positive": 50.0, "neutral": 25.0, "negative": 25.0}
+    assert summarize([]) == {"positive": 0, "neutral": 0, "negative": 0}
+
+
+def test_cascade_only_escalates_unsure_comments(monkeypatch):
+    from app.utils import sentiment_backends
+    from app.utils.sentiment_backends import CascadeBackend, SentimentBackend
+
+    class FakeTransformer(SentimentBackend):
+        seen = []
+
+        def score(self, texts):
+            self.seen.extend(texts)
+            return [{"label": "positive", "score": 0.9, "confidence": 0.95} for _ in texts]
+
+    monkeypatch.setitem(sentiment_backends._instances, "roberta", FakeTransformer())
+    cascade = CascadeBackend(first="lexicon", threshold=0.5)
+    texts = ["love this, great video", "uploaded on a tuesday", "worst, terrible"]
+    results = cascade.score(texts)
+
+    assert FakeTransformer.seen == ["uploaded on a tuesday"]
+    assert [r["backend"] for r in results] == ["lexicon", "roberta", "lexicon"]
+    assert [r["label"] for r in results] == ["positive", "positive", "negative"]
+    assert cascade.escalation_stats(results) == {"escalated": 1, "escalated_fraction": 0.3333}
+
+
+def test_score_texts_restores_order_and_maps_labels():
+    from app.pipelines.nlp import label_for, score_texts
+
+    calls = []
+
+    def fake_pipe(texts, batch_size):
+        # Named labels (newer cardiffnlp configs) for some texts, LABEL_n for the rest
+        calls.append((list(texts), batch_size))
+        out = []
+        for text in texts:
+            positive = 0.9 if "love" in text else 0.05
+            if len(text) % 2:
+                out.append([{"label": "negative", "score": 0.05}, {"label": "neutral", "score": 0.9 - positive + 0.05},
+                            {"label": "positive", "score": positive}])
+            else:
+                out.append([{"label": "LABEL_0", "score": 0.05}, {"label": "LABEL_1", "score": 0.9 - positive + 0.05},
+                            {"label": "LABEL_2", "score": positive}])
+        return out
+
+    texts = ["a much longer comment that I love a lot", "ok", "love it", "meh, fine I guess"]
+    results = score_texts(texts, batch_size=2, pipe=fake_pipe)
+
+    assert calls == [(sorted(texts, key=len), 2)]
+    assert all(set(r) == {"LABEL_0", "LABEL_1", "LABEL_2"} for r in results)
+    assert [label_for(r) for r in results] == ["positive", "neutral", "positive", "neutral"]
+    assert score_texts([], pipe=fake_pipe) == []
@@ -0,0 +1,71 @@
+import asyncio
+
+from app import m3_pipeline
+from app.cache import MemoryCache
+from app.config import CONFIG
+from app.utils import nlp_utils, sentiment_engine
+from app.utils.sentiment_engine import BatchSentimentEngine, score_buckets, score_labels
+from benchmarks.corpus import generate_comments
+
+
+def test_pooled_scoring_matches_inline_and_reuses_the_pool():
+    texts = [c["text"] for c in generate_comments(300, seed=9)]
+    inline = BatchSentimentEngine(workers=1)
+    pooled = BatchSentimentEngine(workers=2, chunk_size=40, min_parallel=50)
+    try:
+        assert inline.buckets(texts) == pooled.buckets(texts) == score_buckets(texts)
+        pool = pooled._pool
+        assert pool is not None
+        assert inline.labels(texts) == pooled.labels(texts) == score_labels(texts)
+        assert pooled._pool is pool  # started once, reused by later calls
+        # Below min_parallel nothing is sent to the workers
+        assert pooled.labels(texts[:10]) == score_labels(texts[:10])
+    finally:
+        pooled.shutdown()
+    assert pooled._pool is None
+
+
+def test_stream_batches_are_buffered_up_to_min_parallel(monkeypatch):
+    comments = [{"id": str(i), "text": f"comment number {i} about the edit", "author": "a",
+                 "likes": 0, "time": 0} for i in range(1200)]
+
+    async def fake_stream(url, max_comments):
+        for start in range(0, len(comments), 50):
+            yield comments[start:start + 50]
+
+    async def fake_m3(context, tier="Free", viral_score=None):
+        yield "m3", {}
+
+    fed = []
+    real_feed = m3_pipeline.CommentAnalysis.feed
+
+    def counting_feed(self, batch):
+        fed.append(len(batch))
+        real_feed(self, batch)
+
+    engine = BatchSentimentEngine(workers=1)
+    monkeypatch.setattr(nlp_utils.registry, "get", lambda name: engine)
+    monkeypatch.setattr(m3_pipeline.CommentAnalysis, "feed", counting_feed)
+    monkeypatch.setattr(m3_pipeline, "stream_youtube_comments", fake_stream)
+    monkeypatch.setattr(m3_pipeline, "stream_m3", fake_m3)
+    monkeypatch.setattr(m3_pipeline, "calculate_viral_score", lambda context: 50)
+    monkeypatch.setattr(m3_pipeline, "get_cache", lambda: MemoryCache())
+    monkeypatch.setattr(CONFIG, "COMMENT_STORE_ENABLED", False)
+
+    async def run():
+        return [stage async for stage in m3_pipeline.run_m3_analysis("https://youtu.be/abc", limit=5000)]
+
+    stages = dict(asyncio.run(run()))
+    min_parallel = m3_pipeline.get_engine().min_parallel
+    assert fed[:-1] and all(n >= min_parallel for n in fed[:-1])
+    assert sum(fed) == 1200
+    assert stages["result"]["m2_analysis"]["engagement"]["comments_count"] == 1200
+
+
+def test_pool_size_comes_from_config_and_is_capped(monkeypatch):
+    monkeypatch.setattr(sentiment_engine.os, "cpu_count", lambda: 64)
+    assert BatchSentimentEngine().workers == sentiment_engine.DEFAULT_MAX_WORKERS
+
+    monkeypatch.setattr(sentiment_engine, "_engine", None)
+    monkeypatch.setattr(CONFIG, "SENTIMENT_WORKERS", 6)
+    assert sentiment_engine.get_engine().workers == 6
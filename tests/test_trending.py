@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.config import CONFIG
+from app.pipelines import trending
+
+
+def test_reddit_query_returns_partial_results_on_timeout(monkeypatch):
+    async def search(query, client=None):
+        if query == "slow":
+            await asyncio.sleep(1)
+        return [{"title": f"{query} post"}]
+
+    monkeypatch.setattr(trending, "reddit_search_async", search)
+    monkeypatch.setattr(CONFIG, "REDDIT_TIMEOUT", 0.05)
+
+    async def run():
+        return await asyncio.gather(trending._reddit_query(None, "fast"), trending._reddit_query(None, "slow"))
+
+    fast, slow = asyncio.run(run())
+    assert fast == {"query": "fast", "results": [{"title": "fast post"}]}
+    assert slow == {"query": "slow", "results": [], "error": "TimeoutError"}
+
+
+def test_google_trends_errors_are_reported(monkeypatch):
+    def broken(terms):
+        raise RuntimeError("429 from Google")
+
+    monkeypatch.setattr(trending, "trends_for_terms", broken)
+    assert asyncio.run(trending._google_trends(["a"])) == {"error": "429 from Google"}
+
+
+def test_analyze_all_combines_the_signals(monkeypatch):
+    comments = [
+        {"text": "I love this camera setup, amazing!", "likes": 40},
+        {"text": "How did you edit the intro music?", "likes": 10},
+        {"text": "terrible audio, I hate it", "likes": 0},
+    ]
+    searched = []
+
+    async def search(query, client=None):
+        searched.append(query)
+        return [{"title": "post"}] * 3
+
+    monkeypatch.setattr(trending, "extract_topics", lambda c: [{"topic": "Camera"}, {"topic": "Intro Music"}])
+    monkeypatch.setattr(trending, "reddit_search_async", search)
+    monkeypatch.setattr(trending, "trends_for_terms", lambda terms: {"interest_over_time": {t: 20 for t in terms}})
+
+    result = asyncio.run(trending.analyze_all("https://youtu.be/abc", {"comments": comments, "comments_count": 3}))
+
+    assert sorted(searched) == ["Camera", "Intro Music"]
+    reddit = result["platform"]["reddit_search"]
+    assert reddit["queries"] == ["Camera", "Intro Music"] and reddit["total_mentions"] == 6
+    assert result["platform"]["google_serp"] == {"interest_over_time": {"Camera": 20, "Intro Music": 20}}
+    sentiment = result["nlp"]["sentiment"]
+    assert sentiment["positive"] == 33.3 and sentiment["negative"] == 33.3
+    assert [q["text"] for q in result["nlp"]["questions"]] == ["How did you edit the intro music?"]
+    assert result["engagement"]["total_likes"] == 50
+    # avg likes 16.7 -> 3.3 * 0.4, reddit 6 mentions -> 12 * 0.3, google 40 * 0.3
+    assert result["summary"]["trend_probability"] == int(50 / 3 / 5 * 0.4 + 12 * 0.3 + 40 * 0.3)
+
+
+def test_analyze_all_cancels_the_other_signals_on_failure(monkeypatch):
+    cancelled = []
+
+    async def slow_search(query, client=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+
+    def broken_sentiment(text):
+        raise RuntimeError("model crashed")
+
+    monkeypatch.setattr(trending, "extract_topics", lambda c: [{"topic": "Camera"}])
+    monkeypatch.setattr(trending, "reddit_search_async", slow_search)
+    monkeypatch.setattr(trending, "trends_for_terms", lambda terms: {})
+    monkeypatch.setattr(trending, "analyze_sentiment", broken_sentiment)
+    monkeypatch.setattr(CONFIG, "REDDIT_TIMEOUT", 30)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="model crashed"):
+            await trending.analyze_all("https://youtu.be/abc", {"comments": [{"text": "hi"}]})
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert cancelled == ["Camera"]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from app.pipelines import youtube
+from app.pipelines.youtube import stream_youtube_comments
+
+
+def make_downloader(count, fail_after=None):
+    class FakeDownloader:
+        def get_comments(self, video_id):
+            for i in range(count):
+                if fail_after is not None and i == fail_after:
+                    raise RuntimeError("comments disabled")
+                yield {"cid": f"c{i}", "text": f"comment {i}", "author": "a", "votes": "1.2K", "time_parsed": 1000 - i}
+    return FakeDownloader
+
+
+async def collect(url, **kwargs):
+    return [batch async for batch in stream_youtube_comments(url, **kwargs)]
+
+
+def test_stream_batches_and_truncates(monkeypatch):
+    monkeypatch.setattr(youtube, "YoutubeCommentDownloader", make_downloader(500))
+    batches = asyncio.run(collect("https://www.youtube.com/watch?v=abc&t=5", max_comments=110, batch_size=50))
+    assert [len(b) for b in batches] == [50, 50, 10]
+    flat = [c for b in batches for c in b]
+    assert [c["id"] for c in flat] == [f"c{i}" for i in range(110)]
+    assert flat[0] == {"id": "c0", "text": "comment 0", "author": "a", "likes": 1200, "time": 1000}
+
+
+def test_stream_exact_multiple_has_no_empty_batch(monkeypatch):
+    monkeypatch.setattr(youtube, "YoutubeCommentDownloader", make_downloader(100))
+    batches = asyncio.run(collect("https://youtu.be/abc", max_comments=1000, batch_size=50))
+    assert [len(b) for b in batches] == [50, 50]
+
+
+def test_stream_reraises_downloader_errors(monkeypatch):
+    monkeypatch.setattr(youtube, "YoutubeCommentDownloader", make_downloader(500, fail_after=60))
+    received = []
+
+    async def consume():
+        async for batch in stream_youtube_comments("https://youtu.be/abc", max_comments=200, batch_size=50):
+            received.append(len(batch))
+
+    with pytest.raises(RuntimeError, match="comments disabled"):
+        asyncio.run(consume())
+    assert received == [50]
+
+
+def test_stream_rejects_urls_without_a_video_id():
+    with pytest.raises(ValueError):
+        asyncio.run(collect("https://example.com/video"))